@@ -33,6 +33,7 @@ CREATE TABLE `documents` (
   `type` enum('public','private') CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NOT NULL DEFAULT 'public',
   `original_path` varchar(255) NOT NULL,
   `doc_path` varchar(255) NOT NULL,
+  `content_hash` char(64) DEFAULT NULL,
   `created_at` datetime NOT NULL
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 
@@ -70,11 +71,57 @@ CREATE TABLE `employee_addresses` (
   `updated_at` datetime NOT NULL
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 
+--
+-- Table structure for table `ingestion_jobs`
+--
+
+CREATE TABLE `ingestion_jobs` (
+  `id` int NOT NULL,
+  `document_id` int NOT NULL,
+  `status` enum('queued','running','succeeded','failed','dead') NOT NULL DEFAULT 'queued',
+  `attempts` int NOT NULL DEFAULT '0',
+  `error` text,
+  `chunk_count` int DEFAULT NULL,
+  `content_hash` char(64) DEFAULT NULL,
+  `etag` varchar(255) DEFAULT NULL,
+  `last_modified` varchar(64) DEFAULT NULL,
+  `next_attempt_at` datetime DEFAULT NULL,
+  `started_at` datetime DEFAULT NULL,
+  `finished_at` datetime DEFAULT NULL,
+  `duration_ms` int DEFAULT NULL,
+  `created_at` datetime NOT NULL,
+  `updated_at` datetime DEFAULT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+--
+-- Table structure for table `conversations`
+--
+
+CREATE TABLE `conversations` (
+  `conversation_id` varchar(191) NOT NULL,
+  `summary` text,
+  `turns` text NOT NULL,
+  `expires_at` datetime NOT NULL,
+  `created_at` datetime NOT NULL,
+  `updated_at` datetime DEFAULT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+--
+-- Table structure for table `processed_messages`
+--
+
+CREATE TABLE `processed_messages` (
+  `message_key` varchar(191) NOT NULL,
+  `expires_at` datetime NOT NULL,
+  `created_at` datetime NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
 --
 -- Indexes for table `documents`
 --
 ALTER TABLE `documents`
-  ADD PRIMARY KEY (`id`);
+  ADD PRIMARY KEY (`id`),
+  ADD UNIQUE KEY `uq_documents_content_hash` (`content_hash`);
 
 --
 -- Indexes for table `employees`
@@ -88,6 +135,30 @@ ALTER TABLE `employees`
 ALTER TABLE `employee_addresses`
   ADD PRIMARY KEY (`id`);
 
+--
+-- Indexes for table `ingestion_jobs`
+--
+ALTER TABLE `ingestion_jobs`
+  ADD PRIMARY KEY (`id`),
+  ADD UNIQUE KEY `uq_ingestion_jobs_document_id` (`document_id`),
+  ADD KEY `idx_ingestion_jobs_status` (`status`),
+  ADD KEY `idx_ingestion_jobs_content_hash` (`content_hash`),
+  ADD CONSTRAINT `fk_ingestion_jobs_document` FOREIGN KEY (`document_id`) REFERENCES `documents` (`id`) ON DELETE CASCADE;
+
+--
+-- Indexes for table `conversations`
+--
+ALTER TABLE `conversations`
+  ADD PRIMARY KEY (`conversation_id`),
+  ADD KEY `idx_conversations_expires_at` (`expires_at`);
+
+--
+-- Indexes for table `processed_messages`
+--
+ALTER TABLE `processed_messages`
+  ADD PRIMARY KEY (`message_key`),
+  ADD KEY `idx_processed_messages_expires_at` (`expires_at`);
+
 --
 -- AUTO_INCREMENT for table `documents`
 --
@@ -105,6 +176,12 @@ ALTER TABLE `employees`
 --
 ALTER TABLE `employee_addresses`
   MODIFY `id` int NOT NULL AUTO_INCREMENT;
+
+--
+-- AUTO_INCREMENT for table `ingestion_jobs`
+--
+ALTER TABLE `ingestion_jobs`
+  MODIFY `id` int NOT NULL AUTO_INCREMENT;
 COMMIT;
 
 /*!40101 SET CHARACTER_SET_CLIENT=@OLD_CHARACTER_SET_CLIENT */;
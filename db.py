@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, scoped_session
 from decouple import config
@@ -53,14 +53,51 @@ engine = create_engine(
 )
 
 
+
+# ------------------------------------------------------------
+# Read-only Engine
+# ------------------------------------------------------------
+# Separate pool for SQL written by the LLM (see
+# services.sql_executor), so it can never exhaust the pool of
+# the API or write to the database.
+# - SQL_READONLY_DATABASE_URL: e.g. a replica or a read-only user
+#   (defaults to the primary database).
+# - Every connection is put in read-only transaction mode and
+#   gets a statement timeout (MAX_EXECUTION_TIME, milliseconds).
+# ------------------------------------------------------------
+SQL_READONLY_DATABASE_URL = str(config("SQL_READONLY_DATABASE_URL", default="")).strip() or SQLALCHEMY_DATABASE_URL
+SQL_MAX_EXECUTION_TIME = int(config("SQL_MAX_EXECUTION_TIME", default=5000))
+
+readonly_engine = create_engine(
+    SQL_READONLY_DATABASE_URL,
+    pool_size=int(config("SQL_READONLY_POOL_SIZE", default=3)),
+    max_overflow=0,
+    pool_pre_ping=True,
+    isolation_level="READ COMMITTED",
+)
+
+
+@event.listens_for(readonly_engine, "connect")
+def _configure_readonly_connection(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("SET SESSION TRANSACTION READ ONLY")
+        cursor.execute(f"SET SESSION MAX_EXECUTION_TIME = {max(0, SQL_MAX_EXECUTION_TIME)}")
+    finally:
+        cursor.close()
+
+
 # ------------------------------------------------------------
 # Session Management
 # ------------------------------------------------------------
-# SessionLocal provides a factory for session instances bound
-# to the configured engine. Scoped sessions ensure thread safety.
+# SessionFactory creates independent sessions bound to the
+# configured engine (one per API request, see
+# services.container.get_document_service).
+# SessionLocal wraps it in a scoped (thread-local) session for
+# background threads and services that own their thread.
 # ------------------------------------------------------------
-SessionLocal = sessionmaker(bind=engine)
-SessionLocal = scoped_session(SessionLocal)
+SessionFactory = sessionmaker(bind=engine)
+SessionLocal = scoped_session(SessionFactory)
 
 
 # ------------------------------------------------------------
@@ -76,7 +113,8 @@ Base = declarative_base()
 # Function: get_db
 # Description:
 #   Provides a database session for dependency injection (e.g., in FastAPI routes).
-#   Ensures that sessions are properly closed after use.
+#   Ensures that sessions are properly closed after use. Connections go
+#   back to the engine pool and are reused by the next session.
 #
 # Usage Example:
 #   db = get_db()
@@ -88,4 +126,3 @@ def get_db():
         return db
     finally:
         db.close()
-        engine.dispose()
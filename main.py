@@ -4,13 +4,19 @@ from fastapi.staticfiles import StaticFiles
 from apscheduler.schedulers.background import BackgroundScheduler
 from routers import employees, whatsapp, telegram, document, chat_bot, address
 from middleware.auth_middleware import AuthMiddleware
-from services.document_ingestion_service import DocumentIngestionService
+from services.container import container
+from services.ingestion_queue import ingestion_queue
+from services.url_fetcher import url_fetcher
+from services.message_worker import message_worker
+from services.outbound_client import outbound_client
+from decouple import config
 from utils.logger import logger
 import os
+from datetime import datetime
 from dotenv import load_dotenv
 
 load_dotenv()
-ingestion_service = DocumentIngestionService()
+ingestion_service = container.ingestion_service()
 # ------------------------------------------------------------
 # Application: FastAPI Server
 # Description:
@@ -84,14 +90,74 @@ scheduler = BackgroundScheduler()
 # ------------------------------------------------------------
 # Event: Application Startup
 # Description:
-#   Starts the background scheduler and registers the main loop
-#   job that executes at defined intervals.
+#   Builds the shared RAG and SQL chains once per process so the
+#   first chat request does not pay the setup cost.
+# ------------------------------------------------------------
+@app.on_event("startup")
+def warm_up_chains():
+    logger.info("Warming up LangChain chains...")
+    container.langchain_service().warm_up()
+    logger.info("LangChain chains ready.")
+
+
+# ------------------------------------------------------------
+# Event: Application Startup
+# Description:
+#   Starts the ingestion queue that ingests uploads as soon as they
+#   are written (with an optional folder watcher as fallback), and
+#   the async fetcher used for URL documents.
+# ------------------------------------------------------------
+@app.on_event("startup")
+def start_ingestion_queue():
+    url_fetcher.start()
+    watch_folder = "documents" if config("INGESTION_WATCH", default=True, cast=bool) else None
+    ingestion_queue.start(
+        ingestion_service.process_files,
+        watch_folder=watch_folder,
+        watch_delay=float(config("INGESTION_WATCH_DELAY", default=5)),
+    )
+    logger.info("Ingestion queue started.")
+
+
+# ------------------------------------------------------------
+# Event: Application Startup
+# Description:
+#   Starts the bounded worker pool that answers Telegram and
+#   WhatsApp messages after their webhooks were acknowledged.
+# ------------------------------------------------------------
+@app.on_event("startup")
+async def start_message_worker():
+    message_worker.start()
+    logger.info("Message worker started.")
+
+
+# ------------------------------------------------------------
+# Event: Application Startup
+# Description:
+#   Starts the background scheduler and registers the low-frequency
+#   reconciliation scan of the documents folder, the periodic
+#   re-crawl of URL documents and the embedding cache stats log.
 # ------------------------------------------------------------
 @app.on_event("startup")
 def start_scheduler():
     logger.info("Scheduler starting...")
     scheduler.add_job(ingestion_service.main_loop, 'interval',
-                      id='main_loop_job', seconds=10)
+                      id='main_loop_job',
+                      seconds=int(config("INGESTION_RECONCILE_INTERVAL", default=300)),
+                      next_run_time=datetime.now())
+    if config("URL_REFRESH_ENABLED", default=True, cast=bool):
+        scheduler.add_job(ingestion_service.refresh_urls, 'interval',
+                          id='url_refresh_job',
+                          seconds=int(config("URL_REFRESH_INTERVAL", default=86400)),
+                          max_instances=1,
+                          coalesce=True)
+    embedding_model = container.embedding_model()
+    stats_interval = int(config("EMBEDDING_CACHE_STATS_INTERVAL", default=3600))
+    if hasattr(embedding_model, "log_stats") and stats_interval > 0:
+        scheduler.add_job(embedding_model.log_stats, 'interval',
+                          id='embedding_cache_stats_job',
+                          seconds=stats_interval,
+                          coalesce=True)
     scheduler.start()
     logger.info("Scheduler started successfully.")
 
@@ -104,9 +170,25 @@ def start_scheduler():
 @app.on_event("shutdown")
 def shutdown_scheduler():
     scheduler.shutdown()
+    ingestion_queue.stop()
+    url_fetcher.stop()
+    ingestion_service.pipeline.shutdown()
     logger.info("Scheduler stopped.")
 
 
+# ------------------------------------------------------------
+# Event: Application Shutdown
+# Description:
+#   Lets queued chat messages finish, then stops the workers and
+#   closes the outbound connection pool.
+# ------------------------------------------------------------
+@app.on_event("shutdown")
+async def stop_message_worker():
+    await message_worker.stop()
+    await outbound_client.aclose()
+    logger.info("Message worker stopped.")
+
+
 # ------------------------------------------------------------
 # Endpoint: Root
 # Description:
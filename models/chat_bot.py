@@ -1,10 +1,14 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 # ------------------------------------------------------------
 # Model: ChatModel
 # Description:
 #   Defines the schema for a user's chat or query input.
 #   Used for validating incoming request data in APIs.
+#   `session_id` (chosen by the client, e.g. a UUID per chat window)
+#   enables multi-turn conversation memory; omit it for one-off
+#   questions.
 # ------------------------------------------------------------
 class ChatModel(BaseModel):
     query: str
+    session_id: str | None = Field(default=None, min_length=1, max_length=128)
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional, List
+from datetime import datetime
 
 # ------------------------------------------------------------
 # Model: Document
@@ -45,3 +46,36 @@ class DocumentList(BaseModel):
 class URLUpload(BaseModel):
     url: str                               # Remote file URL
     type: str                              # File type (e.g., 'pdf', 'video', 'text')
+
+
+# ------------------------------------------------------------
+# Model: IngestionProgress
+# Description:
+#   Live progress of a document file in the ingestion pipeline.
+# ------------------------------------------------------------
+class IngestionProgress(BaseModel):
+    status: str                            # parsing, embedding, done or failed
+    chunks: int = 0                        # Chunks parsed so far
+    new: int = 0                           # Chunks that need embedding
+    written: int = 0                       # New chunks embedded and stored
+    error: Optional[str] = None            # Error that failed the file
+    started_at: Optional[datetime] = None  # Start of the pipeline run
+
+
+# ------------------------------------------------------------
+# Model: IngestionStatus
+# Description:
+#   Ingestion job status of a document.
+# ------------------------------------------------------------
+class IngestionStatus(BaseModel):
+    document_id: int                       # Document the job belongs to
+    status: str                            # queued, running, succeeded, failed, dead or unknown
+    attempts: int = 0                      # Number of attempts so far
+    error: Optional[str] = None            # Last error message
+    chunk_count: Optional[int] = None      # Chunks written by the last successful run
+    content_hash: Optional[str] = None     # sha256 of the ingested content
+    next_attempt_at: Optional[datetime] = None  # Earliest time of the next retry
+    started_at: Optional[datetime] = None  # Start of the last attempt
+    finished_at: Optional[datetime] = None # End of the last attempt
+    duration_ms: Optional[int] = None      # Duration of the last attempt
+    progress: Optional[IngestionProgress] = None  # Pipeline progress of the last run, if any
@@ -1,7 +1,9 @@
-from fastapi import APIRouter
+import json
+from fastapi import APIRouter, Depends
 from fastapi.exceptions import HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from services.langchain_service import LangchainService
+from services.container import get_langchain_service
 from models.chat_bot import ChatModel
 from middleware.auth_middleware import get_current_employee
 
@@ -9,16 +11,14 @@ from middleware.auth_middleware import get_current_employee
 # Router: Chat Bot
 # Description:
 #   Handles chat requests between users and the AI model.
-#   Provides a single endpoint for generating AI-based responses.
+#   Provides endpoints for generating AI-based responses, either
+#   as a single JSON answer or as a Server-Sent Events stream.
 # ------------------------------------------------------------
 router = APIRouter(
     prefix='/chat-bot',
     tags=["Chat Bot"],
 )
 
-# Initialize the AI model service
-langchain_service = LangchainService()
-
 
 # ------------------------------------------------------------
 # Endpoint: POST /
@@ -29,13 +29,58 @@ langchain_service = LangchainService()
 #   - Returns the AI-generated answer.
 # ------------------------------------------------------------
 @router.post("/")
-def start_chat(question: ChatModel):
+def start_chat(question: ChatModel, langchain_service: LangchainService = Depends(get_langchain_service)):
     try:
         employee = get_current_employee()      # Retrieve currently authenticated user
         is_logged_in = bool(employee)          # Flag login status for context-aware response
-        response = langchain_service.generate_answer(question.query, is_logged_in)  # Get AI response
+        response = langchain_service.generate_answer(
+            question.query, is_logged_in, _conversation_id(question, employee)
+        )  # Get AI response
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
     
     # Return the AI's answer as a JSON response
     return JSONResponse(f"{response['answer']}", status_code=200)
+
+
+# ------------------------------------------------------------
+# Endpoint: POST /stream
+# Description:
+#   Streams the AI-generated answer as Server-Sent Events.
+#   - Each token is sent as `data: {"token": "..."}`.
+#   - The stream ends with an `end` event, or an `error` event
+#     carrying the failure detail.
+# ------------------------------------------------------------
+@router.post("/stream")
+async def stream_chat(question: ChatModel, langchain_service: LangchainService = Depends(get_langchain_service)):
+    employee = get_current_employee()      # Retrieve currently authenticated user
+    is_logged_in = bool(employee)          # Flag login status for context-aware response
+    conversation_id = _conversation_id(question, employee)
+
+    async def event_stream():
+        try:
+            async for token in langchain_service.astream_answer(question.query, is_logged_in, conversation_id):
+                yield f"data: {json.dumps({'token': token})}\n\n"
+            yield "event: end\ndata: {}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ------------------------------------------------------------
+# Helper function: _conversation_id
+# Description:
+#   Conversation memory key of a web chat session. The employee id
+#   is part of the key, so a session's history is never shared
+#   between users or between logged-in and logged-out requests.
+# ------------------------------------------------------------
+def _conversation_id(question: ChatModel, employee) -> str | None:
+    if not question.session_id:
+        return None
+    owner = employee.id if employee else "guest"
+    return f"web:{owner}:{question.session_id}"
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, HTTPException, Depends, File, Form, UploadFile
 from services.document import DocumentService
+from services.container import get_document_service
 from fastapi.responses import FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from typing import Literal, Any
 from services.jwt_service import JWTBearer
-from models.document import URLUpload
+from models.document import URLUpload, IngestionStatus
 import os
 
 # ------------------------------------------------------------
@@ -12,8 +13,10 @@ import os
 # Description:
 #   Handles document management operations including:
 #   - Uploading files or URLs
+#   - Replacing document files
 #   - Listing stored documents
 #   - Deleting documents
+#   - Reporting ingestion status
 #   Protected by JWT authentication middleware.
 # ------------------------------------------------------------
 router = APIRouter(
@@ -37,12 +40,15 @@ ALLOWED_TYPES = {
 # Endpoint: POST /upload
 # Description:
 #   Uploads a new document file.
-#   Validates MIME type and delegates to DocumentService for saving.
+#   Validates MIME type and delegates to DocumentService, which
+#   streams the file to disk; its blocking database and file work
+#   runs in worker threads, never on the event loop.
 # ------------------------------------------------------------
 @router.post('/upload')
-def upload_document(
+async def upload_document(
     file: UploadFile = File(...),
     type: Literal['public', 'private'] = Form(default='public'),
+    service: DocumentService = Depends(get_document_service),
 ):
     try:
         # Validate file type before processing
@@ -50,7 +56,32 @@ def upload_document(
             raise HTTPException(status_code=400, detail="This file type is not allowed")
 
         # Save document through the service layer
-        doc = DocumentService().create_document(file, type)
+        doc = await service.create_document(file, type)
+
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return doc
+
+
+# ------------------------------------------------------------
+# Endpoint: PUT /{id}
+# Description:
+#   Replaces the file of an existing document.
+#   Only chunks that changed are re-embedded.
+# ------------------------------------------------------------
+@router.put('/{id:int}')
+async def replace_document(
+    id: int,
+    file: UploadFile = File(...),
+    service: DocumentService = Depends(get_document_service),
+):
+    try:
+        # Validate file type before processing
+        if file.content_type not in ALLOWED_TYPES:
+            raise HTTPException(status_code=400, detail="This file type is not allowed")
+
+        doc = await service.replace_document(id, file)
 
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -62,12 +93,14 @@ def upload_document(
 # Endpoint: POST /url/upload
 # Description:
 #   Uploads a document by providing a remote URL.
+#   Returns immediately with the ingestion job id; the page is
+#   fetched and indexed in the background.
 # ------------------------------------------------------------
 @router.post('/url/upload')
-def upload_url_document(data: URLUpload):
+def upload_url_document(data: URLUpload, service: DocumentService = Depends(get_document_service)):
     try:
         # Process URL-based document upload
-        doc = DocumentService().create_url_document(data.url, data.type)
+        doc = service.create_url_document(data.url, data.type)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -87,10 +120,11 @@ def read_documents(
     order_direction: Literal['desc', 'asc'] = 'desc',
     limit: int = 10,
     type: Literal['all', 'public', 'private'] = 'all',
-    page: int = 1
+    page: int = 1,
+    service: DocumentService = Depends(get_document_service),
 ):
     try:
-        response = DocumentService().read_documents(
+        response = service.read_documents(
             filter,
             order_by,
             order_direction,
@@ -110,11 +144,28 @@ def read_documents(
 #   Deletes a specific document by its ID.
 # ------------------------------------------------------------
 @router.delete('/{id:int}')
-def delete_document(id: int):
+def delete_document(id: int, service: DocumentService = Depends(get_document_service)):
     try:
-        response = DocumentService().delete_document(id)
+        response = service.delete_document(id)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
     
     # Return confirmation of deletion
     return JSONResponse(content=response, status_code=200)
+
+
+# ------------------------------------------------------------
+# Endpoint: GET /{id}/status
+# Description:
+#   Returns the ingestion job status of a document
+#   (status, attempts, last error, chunk count, timings) and the
+#   live pipeline progress of its file.
+# ------------------------------------------------------------
+@router.get('/{id:int}/status', response_model=IngestionStatus)
+def read_document_status(id: int, service: DocumentService = Depends(get_document_service)):
+    try:
+        response = service.read_document_status(id)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return response
@@ -2,7 +2,12 @@ from fastapi import APIRouter
 from fastapi.exceptions import HTTPException
 from fastapi.responses import JSONResponse
 from fastapi.requests import Request
+from decouple import config
 from services.telegram_service import TelegramService
+from services.message_worker import message_worker
+from services.idempotency import idempotency_store
+import asyncio
+import hmac
 
 # ------------------------------------------------------------
 # Router: Telegram
@@ -20,26 +25,45 @@ router = APIRouter(
 # Endpoint: POST /webhook
 # Description:
 #   Receives webhook events from Telegram.
+#   - Validates the secret token header (if TELEGRAM_WEBHOOK_SECRET is set).
 #   - Extracts chat ID and message text.
-#   - If text is '/start', triggers the start handler.
-#   - Otherwise, replies to the user's message using TelegramService.
+#   - Ignores redelivered updates (idempotency store on update_id).
+#   - Queues the start handler ('/start') or the AI reply on the
+#     background message worker and returns 200 right away, so
+#     Telegram does not retry the update. Replies of one chat are
+#     sent in order.
 # ------------------------------------------------------------
 @router.post("/webhook")
 async def webhook(request: Request):
+    secret = str(config("TELEGRAM_WEBHOOK_SECRET", default="")).strip()
+    if secret and not hmac.compare_digest(request.headers.get("X-Telegram-Bot-Api-Secret-Token", ""), secret):
+        raise HTTPException(status_code=403, detail="Invalid webhook secret")
+
     try:
         data = await request.json()
-        if "message" in data:
-            chat_id = data["message"]["chat"]["id"]
-            text = data["message"].get("text", "")
-            print(data)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    message = data.get("message") if isinstance(data, dict) else None
+    if message and "chat" in message:
+        chat_id = message["chat"]["id"]
+        text = message.get("text", "")
 
+        # Updates without an id cannot be deduplicated
+        update_id = data.get("update_id", message.get("message_id"))
+        message_key = f"telegram:{update_id}" if update_id is not None else None
+        if text and (message_key is None or await asyncio.to_thread(idempotency_store.claim, message_key)):
+            service = TelegramService()
+            chat_key = f"telegram:{chat_id}"
             # Handle start command separately
             if text != '/start':
-                TelegramService()._reply_message(chat_id, text)
+                queued = message_worker.submit(service._reply_message, chat_id, text, key=chat_key)
             else:
-                TelegramService()._start_app(chat_id)
-    except Exception as e:
-        print("HTTPException", str(e))
-        raise HTTPException(status_code=400, detail=str(e))
+                queued = message_worker.submit(service._start_app, chat_id, key=chat_key)
+
+            if not queued:
+                if message_key:
+                    await asyncio.to_thread(idempotency_store.release, message_key)
+                raise HTTPException(status_code=503, detail="Too many pending messages, retry later")
 
     return JSONResponse(status_code=200, content={"ok": True})
@@ -3,8 +3,14 @@ from fastapi.exceptions import HTTPException
 from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.requests import Request
 from services.whatsapp_service import WhatsAppService
+from services.message_worker import message_worker
+from services.idempotency import idempotency_store
 from decouple import config
 from dotenv import load_dotenv
+import asyncio
+import hashlib
+import hmac
+import json
 
 # ------------------------------------------------------------
 # Router: WhatsApp
@@ -43,10 +49,14 @@ async def verify_whatsapp_webhook(
 # ------------------------------------------------------------
 # Endpoint: POST /whatsapp/webhook
 # Description:
-#   Receives and processes incoming messages from WhatsApp users.
-#   - Validates the request body.
+#   Receives incoming messages from WhatsApp users.
+#   - Validates the request body and, if WHATSAPP_APP_SECRET is set,
+#     the X-Hub-Signature-256 payload signature.
 #   - Extracts message content and sender phone number.
-#   - Uses WhatsAppService to send a reply message.
+#   - Ignores redelivered messages (idempotency store on message id).
+#   - Queues each reply on the background message worker and
+#     returns 200 right away, so Meta does not redeliver the event.
+#     Replies to one number are sent in order.
 # ------------------------------------------------------------
 @router.post("/webhook")
 async def reply_incoming_message(request: Request):
@@ -54,22 +64,38 @@ async def reply_incoming_message(request: Request):
     if not body:
         raise HTTPException(status_code=400, detail="request body not found")
 
-    try:
-        data = await request.json()
-        if "entry" in data:
-            for entry in data["entry"]:
-                for change in entry.get("changes", []):
-                    value = change.get("value", {})
-                    messages = value.get("messages", [])
+    app_secret = str(config("WHATSAPP_APP_SECRET", default="")).strip()
+    if app_secret:
+        expected = "sha256=" + hmac.new(app_secret.encode(), body, hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(request.headers.get("X-Hub-Signature-256", ""), expected):
+            raise HTTPException(status_code=403, detail="Invalid signature")
 
-                    for msg in messages:
-                        from_number = msg["from"]
-                        text = msg.get("text", {}).get("body")
+    try:
+        data = json.loads(body)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-                        if text:
-                            WhatsAppService().reply_whatsapp_message(from_number, text)
+    messages = []
+    for entry in data.get("entry", []) if isinstance(data, dict) else []:
+        for change in entry.get("changes", []):
+            value = change.get("value", {})
+            for msg in value.get("messages", []):
+                text = msg.get("text", {}).get("body")
+                if text:
+                    # Messages without an id cannot be deduplicated
+                    message_key = f"whatsapp:{msg['id']}" if msg.get("id") else None
+                    messages.append((message_key, msg["from"], text))
 
-        return JSONResponse(content="message: Ok", status_code=200)
+    if messages:
+        service = WhatsAppService()
+        for message_key, from_number, text in messages:
+            if message_key and not await asyncio.to_thread(idempotency_store.claim, message_key):
+                continue
+            if not message_worker.submit(
+                service.reply_whatsapp_message, from_number, text, key=f"whatsapp:{from_number}"
+            ):
+                if message_key:
+                    await asyncio.to_thread(idempotency_store.release, message_key)
+                raise HTTPException(status_code=503, detail="Too many pending messages, retry later")
 
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    return JSONResponse(content="message: Ok", status_code=200)
@@ -0,0 +1,185 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from decouple import config
+from dotenv import load_dotenv
+
+# ------------------------------------------------------------
+# Module: answer_cache
+# Description:
+#   Two-level, in-process cache for generated chat answers.
+#   - Level 1: exact match on the normalized query text.
+#   - Level 2: semantic match of the query embedding against a
+#     small in-memory vector index (cosine similarity threshold).
+#   Both levels use TTL + LRU eviction and keep separate namespaces
+#   for public (logged-out) and private (logged-in) answers.
+#   The semantic level is limited to `semantic_namespaces`: private
+#   answers may come from SQL about one person, and "What is John's
+#   email?" embeds almost like "What is Jane's email?", so those are
+#   matched exactly only.
+# ------------------------------------------------------------
+
+load_dotenv()
+
+
+class AnswerCache:
+    # ------------------------------------------------------------
+    # Method: __init__
+    # Description:
+    #   Initializes empty namespaces and cache limits.
+    #
+    # Parameters:
+    #   - ttl (float): Seconds an answer stays valid.
+    #   - max_entries (int): Max entries per level and namespace.
+    #   - similarity_threshold (float): Minimum cosine similarity
+    #     for a semantic hit.
+    #   - semantic_namespaces (list[str] | None): Namespaces served
+    #     by the semantic level (None = all).
+    # ------------------------------------------------------------
+    def __init__(self, ttl: float = 3600, max_entries: int = 512, similarity_threshold: float = 0.95,
+                 semantic_namespaces: list[str] | None = None):
+        self.__ttl = ttl
+        self.__max_entries = max_entries
+        self.__similarity_threshold = similarity_threshold
+        self.__semantic_namespaces = None if semantic_namespaces is None else set(semantic_namespaces)
+        self.__lock = threading.Lock()
+        self.__exact = {}
+        self.__semantic = {}
+
+    # ------------------------------------------------------------
+    # Method: normalize
+    # Description:
+    #   Lower-cases the query, strips punctuation and collapses
+    #   whitespace so trivially different phrasings share a key.
+    # ------------------------------------------------------------
+    @staticmethod
+    def normalize(query: str) -> str:
+        query = re.sub(r"[^\w\s]", " ", (query or "").lower())
+        return re.sub(r"\s+", " ", query).strip()
+
+    # ------------------------------------------------------------
+    # Method: is_semantic
+    # Description:
+    #   True when `namespace` uses the semantic level.
+    # ------------------------------------------------------------
+    def is_semantic(self, namespace: str) -> bool:
+        return self.__semantic_namespaces is None or namespace in self.__semantic_namespaces
+
+    # ------------------------------------------------------------
+    # Method: get_exact
+    # Description:
+    #   Returns the cached answer for an exact (normalized) match.
+    # ------------------------------------------------------------
+    def get_exact(self, namespace: str, query: str):
+        key = self.normalize(query)
+        with self.__lock:
+            entries = self.__exact.get(namespace)
+            if not entries or key not in entries:
+                return None
+
+            answer, expires_at = entries[key]
+            if expires_at < time.monotonic():
+                del entries[key]
+                return None
+
+            entries.move_to_end(key)
+            return answer
+
+    # ------------------------------------------------------------
+    # Method: get_similar
+    # Description:
+    #   Returns the cached answer whose query embedding is the most
+    #   similar to `embedding`, if above the similarity threshold.
+    # ------------------------------------------------------------
+    def get_similar(self, namespace: str, embedding):
+        if embedding is None or not self.is_semantic(namespace):
+            return None
+
+        vector = self.__unit(embedding)
+        now = time.monotonic()
+        with self.__lock:
+            entries = self.__semantic.get(namespace)
+            if not entries:
+                return None
+
+            for key in [k for k, (_, _, expires_at) in entries.items() if expires_at < now]:
+                del entries[key]
+            if not entries:
+                return None
+
+            keys = list(entries.keys())
+            matrix = np.vstack([entries[k][0] for k in keys])
+            scores = matrix @ vector
+            best = int(np.argmax(scores))
+            if scores[best] < self.__similarity_threshold:
+                return None
+
+            entries.move_to_end(keys[best])
+            return entries[keys[best]][1]
+
+    # ------------------------------------------------------------
+    # Method: put
+    # Description:
+    #   Stores an answer in the exact level and, when an embedding
+    #   is given and the namespace is semantic, in the semantic
+    #   level too. `ttl` overrides the cache-wide TTL for this entry.
+    # ------------------------------------------------------------
+    def put(self, namespace: str, query: str, answer: str, embedding=None, ttl: float | None = None):
+        key = self.normalize(query)
+        expires_at = time.monotonic() + (self.__ttl if ttl is None else ttl)
+        with self.__lock:
+            exact = self.__exact.setdefault(namespace, OrderedDict())
+            exact[key] = (answer, expires_at)
+            exact.move_to_end(key)
+            while len(exact) > self.__max_entries:
+                exact.popitem(last=False)
+
+            if embedding is not None and self.is_semantic(namespace):
+                semantic = self.__semantic.setdefault(namespace, OrderedDict())
+                semantic[key] = (self.__unit(embedding), answer, expires_at)
+                semantic.move_to_end(key)
+                while len(semantic) > self.__max_entries:
+                    semantic.popitem(last=False)
+
+    # ------------------------------------------------------------
+    # Method: invalidate
+    # Description:
+    #   Clears one namespace, or every namespace when None.
+    #   Called whenever documents are ingested or deleted.
+    # ------------------------------------------------------------
+    def invalidate(self, namespace: str | None = None):
+        with self.__lock:
+            if namespace is None:
+                self.__exact.clear()
+                self.__semantic.clear()
+            else:
+                self.__exact.pop(namespace, None)
+                self.__semantic.pop(namespace, None)
+
+    # ------------------------------------------------------------
+    # Method: __unit
+    # Description:
+    #   Converts an embedding to a unit-length float32 vector.
+    # ------------------------------------------------------------
+    @staticmethod
+    def __unit(embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+# ------------------------------------------------------------
+# Shared process-wide cache instance
+# ------------------------------------------------------------
+answer_cache = AnswerCache(
+    ttl=float(config("ANSWER_CACHE_TTL", default=3600)),
+    max_entries=int(config("ANSWER_CACHE_MAX_ENTRIES", default=512)),
+    similarity_threshold=float(config("ANSWER_CACHE_SIMILARITY", default=0.95)),
+    semantic_namespaces=[
+        namespace.strip()
+        for namespace in str(config("ANSWER_CACHE_SEMANTIC_NAMESPACES", default="public")).split(",")
+        if namespace.strip()
+    ],
+)
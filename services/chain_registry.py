@@ -0,0 +1,163 @@
+import threading
+import time
+from utils.logger import logger
+
+# ------------------------------------------------------------
+# Module: chain_registry
+# Description:
+#   Keeps process-wide instances of expensive LangChain objects
+#   (vector stores, RAG chains, SQL chains) so they are built once
+#   and reused across requests.
+#   - Each entry is registered with a builder and an optional
+#     fingerprint function (e.g. schema hash, collection id).
+#   - Entries are rebuilt only when their fingerprint changes.
+# ------------------------------------------------------------
+
+
+class ChainRegistry:
+    # ------------------------------------------------------------
+    # Method: __init__
+    # Description:
+    #   Initializes the registry.
+    #
+    # Parameters:
+    #   - refresh_interval (float): Minimum number of seconds between
+    #     two fingerprint checks of the same entry.
+    # ------------------------------------------------------------
+    def __init__(self, refresh_interval: float = 300.0):
+        self.__refresh_interval = refresh_interval
+        # Guards the dictionaries only; builders and fingerprint
+        # functions run under the per-name lock, so one slow build
+        # never blocks `get` of the other entries.
+        self.__lock = threading.Lock()
+        self.__builders = {}
+        self.__entries = {}
+        self.__name_locks = {}
+        # Bumped by register / invalidate, so a build that started
+        # before them does not store its (stale) result
+        self.__generations = {}
+
+    # ------------------------------------------------------------
+    # Method: register
+    # Description:
+    #   Registers a builder under the given name.
+    #   The object itself is created lazily on first `get`.
+    # ------------------------------------------------------------
+    def register(self, name: str, builder, fingerprint=None):
+        with self.__lock:
+            self.__builders[name] = (builder, fingerprint)
+            self.__entries.pop(name, None)
+            self.__name_locks.setdefault(name, threading.RLock())
+            self.__generations[name] = self.__generations.get(name, 0) + 1
+
+    # ------------------------------------------------------------
+    # Method: get
+    # Description:
+    #   Returns the cached object for `name`.
+    #   - Builds it on first access (concurrent callers wait for
+    #     that one build).
+    #   - Rebuilds it when the fingerprint has changed since the
+    #     last build (checked at most once per refresh interval;
+    #     callers arriving during a check get the current object).
+    # ------------------------------------------------------------
+    def get(self, name: str):
+        with self.__lock:
+            if name not in self.__builders:
+                raise KeyError(f"No builder registered for '{name}'")
+            name_lock = self.__name_locks[name]
+            entry = self.__entries.get(name)
+
+        if entry is not None and not self.__check_due(name, entry):
+            return entry["value"]
+        if entry is not None and not name_lock.acquire(blocking=False):
+            return entry["value"]
+        if entry is None:
+            name_lock.acquire()
+        try:
+            with self.__lock:
+                entry = self.__entries.get(name)
+                _, fingerprint = self.__builders[name]
+            if entry is None:
+                return self.__build(name)
+            if not self.__check_due(name, entry):
+                return entry["value"]
+
+            entry["checked_at"] = time.monotonic()
+            try:
+                current = fingerprint()
+            except Exception as e:
+                logger.warning(f"Fingerprint check failed for '{name}': {str(e)}")
+                return entry["value"]
+
+            if current != entry["fingerprint"]:
+                logger.info(f"Fingerprint changed for '{name}', rebuilding.")
+                return self.__build(name, current)
+            return entry["value"]
+        finally:
+            name_lock.release()
+
+    # ------------------------------------------------------------
+    # Method: invalidate
+    # Description:
+    #   Drops one cached entry (or all of them when `name` is None)
+    #   so it is rebuilt on next access.
+    # ------------------------------------------------------------
+    def invalidate(self, name: str | None = None):
+        with self.__lock:
+            names = list(self.__builders) if name is None else [name]
+            for key in names:
+                self.__entries.pop(key, None)
+                self.__generations[key] = self.__generations.get(key, 0) + 1
+
+    # ------------------------------------------------------------
+    # Method: warm_up
+    # Description:
+    #   Eagerly builds every registered entry (used at startup).
+    #   Failures are logged and retried lazily on first request.
+    # ------------------------------------------------------------
+    def warm_up(self):
+        with self.__lock:
+            names = list(self.__builders)
+        for name in names:
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.error(f"Failed to warm up '{name}': {str(e)}", exc_info=True)
+
+    # ------------------------------------------------------------
+    # Method: __check_due
+    # Description:
+    #   True when the entry has a fingerprint that was last checked
+    #   more than one refresh interval ago.
+    # ------------------------------------------------------------
+    def __check_due(self, name: str, entry: dict) -> bool:
+        with self.__lock:
+            _, fingerprint = self.__builders[name]
+        return bool(fingerprint) and time.monotonic() - entry["checked_at"] >= self.__refresh_interval
+
+    # ------------------------------------------------------------
+    # Method: __build
+    # Description:
+    #   Calls the builder (under the per-name lock only) and stores
+    #   the result with its fingerprint.
+    # ------------------------------------------------------------
+    def __build(self, name: str, current_fingerprint=None):
+        with self.__lock:
+            builder, fingerprint = self.__builders[name]
+            generation = self.__generations.get(name, 0)
+        if fingerprint and current_fingerprint is None:
+            try:
+                current_fingerprint = fingerprint()
+            except Exception as e:
+                logger.warning(f"Fingerprint check failed for '{name}': {str(e)}")
+
+        value = builder()
+        with self.__lock:
+            if self.__generations.get(name, 0) == generation:
+                self.__entries[name] = {
+                    "value": value,
+                    "fingerprint": current_fingerprint,
+                    "checked_at": time.monotonic(),
+                }
+        logger.info(f"Built '{name}'.")
+        return value
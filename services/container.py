@@ -0,0 +1,150 @@
+import threading
+from services.llm_service import LLMService
+from services.langchain_service import LangchainService
+from services.document_ingestion_service import DocumentIngestionService
+from services.document import DocumentService
+import db
+
+# ------------------------------------------------------------
+# Module: container
+# Description:
+#   Process-wide service container.
+#   - LLM and embedding clients, the LangchainService (with its
+#     Chroma stores and chains) and the ingestion service are
+#     created lazily, once per process, and shared.
+#   - Request-scoped services (e.g. DocumentService) are cheap
+#     wrappers around those singletons and a DB session.
+#   - The `get_*` functions are FastAPI dependencies (`Depends`).
+# ------------------------------------------------------------
+
+
+class ServiceContainer:
+    # ------------------------------------------------------------
+    # Method: __init__
+    # Description:
+    #   Creates an empty container; nothing is built until first use.
+    # ------------------------------------------------------------
+    def __init__(self):
+        self.__lock = threading.RLock()
+        self.__instances = {}
+
+    # ------------------------------------------------------------
+    # Method: llm_service
+    # Description:
+    #   Shared LLMService (provider configuration).
+    # ------------------------------------------------------------
+    def llm_service(self) -> LLMService:
+        return self.__singleton("llm_service", LLMService)
+
+    # ------------------------------------------------------------
+    # Method: chat_model
+    # Description:
+    #   Shared chat model client of the configured provider.
+    # ------------------------------------------------------------
+    def chat_model(self):
+        return self.__singleton("chat_model", lambda: self.llm_service().get_chat_model())
+
+    # ------------------------------------------------------------
+    # Method: embedding_model
+    # Description:
+    #   Shared (cached, rate-limited) embedding client.
+    # ------------------------------------------------------------
+    def embedding_model(self):
+        return self.__singleton("embedding_model", lambda: self.llm_service().get_embedding_model())
+
+    # ------------------------------------------------------------
+    # Method: langchain_service
+    # Description:
+    #   Shared LangchainService; owns the Chroma client, stores and
+    #   chains, so they are opened once per process.
+    # ------------------------------------------------------------
+    def langchain_service(self) -> LangchainService:
+        return self.__singleton(
+            "langchain_service",
+            lambda: LangchainService(
+                llm_service=self.llm_service(),
+                llm=self.chat_model(),
+                embeddings=self.embedding_model(),
+            ),
+        )
+
+    # ------------------------------------------------------------
+    # Method: ingestion_service
+    # Description:
+    #   Shared DocumentIngestionService (pipeline, retries, URLs).
+    # ------------------------------------------------------------
+    def ingestion_service(self) -> DocumentIngestionService:
+        return self.__singleton(
+            "ingestion_service",
+            lambda: DocumentIngestionService(self.langchain_service()),
+        )
+
+    # ------------------------------------------------------------
+    # Method: document_service
+    # Description:
+    #   Request-scoped DocumentService bound to `db_session` (the
+    #   session of that request). Heavy dependencies are resolved
+    #   only when an operation needs them, so e.g. listing documents
+    #   costs just the SQL query.
+    # ------------------------------------------------------------
+    def document_service(self, db_session) -> DocumentService:
+        return DocumentService(
+            db_session=db_session,
+            langchain_service=self.langchain_service,
+            ingestion_service=self.ingestion_service,
+        )
+
+    # ------------------------------------------------------------
+    # Method: reset
+    # Description:
+    #   Drops all cached instances (e.g. after a config change).
+    # ------------------------------------------------------------
+    def reset(self):
+        with self.__lock:
+            self.__instances.clear()
+
+    # ------------------------------------------------------------
+    # Method: __singleton
+    # Description:
+    #   Returns the instance stored under `name`, creating it with
+    #   `factory` on first use (thread-safe).
+    # ------------------------------------------------------------
+    def __singleton(self, name: str, factory):
+        instance = self.__instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self.__lock:
+            if name not in self.__instances:
+                self.__instances[name] = factory()
+            return self.__instances[name]
+
+
+# ------------------------------------------------------------
+# Shared process-wide container instance
+# ------------------------------------------------------------
+container = ServiceContainer()
+
+
+# ------------------------------------------------------------
+# FastAPI dependencies
+# ------------------------------------------------------------
+def get_langchain_service() -> LangchainService:
+    return container.langchain_service()
+
+
+# ------------------------------------------------------------
+# Dependency: get_document_service
+# Description:
+#   Opens a new (non thread-local) session for every request and
+#   closes it when the response is done. FastAPI runs the
+#   dependency and the endpoint on different worker threads, so a
+#   thread-local scoped session would be shared between requests
+#   that happen to use the same worker.
+# ------------------------------------------------------------
+def get_document_service():
+    session = db.SessionFactory()
+    try:
+        yield container.document_service(session)
+    finally:
+        session.close()
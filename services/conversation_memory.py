@@ -0,0 +1,307 @@
+import threading
+import time
+from collections import OrderedDict
+from decouple import config
+from sql.cruds import conversations as conversation_crud
+from utils.logger import logger
+import db
+
+# ------------------------------------------------------------
+# Module: conversation_memory
+# Description:
+#   Bounded multi-turn history per conversation, keyed by channel:
+#   'web:<employee|guest>:<session_id>', 'telegram:<chat_id>' or
+#   'whatsapp:<number>'.
+#   - The last `max_turns` turns are kept verbatim; older turns are
+#     folded into a rolling summary, so the history sent to the LLM
+#     stays the same size however long the conversation runs.
+#   - MemoryConversationStore: per-process, LRU + TTL eviction.
+#   - SqlConversationStore: `conversations` table, shared by all
+#     workers/processes, TTL eviction.
+# ------------------------------------------------------------
+
+
+class MemoryConversationStore:
+    # ------------------------------------------------------------
+    # Method: __init__
+    # Description:
+    #   Creates an empty store.
+    #
+    # Parameters:
+    #   - ttl (float): Seconds a conversation is kept after its last turn.
+    #   - max_conversations (int): Upper bound on stored conversations
+    #     (least recently used are evicted first).
+    # ------------------------------------------------------------
+    def __init__(self, ttl: float = 86400, max_conversations: int = 10000):
+        self.ttl = ttl
+        self.max_conversations = max(1, max_conversations)
+        self.__lock = threading.Lock()
+        # conversation_id -> {"summary", "turns", "expires_at"}
+        self.__entries = OrderedDict()
+
+    # ------------------------------------------------------------
+    # Method: get
+    # Description:
+    #   Returns {"summary", "turns"} of a live conversation, or None.
+    # ------------------------------------------------------------
+    def get(self, conversation_id: str):
+        with self.__lock:
+            entry = self.__entries.get(conversation_id)
+            if entry is None:
+                return None
+            if entry["expires_at"] <= time.monotonic():
+                del self.__entries[conversation_id]
+                return None
+            self.__entries.move_to_end(conversation_id)
+            return {"summary": entry["summary"], "turns": list(entry["turns"])}
+
+    # ------------------------------------------------------------
+    # Method: append
+    # Description:
+    #   Adds a turn and returns the updated {"summary", "turns"}.
+    # ------------------------------------------------------------
+    def append(self, conversation_id: str, question: str, answer: str) -> dict:
+        now = time.monotonic()
+        with self.__lock:
+            entry = self.__entries.get(conversation_id)
+            if entry is None or entry["expires_at"] <= now:
+                entry = {"summary": "", "turns": []}
+                self.__entries[conversation_id] = entry
+            entry["turns"].append({"question": question, "answer": answer})
+            entry["expires_at"] = now + self.ttl
+            self.__entries.move_to_end(conversation_id)
+            self.__evict(now)
+            return {"summary": entry["summary"], "turns": list(entry["turns"])}
+
+    # ------------------------------------------------------------
+    # Method: compact
+    # Description:
+    #   Replaces the summary and drops the `summarized` oldest turns.
+    # ------------------------------------------------------------
+    def compact(self, conversation_id: str, summary: str, summarized: int):
+        with self.__lock:
+            entry = self.__entries.get(conversation_id)
+            if entry is not None:
+                entry["summary"] = summary
+                del entry["turns"][:summarized]
+
+    # ------------------------------------------------------------
+    # Method: clear
+    # Description:
+    #   Forgets a conversation.
+    # ------------------------------------------------------------
+    def clear(self, conversation_id: str):
+        with self.__lock:
+            self.__entries.pop(conversation_id, None)
+
+    # ------------------------------------------------------------
+    # Method: __evict
+    # Description:
+    #   Drops expired and least recently used conversations while
+    #   the store is over its size bound.
+    # ------------------------------------------------------------
+    def __evict(self, now: float):
+        while self.__entries:
+            oldest_id, oldest = next(iter(self.__entries.items()))
+            if oldest["expires_at"] > now and len(self.__entries) <= self.max_conversations:
+                break
+            del self.__entries[oldest_id]
+
+
+class SqlConversationStore:
+    # ------------------------------------------------------------
+    # Method: __init__
+    # Description:
+    #   Uses the `conversations` table.
+    #
+    # Parameters:
+    #   - ttl (float): Seconds a conversation is kept after its last turn.
+    #   - purge_every (int): Expired rows are deleted once every
+    #     `purge_every` appended turns.
+    # ------------------------------------------------------------
+    def __init__(self, ttl: float = 86400, purge_every: int = 500):
+        self.ttl = ttl
+        self.purge_every = max(1, purge_every)
+        self.__lock = threading.Lock()
+        self.__appends = 0
+
+    # ------------------------------------------------------------
+    # Method: get / append / compact / clear
+    # Description:
+    #   Same contract as MemoryConversationStore, backed by the
+    #   `conversations` table. Errors are raised to ConversationMemory.
+    # ------------------------------------------------------------
+    def get(self, conversation_id: str):
+        session = db.get_db()
+        try:
+            return conversation_crud.get_conversation(session, conversation_id)
+        except Exception:
+            session.rollback()
+            raise
+
+    def append(self, conversation_id: str, question: str, answer: str) -> dict:
+        session = db.get_db()
+        try:
+            conversation = conversation_crud.append_turn(session, conversation_id, question, answer, self.ttl)
+        except Exception:
+            session.rollback()
+            raise
+
+        with self.__lock:
+            self.__appends += 1
+            purge = self.__appends % self.purge_every == 0
+        if purge:
+            try:
+                conversation_crud.purge_expired(session)
+            except Exception as e:
+                session.rollback()
+                logger.warning(f"Purging expired conversations failed: {str(e)}")
+        return conversation
+
+    def compact(self, conversation_id: str, summary: str, summarized: int):
+        session = db.get_db()
+        try:
+            conversation_crud.compact_conversation(session, conversation_id, summary, summarized)
+        except Exception:
+            session.rollback()
+            raise
+
+    def clear(self, conversation_id: str):
+        session = db.get_db()
+        try:
+            conversation_crud.delete_conversation(session, conversation_id)
+        except Exception:
+            session.rollback()
+            raise
+
+
+class ConversationMemory:
+    # ------------------------------------------------------------
+    # Method: __init__
+    # Description:
+    #   Wraps a store with the size limits of the history.
+    #
+    # Parameters:
+    #   - store: MemoryConversationStore or SqlConversationStore.
+    #   - max_turns (int): Recent turns kept verbatim.
+    #   - max_turn_chars (int): Longer questions / answers are cut.
+    #   - max_summary_chars (int): Longer summaries are cut.
+    # ------------------------------------------------------------
+    def __init__(self, store, max_turns: int = 6, max_turn_chars: int = 2000, max_summary_chars: int = 2000):
+        self.store = store
+        self.max_turns = max(1, max_turns)
+        self.max_turn_chars = max(1, max_turn_chars)
+        self.max_summary_chars = max(1, max_summary_chars)
+        self.__lock = threading.Lock()
+        self.__compacting = set()
+
+    # ------------------------------------------------------------
+    # Method: history
+    # Description:
+    #   Returns {"summary", "turns"} of a conversation, or None when
+    #   it is new, expired or the store is unavailable.
+    # ------------------------------------------------------------
+    def history(self, conversation_id: str):
+        try:
+            history = self.store.get(conversation_id)
+        except Exception as e:
+            logger.warning(f"Loading conversation '{conversation_id}' failed: {str(e)}")
+            return None
+        if not history or (not history["summary"] and not history["turns"]):
+            return None
+        return history
+
+    # ------------------------------------------------------------
+    # Method: remember
+    # Description:
+    #   Stores a question/answer turn.
+    #
+    # Returns:
+    #   - bool: True when the conversation has more than `max_turns`
+    #     turns and should be compacted (see `compact`).
+    # ------------------------------------------------------------
+    def remember(self, conversation_id: str, question: str, answer: str) -> bool:
+        try:
+            conversation = self.store.append(
+                conversation_id,
+                question[:self.max_turn_chars],
+                answer[:self.max_turn_chars],
+            )
+        except Exception as e:
+            logger.warning(f"Saving conversation '{conversation_id}' failed: {str(e)}")
+            return False
+        return len(conversation["turns"]) > self.max_turns
+
+    # ------------------------------------------------------------
+    # Method: compact
+    # Description:
+    #   Folds the turns beyond `max_turns` into the rolling summary.
+    #   Only one compaction per conversation runs at a time (per
+    #   process); failures keep the turns for the next attempt.
+    #
+    # Parameters:
+    #   - summarize (callable): (summary, turns) -> new summary.
+    # ------------------------------------------------------------
+    def compact(self, conversation_id: str, summarize):
+        with self.__lock:
+            if conversation_id in self.__compacting:
+                return
+            self.__compacting.add(conversation_id)
+        try:
+            history = self.store.get(conversation_id)
+            if not history or len(history["turns"]) <= self.max_turns:
+                return
+            overflow = history["turns"][:len(history["turns"]) - self.max_turns]
+            summary = summarize(history["summary"], overflow)
+            self.store.compact(conversation_id, (summary or "").strip()[:self.max_summary_chars], len(overflow))
+        except Exception as e:
+            logger.warning(f"Summarizing conversation '{conversation_id}' failed: {str(e)}")
+        finally:
+            with self.__lock:
+                self.__compacting.discard(conversation_id)
+
+    # ------------------------------------------------------------
+    # Method: clear
+    # Description:
+    #   Forgets a conversation (e.g. the user restarts the chat).
+    # ------------------------------------------------------------
+    def clear(self, conversation_id: str):
+        try:
+            self.store.clear(conversation_id)
+        except Exception as e:
+            logger.warning(f"Clearing conversation '{conversation_id}' failed: {str(e)}")
+
+    # ------------------------------------------------------------
+    # Method: format
+    # Description:
+    #   Renders a history as prompt text.
+    # ------------------------------------------------------------
+    @staticmethod
+    def format(history: dict) -> str:
+        lines = []
+        if history.get("summary"):
+            lines.append(f"Summary of earlier conversation: {history['summary']}")
+        for turn in history.get("turns", []):
+            lines.append(f"User: {turn['question']}")
+            lines.append(f"Assistant: {turn['answer']}")
+        return "\n".join(lines)
+
+
+# ------------------------------------------------------------
+# Shared process-wide memory, selected by CONVERSATION_BACKEND
+# ('memory' or 'sql')
+# ------------------------------------------------------------
+if str(config("CONVERSATION_BACKEND", default="memory")).strip().lower() == "sql":
+    _conversation_store = SqlConversationStore(ttl=float(config("CONVERSATION_TTL", default=86400)))
+else:
+    _conversation_store = MemoryConversationStore(
+        ttl=float(config("CONVERSATION_TTL", default=86400)),
+        max_conversations=int(config("CONVERSATION_MAX_CONVERSATIONS", default=10000)),
+    )
+
+conversation_memory = ConversationMemory(
+    _conversation_store,
+    max_turns=int(config("CONVERSATION_MAX_TURNS", default=6)),
+    max_turn_chars=int(config("CONVERSATION_TURN_MAX_CHARS", default=2000)),
+    max_summary_chars=int(config("CONVERSATION_SUMMARY_MAX_CHARS", default=2000)),
+)
@@ -1,11 +1,14 @@
-import db
+import asyncio
+import hashlib
 import os
+import tempfile
 from decouple import config
 from dotenv import load_dotenv
 from sql.cruds import documents as document_crud
+from sql.cruds import ingestion_jobs as ingestion_job_crud
 import uuid
-from services.langchain_service import LangchainService
-from services.document_ingestion_service import DocumentIngestionService
+from services.answer_cache import answer_cache
+from services.ingestion_queue import ingestion_queue
 import validators
 from middleware.auth_middleware import get_current_employee
 
@@ -16,6 +19,7 @@ from middleware.auth_middleware import get_current_employee
 #   Handles creation, retrieval, deletion, and ingestion of
 #   documents (file or URL-based). Integrates with LangChain
 #   and OpenAI models for indexing, vectorization, and search.
+#   Instances are request-scoped; see services.container.
 # ------------------------------------------------------------
 
 load_dotenv()
@@ -25,14 +29,18 @@ class DocumentService:
     # ------------------------------------------------------------
     # Constructor
     # Description:
-    #   Initializes the database connection, document directory,
-    #   OpenAI/LangChain service instance, and ingestion service.
+    #   Receives its dependencies from the service container:
+    #   - db_session: SQLAlchemy session of the current request.
+    #   - langchain_service / ingestion_service: providers (callables)
+    #     of the process-wide singletons, resolved only when needed.
     # ------------------------------------------------------------
-    def __init__(self):
-        self.__db = db.get_db()
+    def __init__(self, db_session, langchain_service, ingestion_service):
+        self.__db = db_session
+        self.__langchain_service = langchain_service
+        self.__ingestion_service = ingestion_service
         self.__dir_name = str(config("DIR_NAME")).strip()
-        self.__opne_ai_model = LangchainService()
-        self.__ingestion_service = DocumentIngestionService()
+        self.__upload_max_bytes = int(config("UPLOAD_MAX_BYTES", default=50 * 1024 * 1024))
+        self.__upload_chunk_size = int(config("UPLOAD_CHUNK_SIZE", default=1024 * 1024))
 
     # ------------------------------------------------------------
     # Method: create_document
@@ -40,47 +48,230 @@ class DocumentService:
     #   Handles local file upload and database record creation.
     #   - Validates user access (admin only).
     #   - Prevents duplicate file names.
-    #   - Saves file to disk and stores metadata in the database.
+    #   - Streams the file to disk while hashing it, and rejects
+    #     content that is already stored under any name.
+    #   - Stores metadata in the database.
+    #   - Queues the file for immediate ingestion.
+    #   Database and file work runs in worker threads, so the event
+    #   loop only awaits the upload stream.
     # ------------------------------------------------------------
-    def create_document(self, file, type: str):
+    async def create_document(self, file, type: str):
+        pending_upload = None
         try:
             employee = get_current_employee()
-            if not employee and employee.employee_type != 'admin':
+            if not employee or employee.employee_type != 'admin':
                 raise PermissionError("Access denied")
 
             # Check for duplicate document names
             filename = (f'{file.filename}').strip()
-            exist_document = document_crud._get_document_by_original_name(self.__db, filename)
+            exist_document = await asyncio.to_thread(
+                document_crud._get_document_by_original_name, self.__db, filename
+            )
             if exist_document:
                 raise ValueError(
                     "Please rename this file because it already exists in our records."
                 )
 
-            # Ensure directory exists
-            os.makedirs(self.__dir_name, exist_ok=True)
-
-            # Generate unique file name
-            extension = os.path.splitext(file.filename)[1].lower()
-            file_name = f"{type}_{uuid.uuid4().hex}{extension}"
-            file_path = os.path.join(self.__dir_name, file_name)
-
-            # Save file to disk
-            with open(file_path, "wb") as out_file:
-                out_file.write(file.file.read())
+            # Save file to disk; duplicates by content are rejected before
+            # any record or ingestion job is created
+            file_name, content_hash = await self._store_upload(file, type)
+            pending_upload = file_name
 
             # Create DB record
             doc_data = {
                 "original_path": filename,
                 "doc_path": file_name,
-                "type": type
+                "type": type,
+                "content_hash": content_hash
             }
 
-            doc = document_crud.create_doc(self.__db, doc_data, employee.id)
+            doc = await asyncio.to_thread(document_crud.create_doc, self.__db, doc_data, employee.id)
+            pending_upload = None
+            await asyncio.to_thread(ingestion_job_crud.get_or_create_job, self.__db, doc.id)  # type: ignore
+            ingestion_queue.submit(file_name)
             return doc
 
         except Exception as e:
+            await asyncio.to_thread(self._discard_upload, pending_upload)
             raise ProcessLookupError(str(e))
 
+    # ------------------------------------------------------------
+    # Method: replace_document
+    # Description:
+    #   Replaces the file of an existing document.
+    #   - Validates user access (admin only).
+    #   - Saves the new file and removes the old one. Re-uploading the
+    #     current content is a no-op; content of another document is
+    #     rejected.
+    #   - Re-queues ingestion; chunk ids are derived from the document
+    #     id and chunk content, so only changed chunks are embedded and
+    #     removed chunks are deleted.
+    #   Database and file work runs in worker threads.
+    # ------------------------------------------------------------
+    async def replace_document(self, id: int, file):
+        pending_upload = None
+        try:
+            employee = get_current_employee()
+            if not employee or employee.employee_type != 'admin':
+                raise PermissionError("Access denied")
+
+            document = await asyncio.to_thread(document_crud._get_document_by_id, self.__db, id)
+            if not document:
+                raise ValueError("Document not found for the provided ID.")
+            if validators.url(str(document.doc_path)):
+                raise ValueError("URL documents cannot be replaced by a file upload.")
+
+            file_name, content_hash = await self._store_upload(file, str(document.type), document.id)  # type: ignore
+            if file_name is None:
+                return document
+            pending_upload = file_name
+            old_path = os.path.join(self.__dir_name, str(document.doc_path))
+            # Chunks were stored under the path before the '_' processed prefix
+            old_source = os.path.join(self.__dir_name, str(document.doc_path).lstrip('_'))
+
+            await asyncio.to_thread(
+                self._update_document_file, document, (f'{file.filename}').strip(), file_name, content_hash
+            )
+            pending_upload = None
+            await asyncio.to_thread(self._finish_replace, document, old_path, old_source)
+            ingestion_queue.submit(file_name)
+            return document
+
+        except Exception as e:
+            await asyncio.to_thread(self._discard_upload, pending_upload)
+            raise ProcessLookupError(str(e))
+
+    # ------------------------------------------------------------
+    # Method: _update_document_file / _finish_replace
+    # Description:
+    #   Blocking steps of replace_document: point the record at the
+    #   new file, then remove the old file, drop chunks of the old
+    #   file that predate document-keyed chunk ids (the next sync
+    #   only finds chunks by document id or the new path) and reset
+    #   the ingestion job.
+    # ------------------------------------------------------------
+    def _update_document_file(self, document, original_path: str, file_name: str, content_hash: str):
+        document.original_path = original_path
+        document.doc_path = file_name
+        document.content_hash = content_hash
+        self.__db.add(document)
+        self.__db.commit()
+        self.__db.refresh(document)
+
+    def _finish_replace(self, document, old_path: str, old_source: str):
+        if os.path.exists(old_path):
+            os.remove(old_path)
+        self.__langchain_service().delete_legacy_chunks(old_source)
+
+        job = ingestion_job_crud.get_or_create_job(self.__db, document.id)  # type: ignore
+        ingestion_job_crud.reset_job(self.__db, job)
+
+    # ------------------------------------------------------------
+    # Method: _store_upload
+    # Description:
+    #   Streams an uploaded file to disk in UPLOAD_CHUNK_SIZE chunks,
+    #   computing its sha256 on the way.
+    #   - Fails once the upload exceeds UPLOAD_MAX_BYTES.
+    #   - Writes to a '_'-prefixed temporary file (ignored by the
+    #     ingestion queue and scan) and renames it to a unique name
+    #     only once the content is known to be new.
+    #   - Disk writes and the duplicate lookup run in worker threads.
+    #
+    # Parameters:
+    #   - document_id (int | None): Document being replaced; uploading
+    #     its current content returns (None, hash) without storing.
+    #
+    # Returns:
+    #   - tuple[str | None, str]: (stored file name, content hash)
+    # ------------------------------------------------------------
+    async def _store_upload(self, file, type: str, document_id: int | None = None):
+        out_file = await asyncio.to_thread(self._open_upload)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            try:
+                while chunk := await file.read(self.__upload_chunk_size):
+                    size += len(chunk)
+                    if size > self.__upload_max_bytes:
+                        raise ValueError(
+                            f"File exceeds the maximum upload size of {self.__upload_max_bytes} bytes."
+                        )
+                    await asyncio.to_thread(self._write_chunk, out_file, digest, chunk)
+            finally:
+                await asyncio.to_thread(out_file.close)
+
+            return await asyncio.to_thread(
+                self._keep_upload, out_file.name, digest.hexdigest(), file.filename, type, document_id
+            )
+
+        except Exception:
+            await asyncio.to_thread(self._remove_file, out_file.name)
+            raise
+
+    # ------------------------------------------------------------
+    # Method: _open_upload / _write_chunk / _remove_file
+    # Description:
+    #   Blocking file operations of _store_upload.
+    # ------------------------------------------------------------
+    def _open_upload(self):
+        # Ensure directory exists
+        os.makedirs(self.__dir_name, exist_ok=True)
+        return tempfile.NamedTemporaryFile(
+            dir=self.__dir_name, prefix="_upload_", suffix=".part", delete=False
+        )
+
+    @staticmethod
+    def _write_chunk(out_file, digest, chunk: bytes):
+        digest.update(chunk)
+        out_file.write(chunk)
+
+    @staticmethod
+    def _remove_file(path: str):
+        if os.path.exists(path):
+            os.remove(path)
+
+    # ------------------------------------------------------------
+    # Method: _keep_upload
+    # Description:
+    #   Rejects content already stored by another document, then
+    #   moves the temporary file to a unique name.
+    #
+    # Returns:
+    #   - tuple[str | None, str]: (stored file name, content hash);
+    #     the name is None when `document_id` already has this content.
+    # ------------------------------------------------------------
+    def _keep_upload(self, temp_path: str, content_hash: str, filename: str, type: str,
+                     document_id: int | None = None):
+        existing = document_crud._get_document_by_content_hash(self.__db, content_hash)
+        if existing and existing.id == document_id:
+            os.remove(temp_path)
+            return None, content_hash
+        if existing:
+            raise ValueError(
+                f"This file has already been uploaded as '{existing.original_path}'."
+            )
+
+        # Generate unique file name
+        extension = os.path.splitext(filename)[1].lower()
+        file_name = f"{type}_{uuid.uuid4().hex}{extension}"
+        os.replace(temp_path, os.path.join(self.__dir_name, file_name))
+        return file_name, content_hash
+
+    # ------------------------------------------------------------
+    # Method: _discard_upload
+    # Description:
+    #   Removes a stored upload whose request failed afterwards
+    #   (e.g. a concurrent upload of the same content won the
+    #   unique content_hash constraint).
+    # ------------------------------------------------------------
+    def _discard_upload(self, file_name: str | None):
+        if not file_name:
+            return
+        self.__db.rollback()
+        file_path = os.path.join(self.__dir_name, file_name)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
     # ------------------------------------------------------------
     # Method: read_documents
     # Description:
@@ -161,13 +352,14 @@ class DocumentService:
                     file_path = os.path.join(self.__dir_name, _path)
                     if os.path.exists(file_path):
                         os.remove(file_path)
-                        filepath = file_path.replace('_', '')
+                    # Chunks were stored under the path before the '_' processed prefix
+                    filepath = os.path.join(self.__dir_name, _path.lstrip('_'))
 
                 # Delete vectors from LangChain store
-                if filepath != '':
-                    self.__opne_ai_model._delete_documents(filepath)
+                self.__langchain_service()._delete_documents(filepath, id)
 
                 self.__db.commit()
+                answer_cache.invalidate()
                 return "Document has been deleted successfully."
 
             raise ValueError("Document not found for the provided ID.")
@@ -180,8 +372,9 @@ class DocumentService:
     # Description:
     #   Creates a new document entry from a remote file or webpage URL.
     #   - Validates admin access.
-    #   - Uses DocumentIngestionService to process and index the file.
-    #   - Stores metadata in the database for retrieval.
+    #   - Stores metadata in the database.
+    #   - Queues the URL on the async fetcher and returns right away
+    #     with the ingestion job id (poll GET /doc/{id}/status).
     # ------------------------------------------------------------
     def create_url_document(self, url, type: str):
         try:
@@ -189,8 +382,6 @@ class DocumentService:
             if not employee and employee.employee_type != 'admin':
                 raise PermissionError("Access denied")
 
-            # Ingest document from URL into vector stores
-            self.__ingestion_service.ingest_file(url, type)
             filename = url.split('/')[-1]
 
             # Create DB record
@@ -201,8 +392,54 @@ class DocumentService:
             }
 
             doc = document_crud.create_doc(self.__db, doc_data, employee.id)
-            return doc
+            job = ingestion_job_crud.get_or_create_job(self.__db, doc.id)  # type: ignore
+
+            # Fetch and ingest in the background (tracked as a job)
+            self.__ingestion_service().submit_url(doc.id, url, type)  # type: ignore
+            return {
+                "document": doc,
+                "job_id": job.id,
+                "status": job.status
+            }
 
         except Exception as e:
             print(f"Exception {str(e)}")
             raise ProcessLookupError(str(e))
+
+    # ------------------------------------------------------------
+    # Method: read_document_status
+    # Description:
+    #   Returns the ingestion job status of a document and, for
+    #   files, the live progress of the ingestion pipeline (chunks
+    #   parsed / embedded while a large file is being processed).
+    # ------------------------------------------------------------
+    def read_document_status(self, id: int):
+        try:
+            document = document_crud._get_document_by_id(self.__db, id)
+            if not document:
+                raise ValueError("Document not found for the provided ID.")
+
+            progress = None
+            if not validators.url(str(document.doc_path)):
+                progress = self.__ingestion_service().file_progress(str(document.doc_path))
+
+            job = ingestion_job_crud.get_job_by_document_id(self.__db, id)
+            if not job:
+                return {"document_id": id, "status": "unknown", "attempts": 0, "progress": progress}
+
+            return {
+                "document_id": id,
+                "status": job.status,
+                "attempts": job.attempts,
+                "error": job.error,
+                "chunk_count": job.chunk_count,
+                "content_hash": job.content_hash,
+                "next_attempt_at": job.next_attempt_at,
+                "started_at": job.started_at,
+                "finished_at": job.finished_at,
+                "duration_ms": job.duration_ms,
+                "progress": progress,
+            }
+
+        except Exception as e:
+            raise ProcessLookupError(str(e))
@@ -1,9 +1,18 @@
+import asyncio
+import hashlib
 import os
-from uuid import uuid4
+import threading
+from datetime import datetime
+from decouple import config
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from services.langchain_service import LangchainService
 from services.document_reader import DocumentReader
+from services.answer_cache import answer_cache
+from services.ingestion_pipeline import IngestionPipeline
+from services.ingestion_queue import ingestion_queue
+from services.url_fetcher import url_fetcher
 from sql.cruds import documents as document_crud
+from sql.cruds import ingestion_jobs as ingestion_job_crud
 from utils.logger import logger
 import db
 
@@ -20,9 +29,11 @@ import db
 class DocumentIngestionService:
     # ------------------------------------------------------------
     # Initialize Dependencies
+    # `langchain_service` is normally the shared instance from
+    # services.container.
     # ------------------------------------------------------------
-    def __init__(self):
-        self.langchain_service = LangchainService()
+    def __init__(self, langchain_service: LangchainService | None = None):
+        self.langchain_service = langchain_service or LangchainService()
         self.document_reader = DocumentReader()
         self.__db = db.get_db()
 
@@ -31,96 +42,401 @@ class DocumentIngestionService:
         self.chunk_size = 1000
         self.chunk_overlap = 100
 
-        # Initialize vector stores
-        self.public_vector_store = self.langchain_service.chroma_public_store()
-        self.private_vector_store = self.langchain_service.chroma_private_store()
+        # Serializes queue-triggered jobs and reconciliation scans
+        self.__run_lock = threading.Lock()
+
+        # Retry policy for failed ingestion jobs
+        self.max_attempts = int(config("INGESTION_MAX_ATTEMPTS", default=5))
+        self.retry_base_delay = float(config("INGESTION_RETRY_BASE_DELAY", default=30))
+        self.retry_max_delay = float(config("INGESTION_RETRY_MAX_DELAY", default=3600))
+
+        # Parallel pipeline used by main_loop for bulk ingestion
+        self.pipeline = IngestionPipeline(
+            self.langchain_service,
+            parse_workers=int(config("INGESTION_PARSE_WORKERS", default=2)),
+            embed_workers=int(config("INGESTION_EMBED_WORKERS", default=4)),
+            batch_size=int(config("INGESTION_BATCH_SIZE", default=64)),
+            queue_size=int(config("INGESTION_QUEUE_SIZE", default=16)),
+            chunk_size=self.chunk_size,
+            chunk_overlap=self.chunk_overlap,
+            pages_per_task=int(config("INGESTION_PAGES_PER_TASK", default=25)),
+        )
 
     # ------------------------------------------------------------
     # Function: ingest_file
     # Description:
-    #   Reads and processes a file, splits it into text chunks, and
-    #   uploads the resulting documents to the appropriate vector store.
+    #   Reads and processes a file, splits it into text chunks lazily
+    #   (page by page), and uploads them in fixed-size batches to the
+    #   appropriate vector store.
     #   - Supports both 'public' and 'private' storage.
-    #   - Automatically handles unique document IDs for vector indexing.
+    #   - Uses deterministic chunk ids, so re-ingesting a source only
+    #     embeds chunks that changed.
+    # ------------------------------------------------------------
+    def ingest_file(self, path: str, type: str = 'public', document_id: int | None = None) -> bool:
+        return self._ingest(path, type, document_id) is not None
+
+    # ------------------------------------------------------------
+    # Function: _ingest
+    # Description:
+    #   Implementation of ingest_file.
+    #   `documents` may hold already loaded content (e.g. a fetched
+    #   URL); otherwise `path` is read lazily.
+    #
+    # Returns:
+    #   - int | None: Number of chunks written, or None on failure.
     # ------------------------------------------------------------
-    def ingest_file(self, path: str, type: str = 'public') -> bool:
+    def _ingest(self, path: str, type: str = 'public', document_id: int | None = None,
+                documents: list | None = None) -> int | None:
         try:
             logger.info(f"Starting ingestion for file: {path} | Type: {type}")
 
-            # Load and split the document into smaller chunks
-            loaded_documents = self.document_reader.file_loader(path)
+            # Lazily load and split the document into smaller chunks
             text_splitter = RecursiveCharacterTextSplitter(
                 chunk_size=self.chunk_size,
                 chunk_overlap=self.chunk_overlap,
                 length_function=len,
                 separators=["\n", " ", ""]
             )
-            documents = text_splitter.split_documents(loaded_documents)
-            uuids = [str(uuid4()) for _ in range(len(documents))]
+            if documents is None:
+                chunks = self.document_reader.iter_chunks(path, text_splitter)
+            else:
+                chunks = (chunk for document in documents for chunk in text_splitter.split_documents([document]))
 
-            logger.info(f"Prepared {len(documents)} document chunks for vector storage.")
+            # Add new chunks / drop removed ones batch by batch based on type
+            logger.info(f"Syncing {type} vector storage...")
+            result = self.langchain_service.sync_documents(
+                chunks, type, document_id, path, batch_size=self.pipeline.batch_size
+            )
+            chunk_count = result["added"] + result["kept"]
+            logger.info(f"Stored {chunk_count} document chunks for vector storage.")
 
-            # Add documents to vector stores based on type
-            if type == 'private':
-                logger.info("Uploading to private vector store...")
-                self.private_vector_store.add_documents(documents=documents, ids=uuids)
-            else:
-                logger.info("Uploading to both public and private vector stores...")
-                self.private_vector_store.add_documents(documents=documents, ids=uuids)
-                self.public_vector_store.add_documents(documents=documents, ids=uuids)
+            # Cached answers may be outdated now (public docs are visible to everyone)
+            answer_cache.invalidate('private' if type == 'private' else None)
 
             logger.info(f"File successfully ingested: {path}")
-            return True
+            return chunk_count
 
         except Exception as e:
             logger.error(f"Error ingesting file '{path}': {str(e)}", exc_info=True)
-            return False
+            return None
 
     # ------------------------------------------------------------
     # Function: main_loop
     # Description:
-    #   Continuously scans the `documents/` folder for unprocessed files.
+    #   Low-frequency reconciliation scan of the `documents/` folder.
+    #   New uploads are normally ingested right away through the
+    #   ingestion queue; this catches anything that was missed
+    #   (e.g. files copied in while the server was down).
+    # ------------------------------------------------------------
+    def main_loop(self) -> bool:
+        logger.info("Reconciliation scan started.")
+        try:
+            with os.scandir(self.data_folder) as entries:
+                filenames = [
+                    entry.name for entry in entries
+                    if entry.is_file() and not entry.name.startswith("_")
+                ]
+            self.process_files(filenames)
+            return True
+
+        except Exception as e:
+            logger.error(f"Error in main_loop: {str(e)}", exc_info=True)
+            return False
+
+    # ------------------------------------------------------------
+    # Function: process_files
+    # Description:
+    #   Ingests the given files (names relative to `documents/`).
     #   - Detects document type (public/private) from filename.
-    #   - Ingests each new file into vector stores.
+    #   - Skips files whose ingestion job is dead or still backing off,
+    #     and files whose exact content was already ingested.
+    #   - Ingests all remaining files in parallel through the pipeline.
+    #   - Records the outcome in the `ingestion_jobs` table and
+    #     re-queues failed files after their backoff delay.
     #   - Renames processed files by prefixing with '_'.
     #   - Updates the document path in the database.
+    #
+    # Returns:
+    #   - list[str]: Paths of the files that were ingested.
     # ------------------------------------------------------------
-    def main_loop(self) -> bool:
-        logger.info("Background scheduler main_loop started.")
+    def process_files(self, filenames: list[str]) -> list[str]:
         processed_files = []
 
-        try:
-            for filename in os.listdir(self.data_folder):
-                if not filename.startswith("_"):
-                    file_path = os.path.join(self.data_folder, filename)
-                    doc_type = 'private' if filename.startswith('private') else 'public'
+        with self.__run_lock:
+            pending = []
+            document_ids = {}
+            jobs = {}
+            for filename in filenames:
+                file_path = os.path.join(self.data_folder, filename)
+                # Already handled by an earlier job or removed meanwhile
+                if filename.startswith("_") or not os.path.isfile(file_path):
+                    continue
 
-                    logger.info(f"Processing new file: {filename} | Type: {doc_type}")
-                    success = self.ingest_file(file_path, doc_type)
+                document = document_crud._get_document_by_dir_name(self.__db, filename)
+                if document:
+                    job = ingestion_job_crud.get_or_create_job(self.__db, document.id)  # type: ignore
+                    if not ingestion_job_crud.is_due(job):
+                        logger.info(f"Skipping file, ingestion job is {job.status}: {filename}")
+                        continue
 
-                    if not success:
-                        logger.warning(f"Skipping file due to ingestion failure: {filename}")
+                    content_hash = self._file_hash(file_path)
+                    if job.status == "succeeded" and job.content_hash == content_hash:
+                        logger.info(f"Content already ingested, marking as processed: {filename}")
+                        self._mark_processed(filename)
                         continue
 
-                    # Mark the document as processed in DB
-                    new_filename = "_" + filename
-                    document = document_crud._get_document_by_dir_name(self.__db, filename)
+                    jobs[file_path] = ingestion_job_crud.mark_running(self.__db, job, content_hash)
+                    document_ids[file_path] = document.id
 
-                    if document:
-                        document.doc_path = str(new_filename)  # type: ignore
-                        self.__db.add(document)
-                        self.__db.commit()
-                        self.__db.refresh(document)
-                        logger.debug(f"Updated DB record for file: {filename}")
+                doc_type = 'private' if filename.startswith('private') else 'public'
+                logger.info(f"Processing new file: {filename} | Type: {doc_type}")
+                pending.append((file_path, doc_type, document_ids.get(file_path)))
 
-                    # Rename processed file
-                    new_file_path = os.path.join(self.data_folder, new_filename)
-                    os.rename(file_path, new_file_path)
-                    processed_files.append(file_path)
+            if not pending:
+                return processed_files
 
-            logger.info(f"Main loop completed. Total files processed: {len(processed_files)}")
-            return True
+            results = self.pipeline.run(pending)
+            progress = self.pipeline.progress()
+
+            for file_path, doc_type, _ in pending:
+                filename = os.path.basename(file_path)
+                job = jobs.get(file_path)
+                state = progress.get(file_path, {})
+
+                if not results.get(file_path):
+                    logger.warning(f"Skipping file due to ingestion failure: {filename}")
+                    if job:
+                        self._record_failure(job, state.get("error") or "Ingestion failed", filename)
+                    continue
+
+                if job:
+                    ingestion_job_crud.mark_succeeded(self.__db, job, state.get("chunks", 0))
+                self._mark_processed(filename)
+                processed_files.append(file_path)
+
+            if processed_files:
+                # Public docs are visible to everyone, so clear both namespaces
+                private_only = all(t == 'private' for p, t, _ in pending if p in processed_files)
+                answer_cache.invalidate('private' if private_only else None)
+
+        logger.info(f"Ingestion completed. Total files processed: {len(processed_files)}")
+        return processed_files
+
+    # ------------------------------------------------------------
+    # Function: file_progress
+    # Description:
+    #   Returns the pipeline progress of a document file (by its
+    #   name, with or without the '_' processed prefix), or None when
+    #   no pipeline run has seen it since the server started.
+    # ------------------------------------------------------------
+    def file_progress(self, filename: str) -> dict | None:
+        return self.pipeline.progress().get(os.path.join(self.data_folder, filename.lstrip('_')))
+
+    # ------------------------------------------------------------
+    # Function: _record_failure
+    # Description:
+    #   Marks a job as failed (or dead) and, unless dead, re-queues
+    #   the file once its backoff delay has passed.
+    # ------------------------------------------------------------
+    def _record_failure(self, job, error: str, filename: str | None = None):
+        job = ingestion_job_crud.mark_failed(
+            self.__db,
+            job,
+            error,
+            max_attempts=self.max_attempts,
+            base_delay=self.retry_base_delay,
+            max_delay=self.retry_max_delay,
+        )
+        if job.status == "dead":
+            logger.error(f"Ingestion job moved to dead-letter after {job.attempts} attempts: {filename}")
+        elif filename and job.next_attempt_at:
+            delay = (job.next_attempt_at - datetime.now()).total_seconds()
+            ingestion_queue.submit(filename, delay=max(0.0, delay))
+        return job
+
+    # ------------------------------------------------------------
+    # Function: submit_url
+    # Description:
+    #   Queues ingestion of a URL document on the async URL fetcher
+    #   and returns immediately (a concurrent.futures.Future).
+    # ------------------------------------------------------------
+    def submit_url(self, document_id: int, url: str, type: str = 'public', delay: float = 0.0):
+        return url_fetcher.submit(self.aingest_url(document_id, url, type), delay=delay)
+
+    # ------------------------------------------------------------
+    # Function: refresh_urls
+    # Description:
+    #   Periodic re-crawl of all URL documents (run by the scheduler).
+    #   Each due document is queued on the URL fetcher, which sends a
+    #   conditional GET and re-ingests only pages whose content hash
+    #   changed; per-host limits keep the crawl polite.
+    #
+    # Returns:
+    #   - int: Number of URL documents queued.
+    # ------------------------------------------------------------
+    def refresh_urls(self) -> int:
+        try:
+            session = db.get_db()
+            queued = 0
+            for document in document_crud.list_url_documents(session):
+                job = ingestion_job_crud.get_job_by_document_id(session, document.id)  # type: ignore
+                if job and not ingestion_job_crud.is_due(job):
+                    continue
+                self.submit_url(document.id, str(document.doc_path), str(document.type))  # type: ignore
+                queued += 1
+
+            logger.info(f"URL refresh queued {queued} documents.")
+            return queued
 
         except Exception as e:
-            logger.error(f"Error in main_loop: {str(e)}", exc_info=True)
+            logger.error(f"Error in refresh_urls: {str(e)}", exc_info=True)
+            return 0
+
+    # ------------------------------------------------------------
+    # Function: aingest_url
+    # Description:
+    #   Fetches a URL document through the pooled async client and
+    #   ingests it, tracking the attempt in `ingestion_jobs`.
+    #   - Sends the stored ETag / Last-Modified as a conditional GET;
+    #     a 304 or an identical content hash skips all embedding work.
+    #   - Database and embedding work runs in executor threads so the
+    #     fetcher loop keeps serving other downloads.
+    # ------------------------------------------------------------
+    async def aingest_url(self, document_id: int, url: str, type: str = 'public') -> bool:
+        loop = asyncio.get_running_loop()
+        previous = await loop.run_in_executor(None, self._start_url_job, document_id)
+        if previous is None:
+            return False
+
+        try:
+            fetched = await url_fetcher.fetch(url, previous["etag"], previous["last_modified"])
+        except Exception as e:
+            logger.warning(f"Fetching '{url}' failed: {str(e)}")
+            return await loop.run_in_executor(
+                None, self._finish_url_job, document_id, url, type, previous, None, f"Fetch failed: {str(e)}"
+            )
+
+        return await loop.run_in_executor(
+            None, self._finish_url_job, document_id, url, type, previous, fetched, None
+        )
+
+    # ------------------------------------------------------------
+    # Function: _start_url_job
+    # Description:
+    #   Starts an attempt for a URL document (in a worker thread).
+    #
+    # Returns:
+    #   - dict | None: Validators and content hash of the last
+    #     successful ingestion, or None when the job is not due.
+    # ------------------------------------------------------------
+    def _start_url_job(self, document_id: int) -> dict | None:
+        session = db.get_db()
+        if not document_crud._get_document_by_id(session, document_id):
+            return None
+
+        job = ingestion_job_crud.get_or_create_job(session, document_id)
+        if not ingestion_job_crud.is_due(job):
+            logger.info(f"Skipping URL document {document_id}, ingestion job is {job.status}")
+            return None
+
+        # Validators are only stored by successful runs
+        succeeded_before = job.chunk_count is not None
+        previous = {
+            "etag": job.etag if succeeded_before else None,
+            "last_modified": job.last_modified if succeeded_before else None,
+            "content_hash": job.content_hash if job.status == "succeeded" else None,
+        }
+        ingestion_job_crud.mark_running(session, job)
+        return previous
+
+    # ------------------------------------------------------------
+    # Function: _finish_url_job
+    # Description:
+    #   Parses and ingests a fetched URL document (in a worker
+    #   thread) and records the outcome. Failures are retried on the
+    #   fetcher with the job's backoff delay.
+    # ------------------------------------------------------------
+    def _finish_url_job(self, document_id: int, url: str, type: str, previous: dict,
+                        fetched: dict | None, error: str | None) -> bool:
+        session = db.get_db()
+        job = ingestion_job_crud.get_job_by_document_id(session, document_id)
+        if not job:
+            return False
+
+        if fetched is not None and fetched["not_modified"]:
+            logger.info(f"URL not modified, skipping re-ingestion: {url}")
+            ingestion_job_crud.mark_succeeded(session, job, job.chunk_count or 0)  # type: ignore
+            return True
+
+        chunk_count = None
+        if fetched is not None:
+            content_hash = hashlib.sha256(fetched["content"]).hexdigest()
+            if content_hash == previous["content_hash"]:
+                logger.info(f"URL content unchanged, skipping re-ingestion: {url}")
+                ingestion_job_crud.mark_succeeded(
+                    session, job, job.chunk_count or 0, fetched["etag"], fetched["last_modified"]  # type: ignore
+                )
+                return True
+
+            job.content_hash = content_hash  # type: ignore
+            try:
+                documents = self.document_reader.read_fetched(fetched["content"], fetched["content_type"], url)
+                chunk_count = self._ingest(url, type, document_id, documents)
+            except Exception as e:
+                logger.error(f"Parsing '{url}' failed: {str(e)}", exc_info=True)
+
+        if chunk_count is None:
+            job = ingestion_job_crud.mark_failed(
+                session,
+                job,
+                error or f"Ingestion failed for '{url}'",
+                max_attempts=self.max_attempts,
+                base_delay=self.retry_base_delay,
+                max_delay=self.retry_max_delay,
+            )
+            if job.status == "dead":
+                logger.error(f"URL ingestion job moved to dead-letter after {job.attempts} attempts: {url}")
+            elif job.next_attempt_at:
+                delay = (job.next_attempt_at - datetime.now()).total_seconds()
+                self.submit_url(document_id, url, type, delay=max(0.0, delay))
             return False
+
+        ingestion_job_crud.mark_succeeded(
+            session, job, chunk_count, fetched["etag"], fetched["last_modified"]  # type: ignore
+        )
+        logger.info(f"URL successfully ingested: {url}")
+        return True
+
+    # ------------------------------------------------------------
+    # Function: _file_hash
+    # Description:
+    #   sha256 of a file, read in 1 MiB blocks.
+    # ------------------------------------------------------------
+    @staticmethod
+    def _file_hash(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    # ------------------------------------------------------------
+    # Function: _mark_processed
+    # Description:
+    #   Prefixes an ingested file with '_' on disk and in the DB.
+    # ------------------------------------------------------------
+    def _mark_processed(self, filename: str):
+        new_filename = "_" + filename
+        document = document_crud._get_document_by_dir_name(self.__db, filename)
+
+        if document:
+            document.doc_path = str(new_filename)  # type: ignore
+            self.__db.add(document)
+            self.__db.commit()
+            self.__db.refresh(document)
+            logger.debug(f"Updated DB record for file: {filename}")
+
+        os.rename(
+            os.path.join(self.data_folder, filename),
+            os.path.join(self.data_folder, new_filename),
+        )
@@ -3,6 +3,9 @@ from langchain_community.document_loaders.text import TextLoader
 from langchain_community.document_loaders.word_document import Docx2txtLoader
 from langchain_community.document_loaders.csv_loader import CSVLoader
 from langchain_core.documents import Document
+from pypdf import PdfReader
+from typing import Iterator
+import io
 import validators
 import bs4
 
@@ -13,6 +16,8 @@ import bs4
 #   Provides utilities to read and load content from multiple
 #   file formats (PDF, DOCX, CSV, TXT) and web URLs into
 #   standardized LangChain Document objects for further processing.
+#   Also provides lazy (generator-based) readers so very large files
+#   can be chunked page by page without loading them fully.
 # ------------------------------------------------------------
 
 
@@ -45,6 +50,60 @@ class DocumentReader:
                 return self.read_text(file)
         return []
 
+    # ------------------------------------------------------------
+    # Method: lazy_file_loader
+    # Description:
+    #   Generator counterpart of `file_loader`.
+    #   - PDFs are yielded one page at a time (optionally a page range).
+    #   - Other formats use the loader's `lazy_load`.
+    # ------------------------------------------------------------
+    def lazy_file_loader(self, file: str, start: int = 0, stop: int | None = None) -> Iterator[Document]:
+        if not file:
+            return iter(())
+        if validators.url(file):
+            return WebBaseLoader(web_path=[file]).lazy_load()
+        elif file.endswith(".docx"):
+            return Docx2txtLoader(file).lazy_load()
+        elif file.endswith(".pdf"):
+            return self.iter_pdf_pages(file, start, stop)
+        elif file.endswith(".csv"):
+            return CSVLoader(file).lazy_load()
+        else:
+            return TextLoader(file_path=file).lazy_load()
+
+    # ------------------------------------------------------------
+    # Method: iter_chunks
+    # Description:
+    #   Lazily splits a file into chunks: each loaded page/section is
+    #   split and yielded before the next one is read.
+    # ------------------------------------------------------------
+    def iter_chunks(self, file: str, text_splitter, start: int = 0, stop: int | None = None) -> Iterator[Document]:
+        for document in self.lazy_file_loader(file, start, stop):
+            yield from text_splitter.split_documents([document])
+
+    # ------------------------------------------------------------
+    # Method: pdf_page_count
+    # Description:
+    #   Returns the number of pages of a PDF without extracting text.
+    # ------------------------------------------------------------
+    def pdf_page_count(self, file: str) -> int:
+        return len(PdfReader(file).pages)
+
+    # ------------------------------------------------------------
+    # Method: iter_pdf_pages
+    # Description:
+    #   Yields one Document per PDF page in [start, stop), with the
+    #   same metadata as PyPDFLoader (`source`, `page`).
+    # ------------------------------------------------------------
+    def iter_pdf_pages(self, file: str, start: int = 0, stop: int | None = None) -> Iterator[Document]:
+        reader = PdfReader(file)
+        stop = len(reader.pages) if stop is None else min(stop, len(reader.pages))
+        for index in range(start, stop):
+            yield Document(
+                page_content=reader.pages[index].extract_text() or "",
+                metadata={"source": file, "page": index},
+            )
+
     # ------------------------------------------------------------
     # Method: read_doc
     # Description:
@@ -85,6 +144,35 @@ class DocumentReader:
         web_page = WebBaseLoader(web_path=[path])
         return web_page.load()
 
+    # ------------------------------------------------------------
+    # Method: read_fetched
+    # Description:
+    #   Parses content that was already downloaded (see UrlFetcher)
+    #   into LangChain Document objects, so fetching and parsing are
+    #   decoupled.
+    #   - PDFs: one Document per page.
+    #   - HTML: visible text via BeautifulSoup (like WebBaseLoader).
+    #   - Anything else: decoded as text.
+    # ------------------------------------------------------------
+    def read_fetched(self, content: bytes, content_type: str, source: str) -> list[Document]:
+        content_type = (content_type or "").split(";")[0].strip().lower()
+
+        if content_type == "application/pdf" or source.lower().endswith(".pdf"):
+            reader = PdfReader(io.BytesIO(content))
+            return [
+                Document(page_content=page.extract_text() or "", metadata={"source": source, "page": index})
+                for index, page in enumerate(reader.pages)
+            ]
+
+        if content_type in ("", "text/html", "application/xhtml+xml"):
+            soup = bs4.BeautifulSoup(content, "html.parser")
+            metadata = {"source": source}
+            if soup.title and soup.title.string:
+                metadata["title"] = soup.title.string.strip()
+            return [Document(page_content=soup.get_text(), metadata=metadata)]
+
+        return [Document(page_content=content.decode("utf-8", errors="replace"), metadata={"source": source})]
+
     # ------------------------------------------------------------
     # Method: read_text
     # Description:
@@ -0,0 +1,218 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from utils.logger import logger
+
+# ------------------------------------------------------------
+# Module: embedding_cache
+# Description:
+#   Content-addressed, persistent cache for embeddings.
+#   - Vectors are stored in a local SQLite file, keyed by
+#     (embedding model name, sha256 of the text).
+#   - Wraps any LangChain `Embeddings` so re-ingesting the same
+#     chunk (or writing it to a second store) costs no API call.
+#   - Query embeddings (answer cache lookups, SQL routing,
+#     retrieval) are one-off texts; they live in their own table with
+#     their own bound, so they never evict document chunk vectors.
+#   - Keeps hit/miss counters and evicts least recently used rows
+#     once a table grows beyond its bound. Row counts are tracked as
+#     rows are added, not counted on every write.
+# ------------------------------------------------------------
+
+DOCUMENT_TABLE = "embeddings"
+QUERY_TABLE = "query_embeddings"
+
+
+class CachedEmbeddings(Embeddings):
+    # ------------------------------------------------------------
+    # Method: __init__
+    # Description:
+    #   Opens (or creates) the SQLite cache file.
+    #
+    # Parameters:
+    #   - embeddings (Embeddings): The underlying embedding model.
+    #   - model_name (str): Part of the cache key, so switching models
+    #     never returns vectors from another model.
+    #   - path (str): SQLite file location.
+    #   - max_entries (int): Upper bound on cached document vectors.
+    #   - max_query_entries (int): Upper bound on cached query vectors.
+    # ------------------------------------------------------------
+    def __init__(self, embeddings: Embeddings, model_name: str,
+                 path: str = "./vector_db/embedding_cache.sqlite3", max_entries: int = 200000,
+                 max_query_entries: int = 10000):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.max_entries = {DOCUMENT_TABLE: max_entries, QUERY_TABLE: max_query_entries}
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__sizes = {}
+        for table in (DOCUMENT_TABLE, QUERY_TABLE):
+            self.__connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                " model TEXT NOT NULL,"
+                " hash TEXT NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " last_used REAL NOT NULL,"
+                " PRIMARY KEY (model, hash))"
+            )
+            self.__connection.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_last_used ON {table} (last_used)"
+            )
+            # Counted once; afterwards kept up to date by __save
+            self.__sizes[table] = self.__connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        self.__connection.commit()
+
+    # ------------------------------------------------------------
+    # Method: embed_documents
+    # Description:
+    #   Returns embeddings for `texts`, calling the underlying model
+    #   only for texts that are not cached yet (each unique text once).
+    # ------------------------------------------------------------
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys = [self._key(text) for text in texts]
+        cached = self.__load(DOCUMENT_TABLE, set(keys))
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        with self.__lock:
+            self.hits += len(keys) - sum(1 for key in keys if key in missing)
+            self.misses += len(missing)
+
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            fresh = dict(zip(missing.keys(), vectors))
+            self.__save(DOCUMENT_TABLE, fresh)
+            cached.update(fresh)
+
+        return [list(cached[key]) for key in keys]
+
+    # ------------------------------------------------------------
+    # Method: embed_query
+    # Description:
+    #   Returns the embedding for a single query text, cached in the
+    #   query table.
+    # ------------------------------------------------------------
+    def embed_query(self, text: str) -> list[float]:
+        key = self._key(text)
+        cached = self.__load(QUERY_TABLE, {key})
+        if key in cached:
+            with self.__lock:
+                self.hits += 1
+            return list(cached[key])
+
+        with self.__lock:
+            self.misses += 1
+        vector = self.embeddings.embed_query(text)
+        self.__save(QUERY_TABLE, {key: vector})
+        return vector
+
+    # ------------------------------------------------------------
+    # Method: stats
+    # Description:
+    #   Returns hit/miss counters and the number of cached document
+    #   and query vectors.
+    # ------------------------------------------------------------
+    def stats(self) -> dict:
+        with self.__lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": self.__sizes[DOCUMENT_TABLE],
+                "query_size": self.__sizes[QUERY_TABLE],
+            }
+
+    # ------------------------------------------------------------
+    # Method: log_stats
+    # Description:
+    #   Logs `stats()` with the hit rate (run by the scheduler).
+    # ------------------------------------------------------------
+    def log_stats(self):
+        stats = self.stats()
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = stats["hits"] / lookups if lookups else 0.0
+        logger.info(f"Embedding cache: {stats} (hit rate {hit_rate:.1%})")
+
+    # ------------------------------------------------------------
+    # Method: _key
+    # Description:
+    #   sha256 of the text content.
+    # ------------------------------------------------------------
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    # ------------------------------------------------------------
+    # Method: __load
+    # Description:
+    #   Fetches cached vectors for the given keys from `table` and
+    #   refreshes their last-used timestamp.
+    # ------------------------------------------------------------
+    def __load(self, table: str, keys: set) -> dict:
+        if not keys:
+            return {}
+
+        found = {}
+        key_list = list(keys)
+        with self.__lock:
+            for start in range(0, len(key_list), 500):
+                batch = key_list[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self.__connection.execute(
+                    f"SELECT hash, vector FROM {table} WHERE model = ? AND hash IN ({placeholders})",
+                    [self.model_name, *batch],
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+
+            if found:
+                now = time.time()
+                self.__connection.executemany(
+                    f"UPDATE {table} SET last_used = ? WHERE model = ? AND hash = ?",
+                    [(now, self.model_name, key) for key in found],
+                )
+                self.__connection.commit()
+        return found
+
+    # ------------------------------------------------------------
+    # Method: __save
+    # Description:
+    #   Persists new vectors in `table` and evicts its least recently
+    #   used rows when it exceeds its bound. Rows another thread or
+    #   process stored meanwhile are kept as they are.
+    # ------------------------------------------------------------
+    def __save(self, table: str, vectors: dict):
+        now = time.time()
+        rows = [
+            (self.model_name, key, np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for key, vector in vectors.items()
+        ]
+        with self.__lock:
+            try:
+                added = self.__connection.executemany(
+                    f"INSERT OR IGNORE INTO {table} (model, hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                    rows,
+                ).rowcount
+                size = self.__sizes[table] + max(0, added)
+                if size > self.max_entries[table]:
+                    size -= self.__connection.execute(
+                        f"DELETE FROM {table} WHERE rowid IN ("
+                        f" SELECT rowid FROM {table} ORDER BY last_used ASC LIMIT ?)",
+                        (size - self.max_entries[table],),
+                    ).rowcount
+                self.__connection.commit()
+                self.__sizes[table] = size
+            except sqlite3.Error as e:
+                self.__connection.rollback()
+                logger.warning(f"Failed to persist embeddings to cache: {str(e)}")
@@ -0,0 +1,193 @@
+import random
+import threading
+import time
+from decouple import config
+from langchain_core.embeddings import Embeddings
+from utils.logger import logger
+
+# ------------------------------------------------------------
+# Module: embedding_writer
+# Description:
+#   Throughput controls for embedding calls and vector store writes.
+#   - TokenBucket: thread-safe token bucket used to stay under a
+#     provider's requests-per-minute and tokens-per-minute quota.
+#   - RateLimitedEmbeddings: wraps an embedding model so every real
+#     API call draws from the provider's buckets.
+#   - EmbeddingWriter: splits chunk lists into batches, caps the
+#     number of concurrent batch writes (process-wide) and retries
+#     failed batches with exponential backoff and jitter.
+# ------------------------------------------------------------
+
+
+class TokenBucket:
+    # ------------------------------------------------------------
+    # Method: __init__
+    # Description:
+    #   Creates a full bucket refilled at `rate` tokens per second.
+    # ------------------------------------------------------------
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.__tokens = capacity
+        self.__updated_at = time.monotonic()
+        self.__lock = threading.Lock()
+
+    # ------------------------------------------------------------
+    # Method: acquire
+    # Description:
+    #   Blocks until `tokens` are available and takes them.
+    #   Requests larger than the capacity are capped to it.
+    # ------------------------------------------------------------
+    def acquire(self, tokens: float = 1):
+        if self.rate <= 0:
+            return
+        tokens = min(tokens, self.capacity)
+        while True:
+            with self.__lock:
+                now = time.monotonic()
+                self.__tokens = min(self.capacity, self.__tokens + (now - self.__updated_at) * self.rate)
+                self.__updated_at = now
+                if self.__tokens >= tokens:
+                    self.__tokens -= tokens
+                    return
+                wait = (tokens - self.__tokens) / self.rate
+            time.sleep(wait)
+
+
+# ------------------------------------------------------------
+# Shared buckets, one pair per provider
+# ------------------------------------------------------------
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+# ------------------------------------------------------------
+# Function: provider_buckets
+# Description:
+#   Returns the process-wide (requests, tokens) buckets of a provider,
+#   created on first use from per-minute limits.
+# ------------------------------------------------------------
+def provider_buckets(provider: str, requests_per_minute: float, tokens_per_minute: float):
+    with _buckets_lock:
+        if provider not in _buckets:
+            _buckets[provider] = (
+                TokenBucket(requests_per_minute / 60.0, max(1.0, requests_per_minute / 60.0)),
+                TokenBucket(tokens_per_minute / 60.0, max(1.0, tokens_per_minute / 60.0)),
+            )
+        return _buckets[provider]
+
+
+class RateLimitedEmbeddings(Embeddings):
+    # ------------------------------------------------------------
+    # Method: __init__
+    # Description:
+    #   Wraps an embedding model with provider request/token buckets.
+    #   Token usage is estimated as characters / 4.
+    # ------------------------------------------------------------
+    def __init__(self, embeddings: Embeddings, request_bucket: TokenBucket, token_bucket: TokenBucket):
+        self.embeddings = embeddings
+        self.request_bucket = request_bucket
+        self.token_bucket = token_bucket
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.__acquire(texts)
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        self.__acquire([text])
+        return self.embeddings.embed_query(text)
+
+    def __acquire(self, texts: list[str]):
+        self.request_bucket.acquire(1)
+        self.token_bucket.acquire(sum(len(text) for text in texts) / 4)
+
+
+# ------------------------------------------------------------
+# Process-wide cap on concurrent batch writes, shared by the
+# ingestion pipeline and single-document syncs
+# ------------------------------------------------------------
+write_slots = threading.BoundedSemaphore(max(1, int(config("EMBEDDING_MAX_CONCURRENCY", default=4))))
+
+
+class EmbeddingWriter:
+    # ------------------------------------------------------------
+    # Method: __init__
+    # Description:
+    #   Configures batching, concurrency and retries.
+    #
+    # Parameters:
+    #   - write_batch (callable): (documents, ids, visibility) -> None,
+    #     e.g. LangchainService.add_documents.
+    #   - batch_size (int): Max chunks per write.
+    #   - slots (threading.Semaphore | None): Limits concurrent batch
+    #     writes; defaults to the process-wide `write_slots`.
+    #   - max_retries (int): Retries per batch for transient errors.
+    #   - base_delay / max_delay (float): Backoff bounds in seconds.
+    # ------------------------------------------------------------
+    def __init__(self, write_batch, batch_size: int = 64, slots=None,
+                 max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 60.0):
+        self.write_batch = write_batch
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max(0, max_retries)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.__slots = slots if slots is not None else write_slots
+
+    # ------------------------------------------------------------
+    # Method: write
+    # Description:
+    #   Writes chunks in batches of `batch_size`. A failed batch is
+    #   retried on its own; the error is raised only once a batch has
+    #   exhausted its retries (or failed with a non-transient error).
+    #   `on_written` receives the ids of every stored batch, so callers
+    #   can roll back partial writes.
+    # ------------------------------------------------------------
+    def write(self, documents: list, ids: list[str], visibility: str = 'public', on_written=None):
+        for start in range(0, len(documents), self.batch_size):
+            batch_ids = ids[start:start + self.batch_size]
+            self.__write_with_retry(documents[start:start + self.batch_size], batch_ids, visibility)
+            if on_written is not None:
+                on_written(batch_ids)
+
+    # ------------------------------------------------------------
+    # Method: __write_with_retry
+    # Description:
+    #   Writes one batch, retrying transient failures with
+    #   "full jitter" exponential backoff.
+    # ------------------------------------------------------------
+    def __write_with_retry(self, documents: list, ids: list[str], visibility: str):
+        attempt = 0
+        while True:
+            try:
+                with self.__slots:
+                    self.write_batch(documents, ids, visibility)
+                return
+            except Exception as e:
+                if attempt >= self.max_retries or not self.is_transient(e):
+                    raise
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+                attempt += 1
+                logger.warning(
+                    f"Embedding batch of {len(documents)} failed ({str(e)}); "
+                    f"retry {attempt}/{self.max_retries} in {delay:.1f}s"
+                )
+                time.sleep(delay)
+
+    # ------------------------------------------------------------
+    # Method: is_transient
+    # Description:
+    #   True for errors worth retrying: HTTP 429 / 5xx, provider
+    #   rate-limit or quota errors, timeouts and connection errors.
+    # ------------------------------------------------------------
+    @staticmethod
+    def is_transient(error: Exception) -> bool:
+        status = getattr(error, "status_code", None) or getattr(error, "code", None)
+        if isinstance(status, int) and (status == 429 or 500 <= status < 600):
+            return True
+
+        name = type(error).__name__.lower()
+        if any(word in name for word in ("ratelimit", "timeout", "connection", "unavailable", "resourceexhausted")):
+            return True
+
+        message = str(error).lower()
+        return any(word in message for word in ("429", "rate limit", "quota", "timed out", "temporarily"))
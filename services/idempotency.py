@@ -0,0 +1,140 @@
+import threading
+import time
+from collections import OrderedDict
+from decouple import config
+from sql.cruds import processed_messages as processed_message_crud
+from utils.logger import logger
+import db
+
+# ------------------------------------------------------------
+# Module: idempotency
+# Description:
+#   Idempotency store for incoming chat platform messages.
+#   Telegram and WhatsApp redeliver updates when they think a
+#   webhook failed; every message id is claimed once, so a
+#   redelivery is acknowledged without running the LLM pipeline
+#   again.
+#   - MemoryIdempotencyStore: per-process, TTL + size bound.
+#   - SqlIdempotencyStore: `processed_messages` table, shared by
+#     all workers/processes.
+# ------------------------------------------------------------
+
+
+class MemoryIdempotencyStore:
+    # ------------------------------------------------------------
+    # Method: __init__
+    # Description:
+    #   Creates an empty store.
+    #
+    # Parameters:
+    #   - ttl (float): Seconds a message key is remembered.
+    #   - max_entries (int): Upper bound on remembered keys (oldest
+    #     are evicted first).
+    # ------------------------------------------------------------
+    def __init__(self, ttl: float = 86400, max_entries: int = 100000):
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.__lock = threading.Lock()
+        self.__entries = OrderedDict()
+
+    # ------------------------------------------------------------
+    # Method: claim
+    # Description:
+    #   True the first time `key` is seen (within the TTL).
+    # ------------------------------------------------------------
+    def claim(self, key: str) -> bool:
+        now = time.monotonic()
+        with self.__lock:
+            expires_at = self.__entries.get(key)
+            if expires_at is not None and expires_at > now:
+                return False
+            self.__entries.pop(key, None)
+
+            # Keys are kept in expiry order: drop expired ones, then the oldest over the bound
+            while self.__entries:
+                oldest_key, expires_at = next(iter(self.__entries.items()))
+                if expires_at > now and len(self.__entries) < self.max_entries:
+                    break
+                del self.__entries[oldest_key]
+            self.__entries[key] = now + self.ttl
+            return True
+
+    # ------------------------------------------------------------
+    # Method: release
+    # Description:
+    #   Forgets `key`, so a redelivery is processed again.
+    # ------------------------------------------------------------
+    def release(self, key: str):
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+
+class SqlIdempotencyStore:
+    # ------------------------------------------------------------
+    # Method: __init__
+    # Description:
+    #   Uses the `processed_messages` table.
+    #
+    # Parameters:
+    #   - ttl (float): Seconds a message key is remembered.
+    #   - purge_every (int): Expired rows are deleted once every
+    #     `purge_every` claims.
+    # ------------------------------------------------------------
+    def __init__(self, ttl: float = 86400, purge_every: int = 500):
+        self.ttl = ttl
+        self.purge_every = max(1, purge_every)
+        self.__lock = threading.Lock()
+        self.__claims = 0
+
+    # ------------------------------------------------------------
+    # Method: claim
+    # Description:
+    #   True the first time `key` is seen (within the TTL). If the
+    #   database is unavailable the message is processed rather
+    #   than dropped.
+    # ------------------------------------------------------------
+    def claim(self, key: str) -> bool:
+        session = db.get_db()
+        try:
+            claimed = processed_message_crud.claim_message(session, key, self.ttl)
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"Idempotency check failed for '{key}': {str(e)}")
+            return True
+
+        with self.__lock:
+            self.__claims += 1
+            purge = self.__claims % self.purge_every == 0
+        if purge:
+            try:
+                processed_message_crud.purge_expired(session)
+            except Exception as e:
+                session.rollback()
+                logger.warning(f"Purging processed messages failed: {str(e)}")
+        return claimed
+
+    # ------------------------------------------------------------
+    # Method: release
+    # Description:
+    #   Forgets `key`, so a redelivery is processed again.
+    # ------------------------------------------------------------
+    def release(self, key: str):
+        session = db.get_db()
+        try:
+            processed_message_crud.release_message(session, key)
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"Releasing message key '{key}' failed: {str(e)}")
+
+
+# ------------------------------------------------------------
+# Shared process-wide store, selected by IDEMPOTENCY_BACKEND
+# ('memory' or 'sql')
+# ------------------------------------------------------------
+if str(config("IDEMPOTENCY_BACKEND", default="memory")).strip().lower() == "sql":
+    idempotency_store = SqlIdempotencyStore(ttl=float(config("IDEMPOTENCY_TTL", default=86400)))
+else:
+    idempotency_store = MemoryIdempotencyStore(
+        ttl=float(config("IDEMPOTENCY_TTL", default=86400)),
+        max_entries=int(config("IDEMPOTENCY_MAX_ENTRIES", default=100000)),
+    )
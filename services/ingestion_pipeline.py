@@ -0,0 +1,330 @@
+import multiprocessing
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from services.document_reader import DocumentReader
+from utils.logger import logger
+
+# ------------------------------------------------------------
+# Module: ingestion_pipeline
+# Description:
+#   Parallel, batched ingestion of many files at once.
+#   - Stage 1: a process pool parses and splits files (CPU bound).
+#     PDFs are split into page windows, so a 1,000-page manual is
+#     parsed in parallel and never held in memory as a whole.
+#   - Stage 2: a thread pool embeds and writes chunk batches to the
+#     vector store (I/O bound), starting while parsing still runs.
+#   - A bounded queue between the stages keeps memory flat.
+#   - Per-file progress is tracked and can be read at any time.
+#   - Chunk ids are deterministic, so only new chunks are embedded;
+#     unchanged chunks are kept and removed ones deleted.
+# ------------------------------------------------------------
+
+
+# ------------------------------------------------------------
+# Function: _load_and_split
+# Description:
+#   Runs in a worker process: loads a file (or a page range of a
+#   PDF) and splits it into chunks.
+#   Kept at module level so it can be pickled by the process pool.
+# ------------------------------------------------------------
+def _load_and_split(path: str, chunk_size: int, chunk_overlap: int,
+                    start: int = 0, stop: int | None = None) -> list:
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+        separators=["\n", " ", ""]
+    )
+    return list(DocumentReader().iter_chunks(path, text_splitter, start, stop))
+
+
+class IngestionPipeline:
+    # ------------------------------------------------------------
+    # Method: __init__
+    # Description:
+    #   Configures the pipeline.
+    #
+    # Parameters:
+    #   - langchain_service (LangchainService): Used to write chunks.
+    #   - parse_workers (int): Processes used for parsing/splitting.
+    #   - embed_workers (int): Threads used for embedding batches.
+    #   - batch_size (int): Chunks per embedding batch.
+    #   - queue_size (int): Max batches waiting between the stages.
+    #   - pages_per_task (int): PDF pages parsed per worker task.
+    # ------------------------------------------------------------
+    def __init__(self, langchain_service, parse_workers: int = 2, embed_workers: int = 4,
+                 batch_size: int = 64, queue_size: int = 16,
+                 chunk_size: int = 1000, chunk_overlap: int = 100, pages_per_task: int = 25):
+        self.langchain_service = langchain_service
+        self.parse_workers = max(1, parse_workers)
+        self.embed_workers = max(1, embed_workers)
+        self.batch_size = max(1, batch_size)
+        self.queue_size = max(1, queue_size)
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.pages_per_task = max(1, pages_per_task)
+
+        self.__reader = DocumentReader()
+        self.__lock = threading.Lock()
+        self.__progress = {}
+        self.__plans = {}
+        self.__parse_executor = None
+
+    # ------------------------------------------------------------
+    # Method: progress
+    # Description:
+    #   Returns a snapshot of per-file progress:
+    #   {path: {"status", "chunks", "new", "written", "error", "started_at"}}
+    # ------------------------------------------------------------
+    def progress(self) -> dict:
+        with self.__lock:
+            return {path: dict(state) for path, state in self.__progress.items()}
+
+    # ------------------------------------------------------------
+    # Method: run
+    # Description:
+    #   Ingests the given files and blocks until all are done.
+    #   Parse tasks are consumed in order (per file, page window by
+    #   page window) with at most 2 x parse_workers tasks in flight.
+    #
+    # Parameters:
+    #   - files (list[tuple[str, str, int | None]]): (path, type,
+    #     document_id) where type is 'public' or 'private' and
+    #     document_id may be None for files without a DB record.
+    #
+    # Returns:
+    #   - dict: {path: True/False} ingestion result per file.
+    # ------------------------------------------------------------
+    def run(self, files: list[tuple[str, str, int | None]]) -> dict:
+        if not files:
+            return {}
+
+        with self.__lock:
+            for path in [p for p, state in self.__progress.items() if state["status"] in ("done", "failed")]:
+                del self.__progress[path]
+            for path, _, _ in files:
+                self.__progress[path] = {
+                    "status": "parsing",
+                    "chunks": 0,
+                    "new": 0,
+                    "written": 0,
+                    "error": None,
+                    "started_at": time.time(),
+                }
+
+        batches = queue.Queue(maxsize=self.queue_size)
+        writers = [
+            threading.Thread(target=self.__write_batches, args=(batches,), name=f"ingest-embed-{i}", daemon=True)
+            for i in range(self.embed_workers)
+        ]
+        for writer in writers:
+            writer.start()
+
+        parsed = set()
+        try:
+            executor = self.__executor()
+            tasks = self.__tasks(files)
+            in_flight = deque()
+
+            def submit_next():
+                task = next(tasks, None)
+                if task is not None:
+                    path, _, _, start, stop, _, _ = task
+                    future = executor.submit(
+                        _load_and_split, path, self.chunk_size, self.chunk_overlap, start, stop
+                    )
+                    in_flight.append((task, future))
+
+            for _ in range(self.parse_workers * 2):
+                submit_next()
+
+            while in_flight:
+                task, future = in_flight.popleft()
+                submit_next()
+
+                path, doc_type, document_id, _, _, is_first, is_last = task
+                if self.progress()[path]["status"] == "failed":
+                    future.cancel()
+                    continue
+
+                try:
+                    documents = future.result()
+                    if is_first:
+                        plan = self.langchain_service.start_sync(doc_type, document_id, path)
+                        with self.__lock:
+                            self.__plans[path] = plan
+                        self.__update(path, status="embedding")
+                    new = self.langchain_service.plan_batch(self.__plans[path], documents)
+                except Exception as e:
+                    logger.error(f"Preparing chunks failed for '{path}': {str(e)}", exc_info=True)
+                    self.__update(path, status="failed", error=str(e))
+                    if isinstance(e, BrokenProcessPool):
+                        self.shutdown()
+                        raise
+                    continue
+
+                with self.__lock:
+                    self.__progress[path]["chunks"] += len(documents)
+                    self.__progress[path]["new"] += len(new)
+
+                for start in range(0, len(new), self.batch_size):
+                    batches.put((path, doc_type, new[start:start + self.batch_size]))
+
+                if is_last:
+                    parsed.add(path)
+                    state = self.progress()[path]
+                    logger.info(f"Prepared {state['chunks']} document chunks for '{path}' ({state['new']} new).")
+        except Exception as e:
+            logger.error(f"Ingestion pipeline failed: {str(e)}", exc_info=True)
+        finally:
+            for _ in writers:
+                batches.put(None)
+            for writer in writers:
+                writer.join()
+
+        results = {}
+        for path, _, _ in files:
+            state = self.progress().get(path, {})
+            if path in parsed and state.get("status") == "embedding" and state["written"] >= state["new"]:
+                results[path] = self.__finalize(path)
+            else:
+                results[path] = False
+                if state.get("status") != "failed":
+                    self.__update(path, status="failed", error=state.get("error") or "Ingestion interrupted")
+                self.__rollback(path)
+
+            with self.__lock:
+                self.__plans.pop(path, None)
+
+        return results
+
+    # ------------------------------------------------------------
+    # Method: shutdown
+    # Description:
+    #   Stops the parse process pool.
+    # ------------------------------------------------------------
+    def shutdown(self):
+        if self.__parse_executor is not None:
+            self.__parse_executor.shutdown(wait=False, cancel_futures=True)
+            self.__parse_executor = None
+
+    # ------------------------------------------------------------
+    # Method: __executor
+    # Description:
+    #   Lazily creates the parse process pool. Uses "spawn" so worker
+    #   processes never inherit the server's threads and sockets.
+    # ------------------------------------------------------------
+    def __executor(self):
+        if self.__parse_executor is None:
+            self.__parse_executor = ProcessPoolExecutor(
+                max_workers=self.parse_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self.__parse_executor
+
+    # ------------------------------------------------------------
+    # Method: __tasks
+    # Description:
+    #   Yields parse tasks in order:
+    #   (path, type, document_id, start, stop, is_first, is_last).
+    #   PDFs are cut into windows of `pages_per_task` pages; every
+    #   other file is a single task.
+    # ------------------------------------------------------------
+    def __tasks(self, files: list):
+        for path, doc_type, document_id in files:
+            pages = 0
+            if path.lower().endswith(".pdf"):
+                try:
+                    pages = self.__reader.pdf_page_count(path)
+                except Exception as e:
+                    logger.warning(f"Could not count pages of '{path}': {str(e)}")
+
+            if pages <= self.pages_per_task:
+                yield (path, doc_type, document_id, 0, None, True, True)
+                continue
+
+            for start in range(0, pages, self.pages_per_task):
+                stop = min(pages, start + self.pages_per_task)
+                yield (path, doc_type, document_id, start, stop, start == 0, stop >= pages)
+
+    # ------------------------------------------------------------
+    # Method: __write_batches
+    # Description:
+    #   Embedding worker: consumes batches until it receives None.
+    #   Batches of a file that already failed are skipped; transient
+    #   provider errors are retried by the embedding writer.
+    # ------------------------------------------------------------
+    def __write_batches(self, batches: queue.Queue):
+        while True:
+            item = batches.get()
+            if item is None:
+                return
+
+            path, doc_type, batch = item
+            with self.__lock:
+                failed = self.__progress[path]["status"] == "failed"
+            if failed:
+                continue
+
+            def written(ids, path=path):
+                with self.__lock:
+                    self.__progress[path]["written"] += len(ids)
+                    self.__plans[path]["added"].extend(ids)
+
+            try:
+                self.langchain_service.embedding_writer.write(
+                    [d for _, d in batch], [chunk_id for chunk_id, _ in batch], doc_type, on_written=written
+                )
+            except Exception as e:
+                logger.error(f"Embedding batch failed for '{path}': {str(e)}", exc_info=True)
+                self.__update(path, status="failed", error=str(e))
+
+    # ------------------------------------------------------------
+    # Method: __finalize
+    # Description:
+    #   Completes a file once all new chunks are written: deletes
+    #   chunks that are no longer part of the document.
+    # ------------------------------------------------------------
+    def __finalize(self, path: str) -> bool:
+        with self.__lock:
+            plan = self.__plans.get(path)
+        try:
+            if plan is not None:
+                self.langchain_service.finish_sync(plan)
+        except Exception as e:
+            logger.error(f"Finalizing '{path}' failed: {str(e)}", exc_info=True)
+            self.__update(path, status="failed", error=str(e))
+            self.__rollback(path)
+            return False
+
+        self.__update(path, status="done")
+        return True
+
+    # ------------------------------------------------------------
+    # Method: __rollback
+    # Description:
+    #   Removes chunks added for a failed file in this run, so the
+    #   document is left as it was before.
+    # ------------------------------------------------------------
+    def __rollback(self, path: str):
+        with self.__lock:
+            plan = self.__plans.get(path)
+            added = list(plan["added"]) if plan else []
+        try:
+            self.langchain_service.delete_chunks(added)
+        except Exception as e:
+            logger.warning(f"Rollback failed for '{path}': {str(e)}")
+
+    # ------------------------------------------------------------
+    # Method: __update
+    # Description:
+    #   Updates the progress entry of a file.
+    # ------------------------------------------------------------
+    def __update(self, path: str, **values):
+        with self.__lock:
+            self.__progress[path].update(values)
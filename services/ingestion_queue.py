@@ -0,0 +1,142 @@
+import heapq
+import os
+import threading
+import time
+from utils.logger import logger
+
+# ------------------------------------------------------------
+# Module: ingestion_queue
+# Description:
+#   In-process job queue that triggers document ingestion as soon
+#   as a file is written, instead of polling the documents folder.
+#   - `submit` is called by DocumentService right after an upload.
+#   - An optional watchfiles-based watcher catches files dropped
+#     into the folder by other means (fallback).
+#   - A single worker thread drains the queue and hands batches of
+#     filenames to the ingestion handler.
+# ------------------------------------------------------------
+
+
+class IngestionQueue:
+    # ------------------------------------------------------------
+    # Method: __init__
+    # Description:
+    #   Creates an empty queue. Nothing runs until `start` is called,
+    #   but submissions made before that are kept.
+    # ------------------------------------------------------------
+    def __init__(self):
+        self.__condition = threading.Condition()
+        self.__heap = []
+        self.__pending = set()
+        self.__handler = None
+        self.__worker = None
+        self.__watcher = None
+        self.__stop_event = threading.Event()
+
+    # ------------------------------------------------------------
+    # Method: start
+    # Description:
+    #   Starts the worker thread (and the folder watcher if enabled).
+    #
+    # Parameters:
+    #   - handler (callable): Receives a list of filenames to ingest.
+    #   - watch_folder (str | None): Folder to watch for new files.
+    #   - watch_delay (float): Seconds to wait before ingesting a file
+    #     seen by the watcher, so the upload request can register it first.
+    # ------------------------------------------------------------
+    def start(self, handler, watch_folder: str | None = None, watch_delay: float = 5.0):
+        self.__handler = handler
+        self.__stop_event.clear()
+        self.__worker = threading.Thread(target=self.__run, name="ingestion-queue", daemon=True)
+        self.__worker.start()
+
+        if watch_folder:
+            self.__watcher = threading.Thread(
+                target=self.__watch, args=(watch_folder, watch_delay), name="ingestion-watcher", daemon=True
+            )
+            self.__watcher.start()
+
+    # ------------------------------------------------------------
+    # Method: stop
+    # Description:
+    #   Stops the worker and watcher threads.
+    # ------------------------------------------------------------
+    def stop(self):
+        self.__stop_event.set()
+        with self.__condition:
+            self.__condition.notify_all()
+        for thread in (self.__worker, self.__watcher):
+            if thread is not None:
+                thread.join(timeout=5)
+
+    # ------------------------------------------------------------
+    # Method: submit
+    # Description:
+    #   Queues a filename (relative to the documents folder) for
+    #   ingestion. Duplicate submissions are ignored.
+    # ------------------------------------------------------------
+    def submit(self, filename: str, delay: float = 0.0):
+        if not filename or filename.startswith("_"):
+            return
+
+        with self.__condition:
+            if filename in self.__pending:
+                return
+            self.__pending.add(filename)
+            heapq.heappush(self.__heap, (time.monotonic() + delay, filename))
+            self.__condition.notify()
+
+    # ------------------------------------------------------------
+    # Method: __run
+    # Description:
+    #   Worker loop: waits for ready jobs and processes them in batches.
+    # ------------------------------------------------------------
+    def __run(self):
+        while not self.__stop_event.is_set():
+            with self.__condition:
+                while not self.__stop_event.is_set():
+                    now = time.monotonic()
+                    if self.__heap and self.__heap[0][0] <= now:
+                        break
+                    timeout = self.__heap[0][0] - now if self.__heap else None
+                    self.__condition.wait(timeout)
+
+                if self.__stop_event.is_set():
+                    return
+
+                batch = []
+                now = time.monotonic()
+                while self.__heap and self.__heap[0][0] <= now:
+                    _, filename = heapq.heappop(self.__heap)
+                    self.__pending.discard(filename)
+                    batch.append(filename)
+
+            try:
+                self.__handler(batch)
+            except Exception as e:
+                logger.error(f"Ingestion job failed for {batch}: {str(e)}", exc_info=True)
+
+    # ------------------------------------------------------------
+    # Method: __watch
+    # Description:
+    #   Fallback watcher based on `watchfiles` (inotify on Linux).
+    #   Disabled silently when the package is not installed.
+    # ------------------------------------------------------------
+    def __watch(self, folder: str, delay: float):
+        try:
+            from watchfiles import watch, Change
+        except ImportError:
+            logger.warning("watchfiles is not installed; folder watcher disabled.")
+            return
+
+        logger.info(f"Watching '{folder}' for new documents.")
+        for changes in watch(folder, stop_event=self.__stop_event, recursive=False):
+            for change, path in changes:
+                if change == Change.added:
+                    self.submit(os.path.basename(path), delay=delay)
+
+
+# ------------------------------------------------------------
+# Shared process-wide queue instance
+# ------------------------------------------------------------
+ingestion_queue = IngestionQueue()
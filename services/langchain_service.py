@@ -1,19 +1,33 @@
 from dotenv import load_dotenv
+from decouple import config
 from langchain_chroma import Chroma
+import asyncio
+import chromadb
+import hashlib
 import os
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from operator import itemgetter
 from langchain_core.prompts import ChatPromptTemplate
 from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain.chains.retrieval import create_retrieval_chain
-from langchain_community.utilities import SQLDatabase
-from langchain_community.tools.sql_database.tool import QuerySQLDataBaseTool
 from langchain_experimental.sql import SQLDatabaseChain
 from langchain.chains.sql_database.query import create_sql_query_chain
 from langchain_core.runnables import RunnablePassthrough, RunnableLambda
-from langchain.chains.llm import LLMChain
+from langchain_core.output_parsers import StrOutputParser
 from services.utility import UtilityService
-from db import SQLALCHEMY_DATABASE_URL
+from services.chain_registry import ChainRegistry
+from services.answer_cache import AnswerCache, answer_cache
+from services.embedding_writer import EmbeddingWriter
+from services.conversation_memory import conversation_memory
+from services.sql_schema import sql_schema
+from services.sql_router import SqlRouter, schema_keywords
+from services.sql_executor import sql_executor
 from services.llm_service import LLMService
+from utils.logger import logger
 
 # ------------------------------------------------------------
 # Module: langchain_service
@@ -25,6 +39,11 @@ from services.llm_service import LLMService
 
 load_dotenv()
 
+PUBLIC_COLLECTION = "example_collection"
+PRIVATE_COLLECTION = "example_private_collection"
+UNIFIED_COLLECTION = "example_unified_collection"
+PERSIST_DIRECTORY = "./vector_db/chroma_langchain_db"
+
 
 # ------------------------------------------------------------
 # Class: LangchainService
@@ -40,51 +59,455 @@ class LangchainService:
     # Method: __init__
     # Description:
     #   Initializes embeddings, language model, and utility service.
-    #   Ensures persistence directory for local vector storage.
+    #   Ensures persistence directory for local vector storage and
+    #   registers the vector stores and chains in a ChainRegistry so
+    #   they are built once and reused across requests.
+    #   Shared clients may be injected (see services.container);
+    #   missing ones are created from LLMService.
     # ------------------------------------------------------------
-    def __init__(self):
+    def __init__(self, llm_service: LLMService | None = None, llm=None, embeddings=None):
         os.makedirs("vector_db", exist_ok=True)
-        self.llm_service = LLMService()
-        self.llm = self.llm_service.get_chat_model()
-        self.embeddings = self.llm_service.get_embedding_model()
+        self.llm_service = llm_service or LLMService()
+        self.llm = llm or self.llm_service.get_chat_model()
+        self.embeddings = embeddings or self.llm_service.get_embedding_model()
         self._utility_service = UtilityService()
+        self._chroma_client = chromadb.PersistentClient(path=PERSIST_DIRECTORY)
+
+        # Bounded pool used to run the SQL and RAG branches concurrently
+        # (branches only; a timed-out branch keeps its worker until it returns)
+        self._branch_executor = ThreadPoolExecutor(
+            max_workers=int(config("ANSWER_BRANCH_WORKERS", default=8)),
+            thread_name_prefix="answer-branch",
+        )
+        self._sql_timeout = float(config("SQL_BRANCH_TIMEOUT", default=30))
+        self._rag_timeout = float(config("RAG_BRANCH_TIMEOUT", default=30))
+
+        # How SQL and RAG answers are combined: 'llm' or 'concat'
+        self._merge_mode = str(config("ANSWER_MERGE_MODE", default="llm")).strip().lower()
+
+        # Exact + semantic answer cache shared across channels
+        self._answer_cache = answer_cache
+        self._answer_cache_enabled = config("ANSWER_CACHE_ENABLED", default=True, cast=bool)
+        self._semantic_cache_enabled = config("ANSWER_CACHE_SEMANTIC", default=True, cast=bool)
+        # Answers built from live SQL results go stale quickly: short TTL, 0 = never cached
+        self._sql_answer_ttl = float(config("ANSWER_CACHE_SQL_TTL", default=60))
+
+        # Per-conversation history (web session, Telegram chat, WhatsApp number)
+        self._conversations = conversation_memory
+        self._conversation_enabled = config("CONVERSATION_MEMORY_ENABLED", default=True, cast=bool)
+        # Separate pool for background summaries, so they never wait behind answer branches
+        self._summary_executor = ThreadPoolExecutor(
+            max_workers=int(config("CONVERSATION_SUMMARY_WORKERS", default=2)),
+            thread_name_prefix="conversation-summary",
+        )
+
+        # Batched, retrying writer used for every chunk write
+        self.embedding_writer = EmbeddingWriter(
+            self.add_documents,
+            batch_size=int(config("EMBEDDING_BATCH_SIZE", default=64)),
+            max_retries=int(config("EMBEDDING_MAX_RETRIES", default=5)),
+            base_delay=float(config("EMBEDDING_RETRY_BASE_DELAY", default=1.0)),
+            max_delay=float(config("EMBEDDING_RETRY_MAX_DELAY", default=60.0)),
+        )
+
+        self._chains = ChainRegistry(
+            refresh_interval=float(config("CHAIN_REFRESH_INTERVAL", default=300))
+        )
+        # 'dual': public chunks are duplicated in a public and a private collection.
+        # 'single': every chunk is stored once with a `visibility` metadata field.
+        self.vector_store_mode = str(config("VECTOR_STORE_MODE", default="dual")).strip().lower()
+        if self.vector_store_mode == 'single':
+            self._chains.register(
+                "unified_store",
+                lambda: self._build_store(UNIFIED_COLLECTION),
+                lambda: self._collection_fingerprint(UNIFIED_COLLECTION),
+            )
+            self._chains.register(
+                "public_rag",
+                lambda: self._build_vector_chain(
+                    self._chains.get("unified_store"), {"visibility": "public"}
+                ),
+                lambda: self._collection_fingerprint(UNIFIED_COLLECTION),
+            )
+            self._chains.register(
+                "private_rag",
+                lambda: self._build_vector_chain(self._chains.get("unified_store")),
+                lambda: self._collection_fingerprint(UNIFIED_COLLECTION),
+            )
+        else:
+            self._chains.register(
+                "public_store",
+                lambda: self._build_store(PUBLIC_COLLECTION),
+                lambda: self._collection_fingerprint(PUBLIC_COLLECTION),
+            )
+            self._chains.register(
+                "private_store",
+                lambda: self._build_store(PRIVATE_COLLECTION),
+                lambda: self._collection_fingerprint(PRIVATE_COLLECTION),
+            )
+            self._chains.register(
+                "public_rag",
+                lambda: self._build_vector_chain(self.chroma_public_store()),
+                lambda: self._collection_fingerprint(PUBLIC_COLLECTION),
+            )
+            self._chains.register(
+                "private_rag",
+                lambda: self._build_vector_chain(self.chroma_private_store()),
+                lambda: self._collection_fingerprint(PRIVATE_COLLECTION),
+            )
+        # Reflected once, limited to the allow-listed tables and columns
+        self._sql_schema = sql_schema
+        # Guarded, read-only execution of generated SQL
+        self._sql_executor = sql_executor
+
+        # Skips the SQL branch for questions the database cannot answer
+        self._sql_router = SqlRouter(
+            embeddings=self.embeddings,
+            keywords=schema_keywords(self._sql_schema.tables) + str(config(
+                "SQL_ROUTER_KEYWORDS", default="how many,number of,count,list all,email,city,zip code,admin,headcount"
+            )).split(","),
+            mode=str(config("SQL_ROUTER_MODE", default="hybrid")).strip().lower(),
+            margin=float(config("SQL_ROUTER_MARGIN", default=0.0)),
+        )
+        # Normalized question -> cleaned SQL, so repeated questions skip SQL generation
+        self._sql_query_cache = AnswerCache(
+            ttl=float(config("SQL_CACHE_TTL", default=3600)),
+            max_entries=int(config("SQL_CACHE_MAX_ENTRIES", default=512)),
+        )
+        self._sql_cache_enabled = config("SQL_CACHE_ENABLED", default=True, cast=bool)
+        self._chains.register("sql", self._build_sql_chain, self._sql_schema.fingerprint)
+        self._chains.register("merge", self._build_merge_chain)
+        self._chains.register("condense", self._build_condense_chain)
+        self._chains.register("summary", self._build_summary_chain)
+
+    # ------------------------------------------------------------
+    # Method: warm_up
+    # Description:
+    #   Builds every registered store and chain up front so the
+    #   first chat request does not pay the setup cost.
+    # ------------------------------------------------------------
+    def warm_up(self):
+        self._chains.warm_up()
+
+    # ------------------------------------------------------------
+    # Method: refresh_chains
+    # Description:
+    #   Drops cached chains so they are rebuilt on next access.
+    #   Call after a schema migration or a collection reset
+    #   (`refresh_chains("sql")` reflects the schema again; changes
+    #   of the allow-listed tables are also detected every
+    #   CHAIN_REFRESH_INTERVAL).
+    # ------------------------------------------------------------
+    def refresh_chains(self, name: str | None = None):
+        self._chains.invalidate(name)
 
     # ------------------------------------------------------------
     # Method: chroma_public_store
     # Description:
-    #   Returns a Chroma vector store for public documents.
+    #   Returns the shared Chroma vector store for public documents.
+    #   In single-collection mode this is the unified store; public
+    #   retrieval then filters on `visibility`.
     # ------------------------------------------------------------
     def chroma_public_store(self):
-        return Chroma(
-            collection_name="example_collection",
-            embedding_function=self.embeddings,
-            persist_directory="./vector_db/chroma_langchain_db",
-        )
+        if self.vector_store_mode == 'single':
+            return self._chains.get("unified_store")
+        return self._chains.get("public_store")
 
     # ------------------------------------------------------------
     # Method: chroma_private_store
     # Description:
-    #   Returns a Chroma vector store for private (authenticated) documents.
+    #   Returns the shared Chroma vector store for private
+    #   (authenticated) documents.
     # ------------------------------------------------------------
     def chroma_private_store(self):
+        if self.vector_store_mode == 'single':
+            return self._chains.get("unified_store")
+        return self._chains.get("private_store")
+
+    # ------------------------------------------------------------
+    # Method: add_documents
+    # Description:
+    #   Writes document chunks to the vector store(s).
+    #   - Tags every chunk with its `visibility` ('public'/'private').
+    #   - Single mode: one write to the unified collection.
+    #   - Dual mode: private chunks go to the private collection,
+    #     public chunks to both collections.
+    # ------------------------------------------------------------
+    def add_documents(self, documents: list, ids: list[str], visibility: str = 'public'):
+        visibility = 'private' if visibility == 'private' else 'public'
+        for document in documents:
+            document.metadata["visibility"] = visibility
+
+        if self.vector_store_mode == 'single':
+            self.chroma_private_store().add_documents(documents=documents, ids=ids)
+            return
+
+        self.chroma_private_store().add_documents(documents=documents, ids=ids)
+        if visibility == 'public':
+            self.chroma_public_store().add_documents(documents=documents, ids=ids)
+
+    # ------------------------------------------------------------
+    # Method: chunk_ids
+    # Description:
+    #   Returns deterministic ids for document chunks, derived from
+    #   (document key, sha256 of the chunk text, occurrence number).
+    #   Re-ingesting unchanged content therefore yields the same ids.
+    #   Pass the same `occurrences` counter when ids are computed
+    #   batch by batch for one document.
+    # ------------------------------------------------------------
+    def chunk_ids(self, documents: list, document_key: str, occurrences: Counter | None = None) -> list[str]:
+        occurrences = occurrences if occurrences is not None else Counter()
+        ids = []
+        for document in documents:
+            chunk_hash = hashlib.sha256(document.page_content.encode("utf-8")).hexdigest()
+            occurrences[chunk_hash] += 1
+            ids.append(str(uuid.uuid5(
+                uuid.NAMESPACE_URL, f"{document_key}:{chunk_hash}:{occurrences[chunk_hash]}"
+            )))
+        return ids
+
+    # ------------------------------------------------------------
+    # Method: document_key
+    # Description:
+    #   Key used for chunk ids: the document id when known,
+    #   otherwise the source path / URL.
+    # ------------------------------------------------------------
+    @staticmethod
+    def document_key(document_id: int | None = None, source: str | None = None) -> str:
+        return f"document:{document_id}" if document_id else f"source:{source}"
+
+    # ------------------------------------------------------------
+    # Method: existing_chunk_ids
+    # Description:
+    #   Returns ids of the chunks already stored for a document.
+    #   With a document id, chunks stored under `source` are included
+    #   too: documents ingested before chunks carried `document_id`
+    #   only have `source`, and their chunks must be replaced as well.
+    #   The private (or unified) store holds every chunk, so it is
+    #   the only one queried.
+    # ------------------------------------------------------------
+    def existing_chunk_ids(self, document_id: int | None = None, source: str | None = None) -> set:
+        if document_id and source:
+            where = {"$or": [{"document_id": document_id}, {"source": source}]}
+        elif document_id:
+            where = {"document_id": document_id}
+        else:
+            where = {"source": source}
+        result = self.chroma_private_store().get(where=where, include=[])
+        return set(result.get("ids", []))
+
+    # ------------------------------------------------------------
+    # Method: delete_legacy_chunks
+    # Description:
+    #   Deletes the chunks stored under `source` without a
+    #   `document_id` (ingested before chunk ids were derived from
+    #   the document). Called when such a document gets a new file,
+    #   since its next sync only looks under the new path.
+    #
+    # Returns:
+    #   - int: Number of deleted chunks.
+    # ------------------------------------------------------------
+    def delete_legacy_chunks(self, source: str) -> int:
+        result = self.chroma_private_store().get(where={"source": source}, include=["metadatas"])
+        ids = [
+            chunk_id for chunk_id, metadata in zip(result.get("ids", []), result.get("metadatas", []))
+            if not (metadata or {}).get("document_id")
+        ]
+        self.delete_chunks(ids)
+        return len(ids)
+
+    # ------------------------------------------------------------
+    # Method: delete_chunks
+    # Description:
+    #   Deletes chunks by id from every vector store.
+    # ------------------------------------------------------------
+    def delete_chunks(self, ids):
+        ids = list(ids)
+        if not ids:
+            return
+        for store in self._stores():
+            store.delete(ids=ids)
+
+    # ------------------------------------------------------------
+    # Method: update_chunk_metadata
+    # Description:
+    #   Rewrites metadata of kept chunks (e.g. new source path after
+    #   a replace) without re-embedding them.
+    # ------------------------------------------------------------
+    def update_chunk_metadata(self, ids: list[str], metadatas: list[dict]):
+        if not ids:
+            return
+        for store in self._stores():
+            existing = set(store.get(ids=ids, include=[]).get("ids", []))
+            pairs = [(i, m) for i, m in zip(ids, metadatas) if i in existing]
+            if pairs:
+                store._collection.update(
+                    ids=[i for i, _ in pairs], metadatas=[m for _, m in pairs]
+                )
+
+    # ------------------------------------------------------------
+    # Method: sync_documents
+    # Description:
+    #   Incrementally stores the chunks of one document.
+    #   - New chunks are embedded and added.
+    #   - Unchanged chunks are kept (only metadata refreshed).
+    #   - Chunks no longer present are deleted.
+    #   `documents` may be a lazy iterator; it is consumed in batches
+    #   of `batch_size` so memory stays flat for very large files.
+    #
+    # Returns:
+    #   - dict: Counts of added, kept and deleted chunks.
+    # ------------------------------------------------------------
+    def sync_documents(self, documents, visibility: str = 'public',
+                       document_id: int | None = None, source: str | None = None,
+                       batch_size: int = 64) -> dict:
+        plan = self.start_sync(visibility, document_id, source)
+        try:
+            batch = []
+            for document in documents:
+                batch.append(document)
+                if len(batch) >= batch_size:
+                    self._write_new(plan, self.plan_batch(plan, batch))
+                    batch = []
+            if batch:
+                self._write_new(plan, self.plan_batch(plan, batch))
+        except Exception:
+            # Leave the document as it was before this sync
+            self.delete_chunks(plan["added"])
+            raise
+        return self.finish_sync(plan)
+
+    # ------------------------------------------------------------
+    # Method: start_sync
+    # Description:
+    #   Starts an incremental sync for one document: loads the ids
+    #   already stored for it.
+    #
+    # Returns:
+    #   - dict: Sync state passed to plan_batch / finish_sync.
+    # ------------------------------------------------------------
+    def start_sync(self, visibility: str = 'public', document_id: int | None = None,
+                   source: str | None = None) -> dict:
+        return {
+            "key": self.document_key(document_id, source),
+            "document_id": document_id,
+            "visibility": 'private' if visibility == 'private' else 'public',
+            "existing": self.existing_chunk_ids(document_id, source),
+            "occurrences": Counter(),
+            "seen": set(),
+            "added": [],
+            "kept": 0,
+        }
+
+    # ------------------------------------------------------------
+    # Method: plan_batch
+    # Description:
+    #   Assigns ids to a batch of chunks (in document order), refreshes
+    #   metadata of chunks that already exist and returns the new ones.
+    #
+    # Returns:
+    #   - list[tuple[str, Document]]: (id, chunk) pairs to embed.
+    # ------------------------------------------------------------
+    def plan_batch(self, plan: dict, documents: list) -> list:
+        for document in documents:
+            if plan["document_id"]:
+                document.metadata["document_id"] = plan["document_id"]
+            document.metadata["visibility"] = plan["visibility"]
+
+        ids = self.chunk_ids(documents, plan["key"], plan["occurrences"])
+        plan["seen"].update(ids)
+
+        kept = [(i, d) for i, d in zip(ids, documents) if i in plan["existing"]]
+        if kept:
+            self.update_chunk_metadata([i for i, _ in kept], [d.metadata for _, d in kept])
+            plan["kept"] += len(kept)
+        return [(i, d) for i, d in zip(ids, documents) if i not in plan["existing"]]
+
+    # ------------------------------------------------------------
+    # Method: finish_sync
+    # Description:
+    #   Deletes chunks that were stored before but not seen this time.
+    # ------------------------------------------------------------
+    def finish_sync(self, plan: dict) -> dict:
+        stale = plan["existing"] - plan["seen"]
+        self.delete_chunks(stale)
+
+        result = {"added": len(plan["added"]), "kept": plan["kept"], "deleted": len(stale)}
+        logger.info(f"Synced {plan['key']}: {result}")
+        return result
+
+    # ------------------------------------------------------------
+    # Method: _write_new
+    # Description:
+    #   Embeds and stores new chunks of a sync through the batched
+    #   writer; ids are recorded per stored batch for rollback.
+    # ------------------------------------------------------------
+    def _write_new(self, plan: dict, new: list):
+        if not new:
+            return
+        self.embedding_writer.write(
+            [d for _, d in new], [i for i, _ in new], plan["visibility"], on_written=plan["added"].extend
+        )
+
+    # ------------------------------------------------------------
+    # Method: _stores
+    # Description:
+    #   Returns every distinct vector store in use.
+    # ------------------------------------------------------------
+    def _stores(self) -> list:
+        if self.vector_store_mode == 'single':
+            return [self.chroma_private_store()]
+        return [self.chroma_private_store(), self.chroma_public_store()]
+
+    # ------------------------------------------------------------
+    # Method: sql_chain
+    # Description:
+    #   Returns the shared query chain for database question answering.
+    # ------------------------------------------------------------
+    def sql_chain(self):
+        return self._chains.get("sql")
+
+    # ------------------------------------------------------------
+    # Method: vector_chain
+    # Description:
+    #   Returns the shared Retrieval-Augmented Generation (RAG)
+    #   pipeline for public or private documents.
+    # ------------------------------------------------------------
+    def vector_chain(self, is_logged_in: bool = False):
+        if is_logged_in:
+            return self._chains.get("private_rag")
+        return self._chains.get("public_rag")
+
+    # ------------------------------------------------------------
+    # Method: _build_store
+    # Description:
+    #   Creates a Chroma vector store for the given collection.
+    # ------------------------------------------------------------
+    def _build_store(self, collection_name: str):
         return Chroma(
-            collection_name="example_private_collection",
+            collection_name=collection_name,
             embedding_function=self.embeddings,
-            persist_directory="./vector_db/chroma_langchain_db",
+            client=self._chroma_client,
         )
 
     # ------------------------------------------------------------
-    # Method: sql_chain
+    # Method: _build_sql_chain
     # Description:
     #   Creates a query chain for database question answering.
-    #   - Writes natural language queries to SQL.
-    #   - Executes SQL safely (only SELECT operations).
+    #   - Reflects the allow-listed schema once per (re)build; the
+    #     prompt's table info is served from that cache.
+    #   - Writes natural language queries to SQL (cached per
+    #     normalized question).
+    #   - Executes SQL safely: a single SELECT on the allow-listed
+    #     tables, on a read-only pool with row and time limits.
     #   - Combines SQL result interpretation with general knowledge.
     # ------------------------------------------------------------
-    def sql_chain(self):
-        db = SQLDatabase.from_uri(SQLALCHEMY_DATABASE_URL)
-        execute_query = QuerySQLDataBaseTool(db=db)
-        write_query = create_sql_query_chain(self.llm, db)
+    def _build_sql_chain(self):
+        db = self._sql_schema.reload()
+        execute_query = RunnableLambda(self._sql_executor.run)
+        write_query = create_sql_query_chain(self.llm, db) | RunnableLambda(self._utility_service.clean_sql_query)
+        # SQL written for the previous schema may no longer be valid
+        self._sql_query_cache.invalidate()
 
         answer_prompt = ChatPromptTemplate.from_messages([
             ("system", "You are an AI assistant that decides whether to use SQL results or general knowledge to answer questions."),
@@ -108,28 +531,66 @@ class LangchainService:
         answer = answer_prompt | self.llm
         chain = (
             RunnablePassthrough
-            .assign(query=write_query | RunnableLambda(self._utility_service.clean_sql_query))
+            .assign(query=self._cached_sql_query(write_query))
             .assign(result=itemgetter("query") | execute_query)
             | answer
         )
         return chain
 
     # ------------------------------------------------------------
-    # Method: vector_chain
+    # Method: _cached_sql_query
+    # Description:
+    #   Wraps the SQL writing chain with the SQL cache: a repeated
+    #   (normalized) question reuses its cleaned SELECT instead of
+    #   asking the LLM again. Only statements accepted by the SQL
+    #   executor are cached.
+    # ------------------------------------------------------------
+    def _cached_sql_query(self, write_query):
+        def lookup(inputs: dict) -> str:
+            cached = self._cached_sql(inputs["question"])
+            if cached is not None:
+                return cached
+            return self._store_sql(inputs["question"], write_query.invoke(inputs))
+
+        async def alookup(inputs: dict) -> str:
+            cached = self._cached_sql(inputs["question"])
+            if cached is not None:
+                return cached
+            return self._store_sql(inputs["question"], await write_query.ainvoke(inputs))
+
+        return RunnableLambda(lookup, afunc=alookup)
+
+    def _cached_sql(self, question: str):
+        if not self._sql_cache_enabled:
+            return None
+        sql = self._sql_query_cache.get_exact("sql", question)
+        if sql is not None:
+            logger.info("SQL cache hit.")
+        return sql
+
+    def _store_sql(self, question: str, sql: str) -> str:
+        if not self._sql_cache_enabled:
+            return sql
+        try:
+            self._sql_executor.validate(sql)
+        except ValueError:
+            return sql
+        self._sql_query_cache.put("sql", question, sql)
+        return sql
+
+    # ------------------------------------------------------------
+    # Method: _build_vector_chain
     # Description:
     #   Creates a Retrieval-Augmented Generation (RAG) pipeline.
-    #   - Uses Chroma retrievers (public/private).
+    #   - Uses the given Chroma store as retriever, optionally
+    #     restricted by a metadata filter.
     #   - Generates context-aware answers based on stored docs.
     # ------------------------------------------------------------
-    def vector_chain(self, is_logged_in: bool = False):
-        if is_logged_in:
-            print("Employee is Logged-In")
-            retriever = self.chroma_private_store(
-            ).as_retriever(search_kwargs={"k": 2})
-        else:
-            print("Employee is Logged-Out")
-            retriever = self.chroma_public_store(
-            ).as_retriever(search_kwargs={"k": 2})
+    def _build_vector_chain(self, store, metadata_filter: dict | None = None):
+        search_kwargs = {"k": 2}
+        if metadata_filter:
+            search_kwargs["filter"] = metadata_filter
+        retriever = store.as_retriever(search_kwargs=search_kwargs)
 
         rag_prompt = ChatPromptTemplate.from_messages([
             ("system", "You are an AI assistant for a consulting company. Only use the provided context from company documents."),
@@ -140,57 +601,451 @@ class LangchainService:
         combine_docs_chain = create_stuff_documents_chain(self.llm, rag_prompt)
         return create_retrieval_chain(retriever, combine_docs_chain)
 
+    # ------------------------------------------------------------
+    # Method: _collection_fingerprint
+    # Description:
+    #   Returns the id of a Chroma collection. The id changes when
+    #   the collection is dropped and recreated, which invalidates
+    #   the cached store and its RAG chain.
+    # ------------------------------------------------------------
+    def _collection_fingerprint(self, collection_name: str):
+        return str(self._chroma_client.get_or_create_collection(collection_name).id)
+
     # ------------------------------------------------------------
     # Method: generate_answer
     # Description:
     #   Handles hybrid reasoning (SQL + RAG).
-    #   - Executes SQL chain if authenticated.
+    #   - Executes SQL chain if authenticated and the SQL router
+    #     considers it a database question.
     #   - Executes vector retrieval always.
+    #   - Both branches run concurrently with per-branch timeouts;
+    #     a failed or timed-out branch contributes an empty answer.
     #   - Merges both results into a final coherent answer.
+    #   - Answers are served from / stored in the answer cache.
+    #   - With a `conversation_id`, follow-up questions are rewritten
+    #     as standalone questions from the conversation history, and
+    #     the turn is added to that history.
     # ------------------------------------------------------------
-    def generate_answer(self, query: str, is_logged_in: bool = False):
-        sql_response = ''
-        if is_logged_in:
-            response = self.sql_chain().invoke({"question": query})
-            sql_response = response.content
+    def generate_answer(self, query: str, is_logged_in: bool = False, conversation_id: str | None = None):
+        logger.info(f"Employee is {'Logged-In' if is_logged_in else 'Logged-Out'}")
+        user_query = query
+        query = self._standalone_question(query, conversation_id)
+        namespace = self._cache_namespace(is_logged_in)
+        cached_answer, embedding = self._cached_answer(namespace, query)
+        if cached_answer is not None:
+            self._remember(conversation_id, user_query, cached_answer)
+            return {'answer': cached_answer}
+
+        branches = {
+            "rag": (self._submit_branch(self._rag_branch, query, is_logged_in), self._rag_timeout)
+        }
+        if is_logged_in and self._needs_sql(query, embedding):
+            branches["sql"] = (self._submit_branch(self._sql_branch, query), self._sql_timeout)
+
+        results = {}
+        for name, ((future, started), timeout) in branches.items():
+            results[name] = self._branch_result(name, future, started, timeout)
+
+        if all(result is None for result in results.values()):
+            raise RuntimeError("Unable to generate an answer at the moment. Please try again.")
 
-        print("SQL Response:", sql_response)
-        vector_chain = self.vector_chain(is_logged_in)
-        vector_response = vector_chain.invoke({"input": query})
-        print("VECTOR Response:", vector_response)
+        sql_response = results.get("sql") or ''
+        vector_response = results.get("rag") or ''
+        logger.debug(f"SQL Response: {sql_response}")
+        logger.debug(f"VECTOR Response: {vector_response}")
 
-        merged_response = self.final_answer(
-            sql_response, vector_response['answer'])
+        merged_response = self.final_answer(sql_response, vector_response)
+        if None not in results.values():
+            self._store_answer(namespace, query, merged_response, embedding, sql="sql" in results)
+        self._remember(conversation_id, user_query, merged_response)
         return {'answer': merged_response}
 
+    # ------------------------------------------------------------
+    # Method: _standalone_question
+    # Description:
+    #   Rewrites a follow-up question into a self-contained one using
+    #   the conversation history, so retrieval, SQL generation and
+    #   the answer cache see e.g. "What is the leave policy for
+    #   interns?" instead of "and for interns?".
+    #   Returns the query unchanged for new conversations or when the
+    #   rewrite fails.
+    # ------------------------------------------------------------
+    def _standalone_question(self, query: str, conversation_id: str | None = None) -> str:
+        history = self._conversation_history(conversation_id)
+        if history is None:
+            return query
+        try:
+            question = self._chains.get("condense").invoke({"history": history, "question": query})
+        except Exception as e:
+            logger.warning(f"Condensing follow-up question failed: {str(e)}")
+            return query
+        return question.strip() or query
+
+    async def _astandalone_question(self, query: str, conversation_id: str | None = None) -> str:
+        history = await asyncio.to_thread(self._conversation_history, conversation_id)
+        if history is None:
+            return query
+        try:
+            question = await self._chains.get("condense").ainvoke({"history": history, "question": query})
+        except Exception as e:
+            logger.warning(f"Condensing follow-up question failed: {str(e)}")
+            return query
+        return question.strip() or query
+
+    # ------------------------------------------------------------
+    # Method: _conversation_history
+    # Description:
+    #   Returns the history of a conversation as prompt text, or None.
+    # ------------------------------------------------------------
+    def _conversation_history(self, conversation_id: str | None = None):
+        if not conversation_id or not self._conversation_enabled:
+            return None
+        history = self._conversations.history(conversation_id)
+        return self._conversations.format(history) if history else None
+
+    # ------------------------------------------------------------
+    # Method: _remember
+    # Description:
+    #   Adds a turn to the conversation history. When the history
+    #   outgrows its turn limit, the oldest turns are summarized in
+    #   the background (the reply does not wait for it).
+    # ------------------------------------------------------------
+    def _remember(self, conversation_id: str | None, query: str, answer: str):
+        if not conversation_id or not self._conversation_enabled or not answer or not answer.strip():
+            return
+        if self._conversations.remember(conversation_id, query, answer):
+            self._summary_executor.submit(self._conversations.compact, conversation_id, self._summarize)
+
+    # ------------------------------------------------------------
+    # Method: _summarize
+    # Description:
+    #   Folds older turns into the rolling conversation summary.
+    # ------------------------------------------------------------
+    def _summarize(self, summary: str, turns: list) -> str:
+        return self._chains.get("summary").invoke({
+            "summary": summary or "(none)",
+            "turns": self._conversations.format({"turns": turns}),
+        })
+
+    # ------------------------------------------------------------
+    # Method: _cache_namespace
+    # Description:
+    #   Public and private answers never share cache entries.
+    # ------------------------------------------------------------
+    def _cache_namespace(self, is_logged_in: bool) -> str:
+        return "private" if is_logged_in else "public"
+
+    # ------------------------------------------------------------
+    # Method: _cached_answer
+    # Description:
+    #   Looks the query up in the answer cache.
+    #   - Tries the exact level first (no embedding call).
+    #   - Falls back to the semantic level using the query embedding
+    #     (public namespace only by default, see AnswerCache).
+    #
+    # Returns:
+    #   - tuple: (cached answer or None, query embedding or None).
+    #     The embedding is reused when storing the fresh answer.
+    # ------------------------------------------------------------
+    def _cached_answer(self, namespace: str, query: str):
+        if not self._answer_cache_enabled:
+            return None, None
+
+        cached_answer = self._answer_cache.get_exact(namespace, query)
+        if cached_answer is not None:
+            logger.info("Answer cache hit (exact).")
+            return cached_answer, None
+
+        if not self._semantic_cache_enabled or not self._answer_cache.is_semantic(namespace):
+            return None, None
+
+        try:
+            embedding = self.embeddings.embed_query(query)
+        except Exception as e:
+            logger.warning(f"Query embedding for answer cache failed: {str(e)}")
+            return None, None
+
+        cached_answer = self._answer_cache.get_similar(namespace, embedding)
+        if cached_answer is not None:
+            logger.info("Answer cache hit (semantic).")
+        return cached_answer, embedding
+
+    # ------------------------------------------------------------
+    # Method: _store_answer
+    # Description:
+    #   Saves a freshly generated, non-empty answer in the cache.
+    #   Answers that used the SQL branch (`sql`) reflect live data and
+    #   get the short ANSWER_CACHE_SQL_TTL instead.
+    # ------------------------------------------------------------
+    def _store_answer(self, namespace: str, query: str, answer: str, embedding=None, sql: bool = False):
+        if not self._answer_cache_enabled or not answer or not answer.strip():
+            return
+        if not sql:
+            self._answer_cache.put(namespace, query, answer, embedding)
+        elif self._sql_answer_ttl > 0:
+            self._answer_cache.put(namespace, query, answer, embedding, ttl=self._sql_answer_ttl)
+
+    # ------------------------------------------------------------
+    # Method: _needs_sql
+    # Description:
+    #   Asks the SQL router whether the question concerns the
+    #   database. `embedding` is the query embedding when the answer
+    #   cache already computed it.
+    # ------------------------------------------------------------
+    def _needs_sql(self, query: str, embedding=None) -> bool:
+        needs_sql = self._sql_router.needs_sql(query, embedding)
+        if not needs_sql:
+            logger.info("SQL branch skipped: not a database question.")
+        return needs_sql
+
+    # ------------------------------------------------------------
+    # Method: _sql_branch
+    # Description:
+    #   Runs the SQL chain and returns the answer text.
+    # ------------------------------------------------------------
+    def _sql_branch(self, query: str) -> str:
+        response = self.sql_chain().invoke({"question": query})
+        return response.content
+
+    # ------------------------------------------------------------
+    # Method: _rag_branch
+    # Description:
+    #   Runs the public or private RAG chain and returns the answer text.
+    # ------------------------------------------------------------
+    def _rag_branch(self, query: str, is_logged_in: bool = False) -> str:
+        response = self.vector_chain(is_logged_in).invoke({"input": query})
+        return response['answer']
+
+    # ------------------------------------------------------------
+    # Method: _submit_branch
+    # Description:
+    #   Queues a branch on the branch pool.
+    #
+    # Returns:
+    #   - tuple: (future, started), where started["event"] is set and
+    #     started["at"] recorded when a worker begins running it.
+    # ------------------------------------------------------------
+    def _submit_branch(self, func, *args):
+        started = {"event": threading.Event(), "at": None}
+
+        def run():
+            started["at"] = time.monotonic()
+            started["event"].set()
+            return func(*args)
+
+        return self._branch_executor.submit(run), started
+
+    # ------------------------------------------------------------
+    # Method: _branch_result
+    # Description:
+    #   Waits for a branch submitted with _submit_branch.
+    #   - A branch still queued after `timeout` is cancelled.
+    #   - A running branch gets `timeout` seconds from its start;
+    #     after that it is abandoned (a running thread cannot be
+    #     cancelled) and logged again when it finally returns.
+    #   Returns None (and logs) when the branch fails or times out.
+    # ------------------------------------------------------------
+    def _branch_result(self, name: str, future, started: dict, timeout: float):
+        try:
+            if not started["event"].wait(timeout):
+                if future.cancel():
+                    logger.warning(f"{name} branch waited {timeout:g}s for a worker, continuing without it.")
+                    return None
+                # Picked up just now: the worker is about to record its start
+                started["event"].wait()
+            return future.result(timeout=max(0.0, started["at"] + timeout - time.monotonic()))
+        except FutureTimeoutError:
+            logger.warning(
+                f"{name} branch timed out after {timeout:g}s, continuing without it "
+                f"(its worker stays busy until the branch returns)."
+            )
+            future.add_done_callback(lambda _: logger.warning(
+                f"Abandoned {name} branch returned after {time.monotonic() - started['at']:.1f}s."
+            ))
+        except Exception as e:
+            logger.error(f"{name} branch failed: {str(e)}", exc_info=True)
+        return None
+
+    # ------------------------------------------------------------
+    # Method: astream_answer
+    # Description:
+    #   Async counterpart of generate_answer that yields answer tokens
+    #   as soon as the final chain produces them.
+    #   - Logged-out, or not a database question: streams the RAG
+    #     chain directly.
+    #   - Logged-in: runs SQL and RAG concurrently (with timeouts),
+    #     then streams the merge chain, or yields the single / concat
+    #     answer when no LLM merge is needed.
+    #   - Follow-ups are condensed and the turn is remembered as in
+    #     generate_answer.
+    # ------------------------------------------------------------
+    async def astream_answer(self, query: str, is_logged_in: bool = False, conversation_id: str | None = None):
+        logger.info(f"Employee is {'Logged-In' if is_logged_in else 'Logged-Out'} (stream)")
+        user_query = query
+        query = await self._astandalone_question(query, conversation_id)
+        namespace = self._cache_namespace(is_logged_in)
+        cached_answer, embedding = await asyncio.to_thread(self._cached_answer, namespace, query)
+        if cached_answer is not None:
+            yield cached_answer
+            await asyncio.to_thread(self._remember, conversation_id, user_query, cached_answer)
+            return
+
+        tokens = []
+        state = {"partial": False, "sql": False}
+        async for token in self._astream_uncached(query, is_logged_in, state, embedding):
+            tokens.append(token)
+            yield token
+
+        answer = ''.join(tokens)
+        if tokens and not state["partial"]:
+            self._store_answer(namespace, query, answer, embedding, sql=state["sql"])
+        await asyncio.to_thread(self._remember, conversation_id, user_query, answer)
+
+    # ------------------------------------------------------------
+    # Method: _astream_uncached
+    # Description:
+    #   Produces the streamed answer without consulting the cache.
+    #   Sets state["partial"] when a branch failed or timed out and
+    #   state["sql"] when the SQL branch ran.
+    # ------------------------------------------------------------
+    async def _astream_uncached(self, query: str, is_logged_in: bool = False, state: dict | None = None,
+                                embedding=None):
+        state = state if state is not None else {}
+        if not is_logged_in or not await asyncio.to_thread(self._needs_sql, query, embedding):
+            async for chunk in self.vector_chain(is_logged_in).astream({"input": query}):
+                token = chunk.get("answer")
+                if token:
+                    yield token
+            return
+
+        state["sql"] = True
+        sql_response, vector_response = await asyncio.gather(
+            self._abranch_result("sql", self._asql_branch(query), self._sql_timeout),
+            self._abranch_result("rag", self._arag_branch(query, True), self._rag_timeout),
+        )
+        if sql_response is None and vector_response is None:
+            raise RuntimeError("Unable to generate an answer at the moment. Please try again.")
+
+        state["partial"] = sql_response is None or vector_response is None
+        sql_response = sql_response or ''
+        vector_response = vector_response or ''
+        if sql_response.strip() and vector_response.strip() and self._merge_mode != 'concat':
+            async for token in self._chains.get("merge").astream({
+                "sql_response": sql_response,
+                "vector_response": vector_response
+            }):
+                if token:
+                    yield token
+            return
+
+        yield self.final_answer(sql_response, vector_response)
+
+    # ------------------------------------------------------------
+    # Method: _asql_branch / _arag_branch
+    # Description:
+    #   Async versions of the SQL and RAG branches.
+    # ------------------------------------------------------------
+    async def _asql_branch(self, query: str) -> str:
+        response = await self.sql_chain().ainvoke({"question": query})
+        return response.content
+
+    async def _arag_branch(self, query: str, is_logged_in: bool = False) -> str:
+        response = await self.vector_chain(is_logged_in).ainvoke({"input": query})
+        return response['answer']
+
+    # ------------------------------------------------------------
+    # Method: _abranch_result
+    # Description:
+    #   Awaits a branch with a timeout.
+    #   Returns None (and logs) when the branch fails or times out.
+    # ------------------------------------------------------------
+    async def _abranch_result(self, name: str, coroutine, timeout: float):
+        try:
+            return await asyncio.wait_for(coroutine, timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{name} branch timed out, continuing without it.")
+        except Exception as e:
+            logger.error(f"{name} branch failed: {str(e)}", exc_info=True)
+        return None
+
     # ------------------------------------------------------------
     # Method: final_answer
     # Description:
     #   Merges responses from SQL and vector-based results
     #   into a unified, concise, and readable output.
+    #   - Returns the single available answer directly when only one
+    #     branch produced content (no extra LLM call).
+    #   - Uses a deterministic concatenation with deduplication when
+    #     ANSWER_MERGE_MODE is 'concat'.
+    #   - Otherwise asks the LLM to merge both answers.
     # ------------------------------------------------------------
     def final_answer(self, sql_response, vector_response):
+        answers = [
+            str(answer).strip()
+            for answer in (sql_response, vector_response)
+            if answer and str(answer).strip()
+        ]
+        if not answers:
+            return ''
+        if len(answers) == 1:
+            return answers[0]
+        if self._merge_mode == 'concat':
+            return self._utility_service.merge_answers(answers)
+
+        return self._chains.get("merge").invoke({
+            "sql_response": sql_response,
+            "vector_response": vector_response
+        })
+
+    # ------------------------------------------------------------
+    # Method: _build_merge_chain
+    # Description:
+    #   Creates the LLM chain that merges SQL and RAG answers.
+    # ------------------------------------------------------------
+    def _build_merge_chain(self):
         prompt = ChatPromptTemplate.from_messages([
             ("system", "You are an AI assistant that merges responses into one answer."),
             ("human", "Context from SQL:\n{sql_response}\n\nContext from RAG:\n{vector_response}\n\nMerge both contexts into a single, human-readable answer without repetition."),
             ("ai", "Answer (clear and concise):"),
         ])
+        return prompt | self.llm | StrOutputParser()
 
-        chain = LLMChain(llm=self.llm, prompt=prompt)
-        final_answer = chain.run({
-            "sql_response": sql_response,
-            "vector_response": vector_response
-        })
-        return final_answer
+    # ------------------------------------------------------------
+    # Method: _build_condense_chain
+    # Description:
+    #   Creates the LLM chain that rewrites a follow-up question as a
+    #   standalone question.
+    # ------------------------------------------------------------
+    def _build_condense_chain(self):
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", "You rewrite follow-up questions so they can be understood without the conversation."),
+            ("human", "Conversation:\n{history}\n\nFollow-up question:\n{question}\n\nRewrite the follow-up as a short standalone question that keeps every name, date and detail it refers to. If it is already standalone, repeat it unchanged. Return only the question."),
+        ])
+        return prompt | self.llm | StrOutputParser()
+
+    # ------------------------------------------------------------
+    # Method: _build_summary_chain
+    # Description:
+    #   Creates the LLM chain that maintains the rolling summary of a
+    #   conversation.
+    # ------------------------------------------------------------
+    def _build_summary_chain(self):
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", "You maintain a brief running summary of a conversation between a user and an assistant."),
+            ("human", "Current summary:\n{summary}\n\nNew turns:\n{turns}\n\nUpdate the summary with the new turns in at most 150 words. Keep facts, names and open questions; drop small talk. Return only the summary."),
+        ])
+        return prompt | self.llm | StrOutputParser()
 
     # ------------------------------------------------------------
     # Method: _delete_documents
     # Description:
-    #   Removes document embeddings from both Chroma stores.
+    #   Removes document embeddings from the Chroma store(s), by
+    #   source path and, when given, by document id.
     # ------------------------------------------------------------
-    def _delete_documents(self, file_path):
-        public_vector_store = self.chroma_public_store()
-        private_vector_store = self.chroma_private_store()
-        public_vector_store.delete(where={"source": file_path})
-        private_vector_store.delete(where={"source": file_path})
+    def _delete_documents(self, file_path, document_id: int | None = None):
+        for store in self._stores():
+            if file_path:
+                store.delete(where={"source": file_path})
+            if document_id:
+                store.delete(where={"document_id": document_id})
         return True
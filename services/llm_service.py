@@ -1,6 +1,43 @@
+import threading
+import httpx
 from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from decouple import config
+from services.embedding_cache import CachedEmbeddings
+from services.embedding_writer import RateLimitedEmbeddings, provider_buckets
+
+# ------------------------------------------------------------
+# Default embedding quotas per provider:
+# (requests per minute, tokens per minute)
+# ------------------------------------------------------------
+EMBEDDING_RATE_LIMITS = {
+    'openai': (3000, 1000000),
+    'gemini': (1500, 1000000),
+}
+
+# ------------------------------------------------------------
+# Process-wide client cache shared by every LLMService instance,
+# so chat, Telegram and WhatsApp reuse warm provider connections
+# ------------------------------------------------------------
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+# ------------------------------------------------------------
+# Function: _shared_client
+# Description:
+#   Returns the cached client stored under `key`, creating it with
+#   `factory` on first use (thread-safe).
+# ------------------------------------------------------------
+def _shared_client(key: tuple, factory):
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = factory()
+        return _clients[key]
 
 # ------------------------------------------------------------
 # Class: LLMService
@@ -9,6 +46,8 @@ from decouple import config
 #   the selected provider ("openai" or "google").
 #   This class provides abstraction to easily switch between
 #   Gemini (Google) and GPT (OpenAI) models.
+#   Clients are cached per process and are safe to share between
+#   threads; OpenAI clients use one HTTP/2 keep-alive pool.
 # ------------------------------------------------------------
 
 
@@ -23,11 +62,47 @@ class LLMService:
         self.__chat_model = str(config("MODEL_NAME"))
         self.__embedding_model = str(config("EMBEDDING_MODEL"))
 
+        # Connection pool and timeouts for provider calls
+        self.__timeout = float(config("LLM_TIMEOUT", default=60))
+        self.__connect_timeout = float(config("LLM_CONNECT_TIMEOUT", default=10))
+        self.__max_retries = int(config("LLM_MAX_RETRIES", default=2))
+        self.__max_connections = int(config("LLM_HTTP_MAX_CONNECTIONS", default=20))
+        self.__max_keepalive = int(config("LLM_HTTP_MAX_KEEPALIVE", default=10))
+        self.__keepalive_expiry = float(config("LLM_HTTP_KEEPALIVE_EXPIRY", default=60))
+        self.__http2 = config("LLM_HTTP2", default=True, cast=bool)
+        self.__gemini_transport = str(config("GEMINI_TRANSPORT", default="grpc"))
+
+    # ------------------------------------------------------------
+    # Method: http_clients
+    # Description:
+    #   Returns the shared (sync, async) httpx clients used for
+    #   OpenAI calls: HTTP/2, keep-alive, bounded pool, timeouts.
+    # ------------------------------------------------------------
+    def http_clients(self) -> tuple[httpx.Client, httpx.AsyncClient]:
+        def build():
+            limits = httpx.Limits(
+                max_connections=self.__max_connections,
+                max_keepalive_connections=self.__max_keepalive,
+                keepalive_expiry=self.__keepalive_expiry,
+            )
+            timeout = httpx.Timeout(self.__timeout, connect=self.__connect_timeout)
+            return (
+                httpx.Client(http2=self.__http2, limits=limits, timeout=timeout),
+                httpx.AsyncClient(http2=self.__http2, limits=limits, timeout=timeout),
+            )
+
+        return _shared_client(("http",), build)
+
     # ------------------------------------------------------------
     # Method: gemini_chat_model
     # Description:
     #   Returns the Google Gemini chat model instance using
     #   the latest "gemini-2.5-flash" version.
+    #   - Gemini clients are google-api-core clients, not httpx: they
+    #     cannot take the shared httpx pool. With the default gRPC
+    #     transport each client keeps one persistent HTTP/2 channel
+    #     that multiplexes concurrent calls, and the model instance
+    #     (with its channel) is shared per process by get_chat_model.
     # ------------------------------------------------------------
 
     def gemini_chat_model(self):
@@ -35,19 +110,23 @@ class LLMService:
             model=self.__chat_model,
             temperature=0,
             max_output_tokens=None,
-            timeout=None,
-            max_retries=2,
+            timeout=self.__timeout,
+            max_retries=self.__max_retries,
+            transport=self.__gemini_transport,
         )
 
     # ------------------------------------------------------------
-    # Method: openai_chat_model
+    # Method: gemini_embedding_model
     # Description:
-    #   Returns the OpenAI GPT chat model instance.
-    #   Uses "gpt-4o-mini" for cost-effective responses.
+    #   Returns the Google Gemini embedding model instance.
+    #   Same transport as gemini_chat_model; ingestion batches are
+    #   retried by the embedding writer (EMBEDDING_MAX_RETRIES).
     # ------------------------------------------------------------
     def gemini_embedding_model(self):
         return GoogleGenerativeAIEmbeddings(
-            model=self.__embedding_model
+            model=self.__embedding_model,
+            transport=self.__gemini_transport,
+            request_options={"timeout": self.__timeout},
         )
 
     # ------------------------------------------------------------
@@ -57,7 +136,16 @@ class LLMService:
     #   Uses "gpt-4o-mini" for cost-effective responses.
     # ------------------------------------------------------------
     def openai_chat_model(self):
-        return ChatOpenAI(model=self.__chat_model, temperature=0, verbose=True)
+        http_client, http_async_client = self.http_clients()
+        return ChatOpenAI(
+            model=self.__chat_model,
+            temperature=0,
+            verbose=True,
+            timeout=self.__timeout,
+            max_retries=self.__max_retries,
+            http_client=http_client,
+            http_async_client=http_async_client,
+        )
 
     # ------------------------------------------------------------
     # Method: openai_embedding_model
@@ -66,26 +154,76 @@ class LLMService:
     #   similarity, clustering, or semantic search.
     # ------------------------------------------------------------
     def openai_embedding_model(self):
-        return OpenAIEmbeddings(model=self.__embedding_model)
+        http_client, http_async_client = self.http_clients()
+        return OpenAIEmbeddings(
+            model=self.__embedding_model,
+            timeout=self.__timeout,
+            max_retries=self.__max_retries,
+            http_client=http_client,
+            http_async_client=http_async_client,
+        )
 
     # ------------------------------------------------------------
     # Method: get_chat_model
     # Description:
     #   Automatically returns the appropriate chat model
-    #   depending on the configured provider.
+    #   depending on the configured provider (cached per process).
     # ------------------------------------------------------------
     def get_chat_model(self):
         if self.__provider == 'openai':
-            return self.openai_chat_model()
-        return self.gemini_chat_model()
+            return _shared_client(("chat", self.__provider, self.__chat_model), self.openai_chat_model)
+        return _shared_client(("chat", self.__provider, self.__chat_model), self.gemini_chat_model)
+
+    # ------------------------------------------------------------
+    # Method: get_embedding_rate_limits
+    # Description:
+    #   Returns (requests per minute, tokens per minute) for the
+    #   configured provider. EMBEDDING_RPM / EMBEDDING_TPM override
+    #   the provider defaults; 0 disables a limit.
+    # ------------------------------------------------------------
+    def get_embedding_rate_limits(self):
+        provider = 'openai' if self.__provider == 'openai' else 'gemini'
+        requests_per_minute, tokens_per_minute = EMBEDDING_RATE_LIMITS[provider]
+        return (
+            float(config("EMBEDDING_RPM", default=requests_per_minute)),
+            float(config("EMBEDDING_TPM", default=tokens_per_minute)),
+        )
 
     # ------------------------------------------------------------
     # Method: get_embedding_model
     # Description:
     #   Automatically returns the appropriate embedding model
     #   depending on the configured provider.
+    #   - API calls share the provider's process-wide rate limiter.
+    #   - Wrapped in a persistent content-addressed cache unless
+    #     EMBEDDING_CACHE_ENABLED is off (cache hits are not limited);
+    #     query embeddings are cached apart from document chunks.
+    #   - Cached per process.
     # ------------------------------------------------------------
     def get_embedding_model(self):
+        return _shared_client(("embedding", self.__provider, self.__embedding_model), self.__build_embedding_model)
+
+    # ------------------------------------------------------------
+    # Method: __build_embedding_model
+    # Description:
+    #   Builds the (rate-limited, cached) embedding model.
+    # ------------------------------------------------------------
+    def __build_embedding_model(self):
         if self.__provider == 'openai':
-            return self.openai_embedding_model()
-        return self.gemini_embedding_model()
+            embeddings = self.openai_embedding_model()
+        else:
+            embeddings = self.gemini_embedding_model()
+
+        request_bucket, token_bucket = provider_buckets(self.__provider, *self.get_embedding_rate_limits())
+        embeddings = RateLimitedEmbeddings(embeddings, request_bucket, token_bucket)
+
+        if not config("EMBEDDING_CACHE_ENABLED", default=True, cast=bool):
+            return embeddings
+
+        return CachedEmbeddings(
+            embeddings,
+            model_name=f"{self.__provider}:{self.__embedding_model}",
+            path=str(config("EMBEDDING_CACHE_PATH", default="./vector_db/embedding_cache.sqlite3")),
+            max_entries=int(config("EMBEDDING_CACHE_MAX_ENTRIES", default=200000)),
+            max_query_entries=int(config("EMBEDDING_CACHE_QUERY_MAX_ENTRIES", default=10000)),
+        )
@@ -0,0 +1,156 @@
+import asyncio
+from collections import deque
+from decouple import config
+from utils.logger import logger
+
+# ------------------------------------------------------------
+# Module: message_worker
+# Description:
+#   Bounded background worker pool for chat platform messages.
+#   - Webhook handlers only validate and `submit` a message, so
+#     they answer Telegram / WhatsApp within milliseconds and the
+#     platforms do not retry (and re-run the LLM pipeline).
+#   - A fixed number of asyncio workers drain a bounded queue on the
+#     server's event loop. Handlers are coroutines that move their
+#     own blocking work (LLM calls) off the loop with
+#     asyncio.to_thread; a plain function handler is run the same
+#     way, so the event loop is never blocked.
+#   - Messages submitted with the same `key` (a chat) run one at a
+#     time in submission order; different chats run in parallel.
+# ------------------------------------------------------------
+
+
+class MessageWorker:
+    # ------------------------------------------------------------
+    # Method: __init__
+    # Description:
+    #   Configures the pool. Nothing runs until `start` is called.
+    #
+    # Parameters:
+    #   - workers (int): Messages processed at the same time.
+    #   - queue_size (int): Max messages waiting; further submissions
+    #     are rejected so the platform retries later.
+    # ------------------------------------------------------------
+    def __init__(self, workers: int = 4, queue_size: int = 100):
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.__queue = None
+        self.__tasks = []
+        # key -> messages waiting for the running message of that key
+        self.__backlogs = {}
+        self.__backlog_size = 0
+
+    # ------------------------------------------------------------
+    # Method: start
+    # Description:
+    #   Starts the workers on the running event loop (call from an
+    #   async startup hook).
+    # ------------------------------------------------------------
+    def start(self):
+        if self.__tasks:
+            return
+        self.__queue = asyncio.Queue(maxsize=self.queue_size)
+        self.__tasks = [
+            asyncio.create_task(self.__run(), name=f"message-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    # ------------------------------------------------------------
+    # Method: stop
+    # Description:
+    #   Waits up to `timeout` seconds for queued messages, then
+    #   cancels the workers.
+    # ------------------------------------------------------------
+    async def stop(self, timeout: float = 10.0):
+        if not self.__tasks:
+            return
+        try:
+            await asyncio.wait_for(self.__queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Message worker stopped with {self.__queue.qsize() + self.__backlog_size} messages pending."
+            )
+
+        for task in self.__tasks:
+            task.cancel()
+        await asyncio.gather(*self.__tasks, return_exceptions=True)
+        self.__tasks = []
+        self.__backlogs = {}
+        self.__backlog_size = 0
+
+    # ------------------------------------------------------------
+    # Method: submit
+    # Description:
+    #   Queues `handler(*args)` without waiting for it. The handler
+    #   may be a coroutine function or a blocking function.
+    #   Messages with the same `key` are processed one at a time, in
+    #   the order they were submitted.
+    #
+    # Returns:
+    #   - bool: False when the queue is full (or not started).
+    # ------------------------------------------------------------
+    def submit(self, handler, *args, key: str | None = None) -> bool:
+        if self.__queue is None:
+            logger.error("Message worker is not started; dropping message.")
+            return False
+        if self.__queue.qsize() + self.__backlog_size >= self.queue_size:
+            logger.warning("Message queue is full; rejecting message.")
+            return False
+
+        item = (key, handler, args)
+        if key is not None:
+            backlog = self.__backlogs.get(key)
+            if backlog is not None:
+                # A message of this chat is queued or running: wait behind it
+                backlog.append(item)
+                self.__backlog_size += 1
+                return True
+            self.__backlogs[key] = deque()
+
+        self.__queue.put_nowait(item)
+        return True
+
+    # ------------------------------------------------------------
+    # Method: __run
+    # Description:
+    #   Worker loop: processes one message at a time, then releases
+    #   the next message of the same chat (if any) to the queue.
+    # ------------------------------------------------------------
+    async def __run(self):
+        while True:
+            key, handler, args = await self.__queue.get()
+            try:
+                if asyncio.iscoroutinefunction(handler):
+                    await handler(*args)
+                else:
+                    await asyncio.to_thread(handler, *args)
+            except Exception as e:
+                logger.error(f"Message handler failed: {str(e)}", exc_info=True)
+            finally:
+                if key is not None:
+                    self.__release_next(key)
+                self.__queue.task_done()
+
+    # ------------------------------------------------------------
+    # Method: __release_next
+    # Description:
+    #   Moves the next waiting message of `key` to the queue, or
+    #   marks the chat idle. Queue capacity is guaranteed because
+    #   `submit` bounds queued + waiting messages together.
+    # ------------------------------------------------------------
+    def __release_next(self, key: str):
+        backlog = self.__backlogs.get(key)
+        if backlog:
+            self.__backlog_size -= 1
+            self.__queue.put_nowait(backlog.popleft())
+        else:
+            self.__backlogs.pop(key, None)
+
+
+# ------------------------------------------------------------
+# Shared process-wide worker instance
+# ------------------------------------------------------------
+message_worker = MessageWorker(
+    workers=int(config("MESSAGE_WORKERS", default=4)),
+    queue_size=int(config("MESSAGE_QUEUE_SIZE", default=100)),
+)
@@ -0,0 +1,227 @@
+import asyncio
+import random
+import time
+from collections import OrderedDict
+import httpx
+from decouple import config
+from utils.logger import logger
+
+# ------------------------------------------------------------
+# Module: outbound_client
+# Description:
+#   Shared asynchronous client for messages sent to chat platforms
+#   (Telegram Bot API, WhatsApp Cloud API).
+#   - One httpx.AsyncClient with a persistent connection pool and
+#     timeouts, so replies reuse warm TLS connections.
+#   - Retries 429 / 5xx / network errors with exponential backoff
+#     and jitter, honouring Retry-After (and Telegram's retry_after).
+#   - Per-platform rate limits, globally and per chat.
+#   Base URLs come from TELEGRAM_API_URL / GRAPH_API_URL, so a local
+#   mock server can stand in for both platforms.
+# ------------------------------------------------------------
+
+
+class AsyncRateLimiter:
+    # ------------------------------------------------------------
+    # Method: __init__
+    # Description:
+    #   Token bucket refilled at `rate` tokens per second; `rate` <= 0
+    #   disables the limit.
+    # ------------------------------------------------------------
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.__tokens = self.capacity
+        self.__updated_at = time.monotonic()
+        self.__lock = asyncio.Lock()
+
+    # ------------------------------------------------------------
+    # Method: acquire
+    # Description:
+    #   Waits until a token is available and takes it. Waiters are
+    #   served in arrival order.
+    # ------------------------------------------------------------
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self.__lock:
+            now = time.monotonic()
+            self.__tokens = min(self.capacity, self.__tokens + (now - self.__updated_at) * self.rate)
+            self.__updated_at = now
+            if self.__tokens < 1:
+                await asyncio.sleep((1 - self.__tokens) / self.rate)
+                self.__tokens = 1
+                self.__updated_at = time.monotonic()
+            self.__tokens -= 1
+
+
+class OutboundClient:
+    # ------------------------------------------------------------
+    # Method: __init__
+    # Description:
+    #   Configures the client. The HTTP client is created on first
+    #   use, inside the running event loop.
+    #
+    # Parameters:
+    #   - limits (dict): {platform: (global per second, per chat per second)}
+    #   - max_connections (int): Max open connections overall.
+    #   - timeout (float): Seconds before a request is abandoned.
+    #   - max_retries (int): Retries for 429 / 5xx / network errors.
+    #   - base_delay / max_delay (float): Backoff bounds in seconds.
+    #   - max_chats (int): Per-chat limiters kept (least recently used
+    #     are dropped).
+    #   - transport (httpx.AsyncBaseTransport | None): Replaces the
+    #     network transport, e.g. httpx.MockTransport in tests.
+    # ------------------------------------------------------------
+    def __init__(self, limits: dict, max_connections: int = 50, timeout: float = 15.0,
+                 max_retries: int = 4, base_delay: float = 0.5, max_delay: float = 30.0,
+                 max_chats: int = 10000, transport: httpx.AsyncBaseTransport | None = None):
+        self.limits = limits
+        self.max_connections = max(1, max_connections)
+        self.timeout = timeout
+        self.max_retries = max(0, max_retries)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_chats = max(1, max_chats)
+        self.transport = transport
+
+        self.__client = None
+        self.__global_limiters = {}
+        self.__chat_limiters = OrderedDict()
+
+    # ------------------------------------------------------------
+    # Method: post
+    # Description:
+    #   Sends a JSON POST request for `platform`, waiting for the
+    #   global and per-chat rate limits first and retrying transient
+    #   failures.
+    #
+    # Returns:
+    #   - dict: Decoded JSON response (empty dict if not JSON).
+    #
+    # Raises:
+    #   - httpx.HTTPError: When the request still fails after retries.
+    # ------------------------------------------------------------
+    async def post(self, platform: str, url: str, payload: dict,
+                   headers: dict | None = None, chat_id=None) -> dict:
+        attempt = 0
+        while True:
+            await self.__global_limiter(platform).acquire()
+            if chat_id is not None:
+                await self.__chat_limiter(platform, chat_id).acquire()
+
+            try:
+                response = await self.__get_client().post(url, json=payload, headers=headers)
+                if response.status_code != 429 and response.status_code < 500:
+                    response.raise_for_status()
+                    try:
+                        return response.json()
+                    except ValueError:
+                        return {}
+                error = httpx.HTTPStatusError(
+                    f"{platform} API returned {response.status_code}", request=response.request, response=response
+                )
+                retry_after = self.__retry_after(response)
+            except httpx.TransportError as e:
+                error, retry_after = e, None
+
+            if attempt >= self.max_retries:
+                raise error
+
+            delay = retry_after if retry_after is not None else random.uniform(
+                0, min(self.max_delay, self.base_delay * (2 ** attempt))
+            )
+            attempt += 1
+            logger.warning(
+                f"{platform} request failed ({str(error)}); retry {attempt}/{self.max_retries} in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+    # ------------------------------------------------------------
+    # Method: aclose
+    # Description:
+    #   Closes the connection pool (application shutdown).
+    # ------------------------------------------------------------
+    async def aclose(self):
+        if self.__client is not None:
+            await self.__client.aclose()
+            self.__client = None
+        self.__global_limiters = {}
+        self.__chat_limiters = OrderedDict()
+
+    # ------------------------------------------------------------
+    # Method: __get_client
+    # Description:
+    #   Lazily creates the shared AsyncClient.
+    # ------------------------------------------------------------
+    def __get_client(self) -> httpx.AsyncClient:
+        if self.__client is None:
+            self.__client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                transport=self.transport,
+            )
+        return self.__client
+
+    # ------------------------------------------------------------
+    # Method: __global_limiter / __chat_limiter
+    # Description:
+    #   Return the rate limiter of a platform / of one chat.
+    # ------------------------------------------------------------
+    def __global_limiter(self, platform: str) -> AsyncRateLimiter:
+        if platform not in self.__global_limiters:
+            self.__global_limiters[platform] = AsyncRateLimiter(self.limits.get(platform, (0, 0))[0])
+        return self.__global_limiters[platform]
+
+    def __chat_limiter(self, platform: str, chat_id) -> AsyncRateLimiter:
+        key = (platform, str(chat_id))
+        limiter = self.__chat_limiters.get(key)
+        if limiter is None:
+            limiter = AsyncRateLimiter(self.limits.get(platform, (0, 0))[1], capacity=1)
+            self.__chat_limiters[key] = limiter
+            while len(self.__chat_limiters) > self.max_chats:
+                self.__chat_limiters.popitem(last=False)
+        else:
+            self.__chat_limiters.move_to_end(key)
+        return limiter
+
+    # ------------------------------------------------------------
+    # Method: __retry_after
+    # Description:
+    #   Seconds to wait as requested by the platform, if any
+    #   (Retry-After header or Telegram's parameters.retry_after).
+    # ------------------------------------------------------------
+    def __retry_after(self, response: httpx.Response) -> float | None:
+        value = response.headers.get("retry-after")
+        if value is None:
+            try:
+                value = response.json().get("parameters", {}).get("retry_after")
+            except Exception:
+                value = None
+        try:
+            return min(self.max_delay, max(0.0, float(value))) if value is not None else None
+        except (TypeError, ValueError):
+            return None
+
+
+# ------------------------------------------------------------
+# Shared process-wide client instance
+# ------------------------------------------------------------
+outbound_client = OutboundClient(
+    limits={
+        "telegram": (
+            float(config("TELEGRAM_RATE_LIMIT_GLOBAL", default=30)),
+            float(config("TELEGRAM_RATE_LIMIT_PER_CHAT", default=1)),
+        ),
+        "whatsapp": (
+            float(config("WHATSAPP_RATE_LIMIT_GLOBAL", default=80)),
+            float(config("WHATSAPP_RATE_LIMIT_PER_CHAT", default=1)),
+        ),
+    },
+    max_connections=int(config("OUTBOUND_MAX_CONNECTIONS", default=50)),
+    timeout=float(config("OUTBOUND_TIMEOUT", default=15)),
+    max_retries=int(config("OUTBOUND_MAX_RETRIES", default=4)),
+)
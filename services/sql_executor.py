@@ -0,0 +1,290 @@
+import re
+from decouple import config
+from db import readonly_engine
+from services.sql_schema import SqlSchema, sql_schema
+from utils.logger import logger
+
+# ------------------------------------------------------------
+# Module: sql_executor
+# Description:
+#   Guarded executor for SQL written by the LLM.
+#   - Accepts a single SELECT statement on the allow-listed tables
+#     only (no writes, no locking reads, no file access, no hidden
+#     columns).
+#   - Runs on the read-only engine (db.readonly_engine): read-only
+#     transactions with a MAX_EXECUTION_TIME statement timeout.
+#   - Caps the rows fetched and truncates the rendered result
+#     before it is placed in the answer prompt.
+#   Failures are returned as "Error: ..." text, like LangChain's
+#   QuerySQLDataBaseTool, so the answer chain can still respond.
+# ------------------------------------------------------------
+
+# Comments, quoted strings and quoted identifiers (removed before checks)
+_LITERALS = re.compile(
+    r"/\*.*?\*/|--[^\n]*|#[^\n]*|'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"",
+    flags=re.DOTALL,
+)
+_FORBIDDEN = re.compile(
+    r"\b(?:INSERT|UPDATE|DELETE|CREATE|ALTER|DROP|TRUNCATE|RENAME|GRANT|REVOKE|CALL|EXECUTE|"
+    r"PREPARE|HANDLER|INTO|OUTFILE|DUMPFILE|SLEEP|BENCHMARK|GET_LOCK|LOAD_FILE)\b|"
+    r"\bFOR\s+(?:UPDATE|SHARE)\b|\bLOCK\s+IN\s+SHARE\s+MODE\b",
+    flags=re.IGNORECASE,
+)
+# Identifiers (plain or `quoted`), numbers, punctuation
+_TOKEN = re.compile(r"`[^`]*`|[A-Za-z_$][\w$]*|\d+(?:\.\d+)?|\S")
+# Functions whose arguments contain FROM (e.g. EXTRACT(YEAR FROM created_at))
+_FROM_FUNCTIONS = {"EXTRACT", "TRIM", "SUBSTRING", "SUBSTR", "POSITION"}
+# Keywords that end a FROM clause
+_FROM_END = {"WHERE", "GROUP", "HAVING", "ORDER", "LIMIT", "UNION", "INTERSECT", "EXCEPT", "WINDOW", "SELECT"}
+
+
+class ReadOnlySqlExecutor:
+    # ------------------------------------------------------------
+    # Method: __init__
+    # Description:
+    #   Configures the executor.
+    #
+    # Parameters:
+    #   - engine: Read-only SQLAlchemy engine.
+    #   - schema (SqlSchema): Allow-listed tables and hidden columns.
+    #   - max_rows (int): Rows fetched at most.
+    #   - max_chars (int): Max length of the rendered result.
+    #   - max_cell_chars (int): Longer values are cut.
+    # ------------------------------------------------------------
+    def __init__(self, engine, schema: SqlSchema, max_rows: int = 50, max_chars: int = 4000,
+                 max_cell_chars: int = 200):
+        self.engine = engine
+        self.schema = schema
+        self.max_rows = max(1, max_rows)
+        self.max_chars = max(1, max_chars)
+        self.max_cell_chars = max(1, max_cell_chars)
+
+    # ------------------------------------------------------------
+    # Method: validate
+    # Description:
+    #   Checks that `sql` is a single SELECT on allowed tables.
+    #
+    # Returns:
+    #   - str: The statement without trailing semicolon, with a row
+    #     limit added when it has none.
+    #
+    # Raises:
+    #   - ValueError: If the statement is not allowed.
+    # ------------------------------------------------------------
+    def validate(self, sql: str) -> str:
+        statement = (sql or "").strip().rstrip(";").strip()
+        stripped = _LITERALS.sub(" ", statement)
+
+        if not statement:
+            raise ValueError("No SQL statement to run.")
+        if ";" in stripped:
+            raise ValueError("Only a single SQL statement is allowed.")
+        if not re.match(r"\s*(?:SELECT|WITH)\b", stripped, flags=re.IGNORECASE) or \
+                not re.search(r"\bSELECT\b", stripped, flags=re.IGNORECASE):
+            raise ValueError("Only SELECT statements are allowed.")
+
+        forbidden = _FORBIDDEN.search(stripped)
+        if forbidden:
+            raise ValueError(f"'{forbidden.group(0).upper()}' is not allowed in generated SQL.")
+
+        # Allow-listed tables (unqualified, i.e. in the current database) and CTE names
+        tokens = _tokenize(stripped)
+        allowed_tables = {table.lower() for table in self.schema.tables} | {"dual"}
+        allowed_tables |= {name.lower() for name in _cte_names(tokens)}
+        for table in _table_references(tokens):
+            if table.lower() not in allowed_tables:
+                raise ValueError(f"Table '{table}' is not available.")
+
+        for word in set(re.findall(r"[\w.`]+", stripped)):
+            name = word.replace("`", "")
+            table, _, column = name.rpartition(".")
+            if not self.schema.is_column_allowed(table or "", column):
+                raise ValueError(f"Column '{name}' is not available.")
+
+        if not re.search(r"\bLIMIT\s+\d+(?:\s*,\s*\d+|\s+OFFSET\s+\d+)?\s*$", stripped, flags=re.IGNORECASE):
+            statement = f"{statement}\nLIMIT {self.max_rows + 1}"
+        return statement
+
+    # ------------------------------------------------------------
+    # Method: run
+    # Description:
+    #   Validates and executes `sql`, returning the rendered result
+    #   (or an "Error: ..." text).
+    # ------------------------------------------------------------
+    def run(self, sql: str) -> str:
+        try:
+            statement = self.validate(sql)
+        except ValueError as e:
+            logger.warning(f"Rejected generated SQL: {str(e)}")
+            return f"Error: {str(e)}"
+
+        try:
+            with self.engine.connect() as connection:
+                result = connection.execution_options(no_parameters=True).exec_driver_sql(statement)
+                columns = list(result.keys())
+                rows = result.fetchmany(self.max_rows + 1)
+                result.close()
+        except Exception as e:
+            logger.warning(f"Generated SQL failed: {str(e)}")
+            return f"Error: {str(e)}"
+
+        return self.render(columns, rows)
+
+    # ------------------------------------------------------------
+    # Method: render
+    # Description:
+    #   Formats the result for the answer prompt: hidden columns
+    #   (e.g. from SELECT *) are dropped, long values are cut, and
+    #   the text is truncated to `max_chars`.
+    # ------------------------------------------------------------
+    def render(self, columns: list[str], rows: list) -> str:
+        visible = [index for index, column in enumerate(columns) if self.schema.is_column_allowed("", column)]
+        header = " | ".join(columns[index] for index in visible)
+        if not rows:
+            return f"{header}\n(no rows)"
+
+        truncated = len(rows) > self.max_rows
+        lines = []
+        size = len(header)
+        for row in rows[:self.max_rows]:
+            line = " | ".join(self.__cell(row[index]) for index in visible)
+            if size + 1 + len(line) > self.max_chars:
+                truncated = True
+                break
+            lines.append(line)
+            size += 1 + len(line)
+
+        text = "\n".join([header] + lines)
+        if truncated:
+            text += f"\n(result truncated to the first {len(lines)} rows)"
+        return text
+
+    # ------------------------------------------------------------
+    # Method: __cell
+    # Description:
+    #   Renders one value, cut to `max_cell_chars`.
+    # ------------------------------------------------------------
+    def __cell(self, value) -> str:
+        value = "NULL" if value is None else str(value).replace("\n", " ")
+        if len(value) > self.max_cell_chars:
+            return value[:self.max_cell_chars] + "..."
+        return value
+
+
+# ------------------------------------------------------------
+# Method: _tokenize
+# Description:
+#   Splits SQL (without comments and string literals) into
+#   identifiers, numbers and punctuation. Quoted identifiers are
+#   returned without backticks; keywords are matched
+#   case-insensitively by the callers.
+# ------------------------------------------------------------
+def _tokenize(sql: str) -> list[str]:
+    return [token[1:-1] if token.startswith("`") else token for token in _TOKEN.findall(sql)]
+
+
+# ------------------------------------------------------------
+# Method: _closing_paren
+# Description:
+#   Index of the ")" matching the "(" at `start`.
+# ------------------------------------------------------------
+def _closing_paren(tokens: list[str], start: int) -> int:
+    depth = 0
+    for index in range(start, len(tokens)):
+        if tokens[index] == "(":
+            depth += 1
+        elif tokens[index] == ")":
+            depth -= 1
+            if depth == 0:
+                return index
+    return len(tokens) - 1
+
+
+# ------------------------------------------------------------
+# Method: _cte_names
+# Description:
+#   Names defined by the leading WITH clause
+#   (WITH [RECURSIVE] name [(columns)] AS (...), ...).
+# ------------------------------------------------------------
+def _cte_names(tokens: list[str]) -> list[str]:
+    if not tokens or tokens[0].upper() != "WITH":
+        return []
+    names = []
+    index = 2 if len(tokens) > 1 and tokens[1].upper() == "RECURSIVE" else 1
+    while index < len(tokens):
+        names.append(tokens[index])
+        index += 1
+        if index < len(tokens) and tokens[index] == "(":
+            index = _closing_paren(tokens, index) + 1
+        if index >= len(tokens) or tokens[index].upper() != "AS":
+            break
+        index += 1
+        if index >= len(tokens) or tokens[index] != "(":
+            break
+        index = _closing_paren(tokens, index) + 1
+        if index >= len(tokens) or tokens[index] != ",":
+            break
+        index += 1
+    return names
+
+
+# ------------------------------------------------------------
+# Method: _table_references
+# Description:
+#   Every table named in a FROM clause, at any nesting level:
+#   the first table, comma-separated tables, JOIN targets and
+#   tables inside parenthesized joins. Qualified names are
+#   returned as 'schema.table'. Derived tables are skipped (their
+#   own FROM clauses are scanned).
+# ------------------------------------------------------------
+def _table_references(tokens: list[str]) -> list[str]:
+    references = []
+    # One frame per parenthesis level: is it in a FROM clause, is a table expected next
+    frames = [{"in_from": False, "expect": False}]
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        keyword = token.upper()
+        frame = frames[-1]
+
+        if token == "(":
+            inner = tokens[index + 1].upper() if index + 1 < len(tokens) else ""
+            if frame["expect"] and inner not in ("SELECT", "WITH"):
+                frames.append({"in_from": True, "expect": True})       # (a JOIN b ON ...)
+            else:
+                frames.append({"in_from": False, "expect": False})     # subquery / expression
+            frame["expect"] = False
+        elif token == ")":
+            if len(frames) > 1:
+                frames.pop()
+        elif keyword in _FROM_FUNCTIONS and index + 1 < len(tokens) and tokens[index + 1] == "(":
+            index = _closing_paren(tokens, index + 1)
+        elif keyword == "FROM" or (keyword.endswith("JOIN") and frame["in_from"]):
+            frame["in_from"] = True
+            frame["expect"] = True
+        elif token == "," and frame["in_from"]:
+            frame["expect"] = True
+        elif keyword in _FROM_END:
+            frame["in_from"] = False
+            frame["expect"] = False
+        elif frame["expect"] and keyword != "LATERAL" and token != ".":
+            name = [token]
+            while index + 2 < len(tokens) and tokens[index + 1] == ".":
+                name.append(tokens[index + 2])
+                index += 2
+            references.append(".".join(name))
+            frame["expect"] = False
+        index += 1
+    return references
+
+
+# ------------------------------------------------------------
+# Shared process-wide executor instance
+# ------------------------------------------------------------
+sql_executor = ReadOnlySqlExecutor(
+    readonly_engine,
+    sql_schema,
+    max_rows=int(config("SQL_MAX_ROWS", default=50)),
+    max_chars=int(config("SQL_RESULT_MAX_CHARS", default=4000)),
+    max_cell_chars=int(config("SQL_RESULT_MAX_CELL_CHARS", default=200)),
+)
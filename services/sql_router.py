@@ -0,0 +1,174 @@
+import re
+import threading
+import numpy as np
+from services.answer_cache import AnswerCache
+from utils.logger import logger
+
+# ------------------------------------------------------------
+# Module: sql_router
+# Description:
+#   Decides whether a logged-in question needs the SQL branch, so
+#   document questions ("what is our leave policy?") skip SQL
+#   generation and execution entirely.
+#   - Keyword phrases: multi-word terms ("how many", "employee
+#     address", ...); a hit always routes to SQL.
+#   - Keyword words: single terms ("email", "employees", ...) are too
+#     generic to decide alone ("What is the employee leave policy?"),
+#     so they are left to the embedding stage (in 'keywords' mode,
+#     or without embeddings, a hit still routes to SQL).
+#   - Embeddings: the question embedding is compared with example
+#     database and document questions; the closer group wins.
+#   When unsure (e.g. the embedding call fails) the SQL branch runs,
+#   as it did before routing existed.
+# ------------------------------------------------------------
+
+DATABASE_EXAMPLES = [
+    "How many employees do we have?",
+    "List all admin employees.",
+    "What is the email address of John?",
+    "Which city does Priya live in?",
+    "Show the addresses of employee 12.",
+    "Who joined the company most recently?",
+    "Which documents did Alice upload?",
+    "How many private documents are there?",
+]
+
+GENERAL_EXAMPLES = [
+    "What is our leave policy?",
+    "How do I apply for a reimbursement?",
+    "What services does the company offer?",
+    "Explain the code of conduct.",
+    "What are the office working hours?",
+    "Tell me about the onboarding process.",
+    "What are the benefits for full-time staff?",
+    "Hello, who are you?",
+]
+
+
+class SqlRouter:
+    # ------------------------------------------------------------
+    # Method: __init__
+    # Description:
+    #   Configures the router; example embeddings are computed on
+    #   first use.
+    #
+    # Parameters:
+    #   - embeddings: Embedding model (None disables the embedding stage).
+    #   - keywords (list[str]): Terms pointing at the database;
+    #     multi-word phrases always route to SQL, single words only
+    #     without the embedding stage.
+    #   - mode (str): 'hybrid' (keywords + embeddings), 'keywords'
+    #     or 'off' (always run SQL).
+    #   - margin (float): How much closer the question must be to the
+    #     database examples than to the document examples.
+    # ------------------------------------------------------------
+    def __init__(self, embeddings=None, keywords: list[str] | None = None, mode: str = "hybrid",
+                 margin: float = 0.0, database_examples: list[str] | None = None,
+                 general_examples: list[str] | None = None):
+        self.embeddings = embeddings
+        self.mode = mode
+        self.margin = margin
+        self.database_examples = database_examples or DATABASE_EXAMPLES
+        self.general_examples = general_examples or GENERAL_EXAMPLES
+        terms = {" ".join(keyword.lower().split()) for keyword in keywords or [] if keyword.strip()}
+        self.__phrase_pattern = self.__pattern(term for term in terms if " " in term)
+        self.__word_pattern = self.__pattern(term for term in terms if " " not in term)
+        self.__lock = threading.Lock()
+        self.__prototypes = None
+
+    # ------------------------------------------------------------
+    # Method: needs_sql
+    # Description:
+    #   True when the question should go through the SQL branch.
+    #
+    # Parameters:
+    #   - question (str): The (standalone) user question.
+    #   - embedding (list[float] | None): Question embedding, if it
+    #     was already computed (e.g. for the answer cache).
+    # ------------------------------------------------------------
+    def needs_sql(self, question: str, embedding=None) -> bool:
+        if self.mode == "off":
+            return True
+
+        normalized = AnswerCache.normalize(question)
+        if self.__phrase_pattern is not None and self.__phrase_pattern.search(normalized):
+            return True
+        if self.mode != "hybrid" or self.embeddings is None:
+            return self.__word_pattern is not None and self.__word_pattern.search(normalized) is not None
+
+        try:
+            if embedding is None:
+                embedding = self.embeddings.embed_query(question)
+            database, general = self.__get_prototypes()
+            vector = self.__unit(embedding)
+            return float(np.max(database @ vector)) >= float(np.max(general @ vector)) + self.margin
+        except Exception as e:
+            logger.warning(f"SQL routing failed, running the SQL branch: {str(e)}")
+            return True
+
+    # ------------------------------------------------------------
+    # Method: __pattern
+    # Description:
+    #   Matches any of `terms` as whole words (plural forms included),
+    #   or None when there are no terms.
+    # ------------------------------------------------------------
+    @staticmethod
+    def __pattern(terms):
+        terms = sorted(terms, key=len, reverse=True)
+        if not terms:
+            return None
+        return re.compile(r"\b(?:" + "|".join(re.escape(term) for term in terms) + r")(?:s|es)?\b")
+
+    # ------------------------------------------------------------
+    # Method: __get_prototypes
+    # Description:
+    #   Embeds the example questions once.
+    # ------------------------------------------------------------
+    def __get_prototypes(self):
+        if self.__prototypes is None:
+            with self.__lock:
+                if self.__prototypes is None:
+                    vectors = self.embeddings.embed_documents(self.database_examples + self.general_examples)
+                    vectors = np.vstack([self.__unit(vector) for vector in vectors])
+                    split = len(self.database_examples)
+                    self.__prototypes = (vectors[:split], vectors[split:])
+        return self.__prototypes
+
+    # ------------------------------------------------------------
+    # Method: __unit
+    # Description:
+    #   Converts an embedding to a unit-length float32 vector.
+    # ------------------------------------------------------------
+    @staticmethod
+    def __unit(embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+# ------------------------------------------------------------
+# Method: schema_keywords
+# Description:
+#   Keywords derived from table names: multi-word tables give their
+#   singular phrase ('employee_addresses' -> 'employee address'),
+#   single-word tables their plural ('employees'). Bare singular
+#   words ('employee', 'document') are not added; they appear in
+#   document questions just as often.
+# ------------------------------------------------------------
+def schema_keywords(tables: list[str]) -> list[str]:
+    keywords = set()
+    for table in tables:
+        words = [word for word in table.lower().split("_") if word]
+        if len(words) > 1:
+            keywords.add(" ".join(_singular(word) for word in words))
+        elif words and _singular(words[0]) != words[0]:
+            keywords.add(words[0])
+    return sorted(keywords)
+
+
+def _singular(word: str) -> str:
+    if word.endswith("sses"):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
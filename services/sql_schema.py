@@ -0,0 +1,153 @@
+import hashlib
+from decouple import config
+from langchain_community.utilities import SQLDatabase
+from sqlalchemy import MetaData, bindparam, select, text
+from db import readonly_engine
+from utils.logger import logger
+
+# ------------------------------------------------------------
+# Module: sql_schema
+# Description:
+#   Reflected database schema used by the NL-to-SQL chain.
+#   - Reflected on the shared read-only engine (no extra engine or
+#     pool per chain build), only when the SQL chain is (re)built:
+#     on first use and after a schema change.
+#   - Limited to an allow-list of tables; sensitive columns (e.g.
+#     `password`) never appear in the prompt, not even in the
+#     sample rows.
+#   - The table info (CREATE TABLE + sample rows) is rendered once,
+#     so building a SQL prompt costs no database round trip.
+# ------------------------------------------------------------
+
+
+class SqlSchema:
+    # ------------------------------------------------------------
+    # Method: __init__
+    # Description:
+    #   Configures the schema; nothing is reflected until first use.
+    #
+    # Parameters:
+    #   - engine: SQLAlchemy engine to reflect and sample from.
+    #   - tables (list[str]): Tables visible to the SQL chain.
+    #   - excluded_columns (list[str]): Hidden columns, as 'column'
+    #     (any table) or 'table.column'.
+    #   - sample_rows (int): Example rows shown per table (0 = none).
+    # ------------------------------------------------------------
+    def __init__(self, engine, tables: list[str], excluded_columns: list[str], sample_rows: int = 3):
+        self.engine = engine
+        self.tables = tables
+        self.excluded_columns = {column.lower() for column in excluded_columns}
+        self.sample_rows = max(0, sample_rows)
+
+    # ------------------------------------------------------------
+    # Method: reload
+    # Description:
+    #   Reflects the schema and returns a new SQLDatabase. Called by
+    #   the chain registry when it (re)builds the SQL chain.
+    # ------------------------------------------------------------
+    def reload(self) -> SQLDatabase:
+        return self.__build()
+
+    # ------------------------------------------------------------
+    # Method: is_column_allowed
+    # Description:
+    #   False for columns hidden from the SQL chain.
+    # ------------------------------------------------------------
+    def is_column_allowed(self, table: str, column: str) -> bool:
+        column = column.lower()
+        return column not in self.excluded_columns and f"{table.lower()}.{column}" not in self.excluded_columns
+
+    # ------------------------------------------------------------
+    # Method: fingerprint
+    # Description:
+    #   Hashes the column layout of the allow-listed tables, so the
+    #   SQL chain is rebuilt only when one of them changes.
+    # ------------------------------------------------------------
+    def fingerprint(self) -> str:
+        query = text(
+            "SELECT table_name, column_name, column_type "
+            "FROM information_schema.columns "
+            "WHERE table_schema = DATABASE() AND table_name IN :tables "
+            "ORDER BY table_name, ordinal_position"
+        ).bindparams(bindparam("tables", expanding=True))
+        with self.engine.connect() as connection:
+            rows = connection.execute(query, {"tables": self.tables}).fetchall()
+        return hashlib.sha256(repr(rows).encode("utf-8")).hexdigest()
+
+    # ------------------------------------------------------------
+    # Method: __build
+    # Description:
+    #   Reflects the allow-listed tables once and renders their
+    #   table info without the excluded columns. SQLDatabase reuses
+    #   the reflected metadata instead of reflecting again.
+    # ------------------------------------------------------------
+    def __build(self) -> SQLDatabase:
+        metadata = MetaData()
+        metadata.reflect(bind=self.engine, only=self.tables)
+
+        table_info = {}
+        with self.engine.connect() as connection:
+            for name in self.tables:
+                table_info[name] = self.__table_info(connection, metadata.tables[name])
+
+        logger.info(f"Reflected SQL schema for tables: {', '.join(self.tables)}")
+        return SQLDatabase(
+            self.engine,
+            metadata=metadata,
+            include_tables=self.tables,
+            sample_rows_in_table_info=0,
+            custom_table_info=table_info,
+            lazy_table_reflection=True,
+        )
+
+    # ------------------------------------------------------------
+    # Method: __table_info
+    # Description:
+    #   Renders CREATE TABLE and sample rows for one table, in the
+    #   same layout as SQLDatabase.get_table_info.
+    # ------------------------------------------------------------
+    def __table_info(self, connection, table) -> str:
+        columns = [column for column in table.columns if self.is_column_allowed(table.name, column.name)]
+        names = {column.name for column in columns}
+
+        lines = [
+            f"\t{column.name} {column.type.compile(dialect=self.engine.dialect)}"
+            f"{'' if column.nullable else ' NOT NULL'}"
+            for column in columns
+        ]
+        primary_key = [column.name for column in table.primary_key.columns if column.name in names]
+        if primary_key:
+            lines.append(f"\tPRIMARY KEY ({', '.join(primary_key)})")
+        for foreign_key in table.foreign_keys:
+            if foreign_key.parent.name in names:
+                target_table, target_column = foreign_key.target_fullname.rsplit(".", 1)
+                lines.append(f"\tFOREIGN KEY({foreign_key.parent.name}) REFERENCES {target_table} ({target_column})")
+        info = f"CREATE TABLE {table.name} (\n" + ",\n".join(lines) + "\n)"
+
+        if not self.sample_rows or not columns:
+            return info
+        try:
+            rows = connection.execute(select(*columns).limit(self.sample_rows)).fetchall()
+        except Exception as e:
+            logger.warning(f"Sampling rows of '{table.name}' failed: {str(e)}")
+            return info
+        sample = "\n".join(
+            "\t".join(str(value)[:100] for value in row) for row in rows
+        )
+        header = "\t".join(column.name for column in columns)
+        return f"{info}\n\n/*\n{len(rows)} rows from {table.name} table:\n{header}\n{sample}\n*/"
+
+
+# ------------------------------------------------------------
+# Shared process-wide schema instance
+# ------------------------------------------------------------
+def _config_list(key: str, default: str) -> list[str]:
+    return [item.strip() for item in str(config(key, default=default)).split(",") if item.strip()]
+
+
+sql_schema = SqlSchema(
+    readonly_engine,
+    tables=_config_list("SQL_CHAIN_TABLES", "employees,employee_addresses,documents"),
+    excluded_columns=_config_list("SQL_CHAIN_EXCLUDED_COLUMNS", "password"),
+    sample_rows=int(config("SQL_CHAIN_SAMPLE_ROWS", default=3)),
+)
@@ -1,6 +1,8 @@
+import asyncio
 from decouple import config
-import requests
-from services.langchain_service import LangchainService
+from services.container import container
+from services.outbound_client import outbound_client
+from services.conversation_memory import conversation_memory
 
 # ------------------------------------------------------------
 # Module: telegram_service
@@ -17,17 +19,18 @@ class TelegramService:
     # Description:
     #   Initializes Telegram service configuration.
     #   - Loads bot token and API URL from environment variables.
-    #   - Instantiates OpenAI model handler for generating replies.
+    #   - Uses the shared LangchainService for generating replies.
     # ------------------------------------------------------------
     def __init__(self):
         self.__telegram_token = str(config("BOT_TOKEN")).strip()
         self.__telegram_api_url = str(config("TELEGRAM_API_URL")).strip()
-        self.__langchain_service = LangchainService()
+        self.__langchain_service = container.langchain_service()
 
     # ------------------------------------------------------------
     # Method: _start_app
     # Description:
-    #   Sends a welcome message to a user when they start the bot.
+    #   Sends a welcome message to a user when they start the bot
+    #   and starts a fresh conversation history.
     #
     # Parameters:
     #   - chat_id (int): Unique identifier for the Telegram chat.
@@ -35,14 +38,14 @@ class TelegramService:
     # Returns:
     #   - dict: Telegram API response JSON.
     # ------------------------------------------------------------
-    def _start_app(self, chat_id):
+    async def _start_app(self, chat_id):
         try:
             url = f"{self.__telegram_api_url}/bot{self.__telegram_token}"
             reply_text = "👋 Hello! Welcome to the OpenAI Bot. Ask me anything!"
             payload = {"chat_id": chat_id, "text": reply_text}
 
-            response = requests.post(f"{url}/sendMessage", json=payload)
-            return response.json()
+            await asyncio.to_thread(conversation_memory.clear, f"telegram:{chat_id}")
+            return await outbound_client.post("telegram", f"{url}/sendMessage", payload, chat_id=chat_id)
         except Exception as e:
             raise ProcessLookupError(str(e))
 
@@ -53,7 +56,8 @@ class TelegramService:
     #
     # Workflow:
     #     1. Receives a user query from Telegram.
-    #     2. Passes the query to the OpenAI model for response generation.
+    #     2. Passes the query, with the chat's conversation history, to
+    #        the OpenAI model for response generation.
     #     3. Sends the AI’s response back to the Telegram chat.
     #
     # Parameters:
@@ -63,15 +67,16 @@ class TelegramService:
     # Returns:
     #   - dict: Telegram API response JSON.
     # ------------------------------------------------------------
-    def _reply_message(self, chat_id, query: str):
+    async def _reply_message(self, chat_id, query: str):
         try:
             url = f"{self.__telegram_api_url}/bot{self.__telegram_token}"
 
-            # Generate AI response
-            reply_text = self.__langchain_service.generate_answer(query)
+            # Generate AI response (blocking pipeline, run off the event loop)
+            reply_text = await asyncio.to_thread(
+                self.__langchain_service.generate_answer, query, False, f"telegram:{chat_id}"
+            )
 
             payload = {"chat_id": chat_id, "text": reply_text['answer']}
-            response = requests.post(f"{url}/sendMessage", json=payload)
-            return response.json()
+            return await outbound_client.post("telegram", f"{url}/sendMessage", payload, chat_id=chat_id)
         except Exception as e:
             raise ProcessLookupError(str(e))
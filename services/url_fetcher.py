@@ -0,0 +1,219 @@
+import asyncio
+import threading
+from urllib.parse import urlsplit
+import httpx
+from decouple import config
+from utils.logger import logger
+
+# ------------------------------------------------------------
+# Module: url_fetcher
+# Description:
+#   Pooled, asynchronous HTTP fetching for URL documents.
+#   - One shared httpx.AsyncClient (keep-alive connection reuse),
+#     running on a dedicated event loop thread so neither API
+#     workers nor the scheduler wait on slow third-party sites.
+#   - Per-host concurrency limits and a minimum interval between
+#     requests to the same host (politeness for re-crawls).
+#   - Conditional GET (If-None-Match / If-Modified-Since).
+#   - Connect/read timeouts.
+# ------------------------------------------------------------
+
+
+class UrlFetcher:
+    # ------------------------------------------------------------
+    # Method: __init__
+    # Description:
+    #   Configures the client pool. Nothing runs until `start` (or
+    #   the first `submit`).
+    #
+    # Parameters:
+    #   - max_connections (int): Max open connections overall.
+    #   - max_per_host (int): Max concurrent requests per host.
+    #   - min_host_interval (float): Min seconds between the start of
+    #     two requests to the same host.
+    #   - timeout (float): Seconds before a request is abandoned.
+    #   - user_agent (str): User-Agent header sent to every site.
+    # ------------------------------------------------------------
+    def __init__(self, max_connections: int = 20, max_per_host: int = 2, min_host_interval: float = 1.0,
+                 timeout: float = 20.0, user_agent: str = "chat-bot-ingestion/1.0"):
+        self.max_connections = max(1, max_connections)
+        self.max_per_host = max(1, max_per_host)
+        self.min_host_interval = max(0.0, min_host_interval)
+        self.timeout = timeout
+        self.user_agent = user_agent
+
+        self.__lock = threading.Lock()
+        self.__loop = None
+        self.__thread = None
+        self.__client = None
+        self.__host_limits = {}
+        self.__next_request_at = {}
+
+    # ------------------------------------------------------------
+    # Method: start
+    # Description:
+    #   Starts the event loop thread (idempotent).
+    # ------------------------------------------------------------
+    def start(self):
+        with self.__lock:
+            if self.__thread is not None and self.__thread.is_alive():
+                return
+            self.__loop = asyncio.new_event_loop()
+            self.__thread = threading.Thread(
+                target=self.__loop.run_forever, name="url-fetcher", daemon=True
+            )
+            self.__thread.start()
+
+    # ------------------------------------------------------------
+    # Method: stop
+    # Description:
+    #   Closes the HTTP client and stops the event loop thread.
+    # ------------------------------------------------------------
+    def stop(self):
+        with self.__lock:
+            loop, thread = self.__loop, self.__thread
+            self.__loop = self.__thread = None
+        if loop is None:
+            return
+
+        if self.__client is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self.__client.aclose(), loop).result(timeout=5)
+            except Exception as e:
+                logger.warning(f"Closing the URL fetcher client failed: {str(e)}")
+            self.__client = None
+        self.__host_limits = {}
+        self.__next_request_at = {}
+
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+
+    # ------------------------------------------------------------
+    # Method: submit
+    # Description:
+    #   Schedules a coroutine on the fetcher loop, optionally after
+    #   `delay` seconds, and returns a concurrent.futures.Future.
+    # ------------------------------------------------------------
+    def submit(self, coroutine, delay: float = 0.0):
+        self.start()
+
+        async def run():
+            if delay > 0:
+                await asyncio.sleep(delay)
+            return await coroutine
+
+        future = asyncio.run_coroutine_threadsafe(run(), self.__loop)
+        future.add_done_callback(self.__log_failure)
+        return future
+
+    # ------------------------------------------------------------
+    # Method: fetch
+    # Description:
+    #   Fetches a URL (must run on the fetcher loop, e.g. inside a
+    #   coroutine passed to `submit`).
+    #
+    # Parameters:
+    #   - etag / last_modified (str | None): Validators of the last
+    #     successful fetch, sent as a conditional request.
+    #
+    # Returns:
+    #   - dict: {"status", "not_modified", "content", "content_type",
+    #     "etag", "last_modified", "url"}
+    # ------------------------------------------------------------
+    async def fetch(self, url: str, etag: str | None = None, last_modified: str | None = None) -> dict:
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        host = urlsplit(url).netloc.lower()
+        async with self.__host_limit(host):
+            await self.__wait_turn(host)
+            response = await self.__get_client().get(url, headers=headers)
+
+        if response.status_code == 304:
+            return {
+                "status": 304,
+                "not_modified": True,
+                "content": b"",
+                "content_type": "",
+                "etag": etag,
+                "last_modified": last_modified,
+                "url": str(response.url),
+            }
+
+        response.raise_for_status()
+        return {
+            "status": response.status_code,
+            "not_modified": False,
+            "content": response.content,
+            "content_type": response.headers.get("content-type", ""),
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "url": str(response.url),
+        }
+
+    # ------------------------------------------------------------
+    # Method: __get_client
+    # Description:
+    #   Lazily creates the shared AsyncClient on the fetcher loop.
+    # ------------------------------------------------------------
+    def __get_client(self) -> httpx.AsyncClient:
+        if self.__client is None:
+            self.__client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                headers={"User-Agent": self.user_agent},
+                follow_redirects=True,
+            )
+        return self.__client
+
+    # ------------------------------------------------------------
+    # Method: __host_limit
+    # Description:
+    #   Returns the semaphore limiting concurrent requests to `host`.
+    # ------------------------------------------------------------
+    def __host_limit(self, host: str) -> asyncio.Semaphore:
+        if host not in self.__host_limits:
+            self.__host_limits[host] = asyncio.Semaphore(self.max_per_host)
+        return self.__host_limits[host]
+
+    # ------------------------------------------------------------
+    # Method: __wait_turn
+    # Description:
+    #   Reserves the next request slot of `host` and sleeps until it
+    #   starts, spacing requests by `min_host_interval` seconds.
+    # ------------------------------------------------------------
+    async def __wait_turn(self, host: str):
+        now = asyncio.get_running_loop().time()
+        start_at = max(now, self.__next_request_at.get(host, 0.0))
+        self.__next_request_at[host] = start_at + self.min_host_interval
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+
+    # ------------------------------------------------------------
+    # Method: __log_failure
+    # Description:
+    #   Logs coroutines that ended with an unhandled exception.
+    # ------------------------------------------------------------
+    @staticmethod
+    def __log_failure(future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"URL fetcher task failed: {str(future.exception())}")
+
+
+# ------------------------------------------------------------
+# Shared process-wide fetcher instance
+# ------------------------------------------------------------
+url_fetcher = UrlFetcher(
+    max_connections=int(config("URL_FETCH_MAX_CONNECTIONS", default=20)),
+    max_per_host=int(config("URL_FETCH_MAX_PER_HOST", default=2)),
+    min_host_interval=float(config("URL_FETCH_MIN_HOST_INTERVAL", default=1)),
+    timeout=float(config("URL_FETCH_TIMEOUT", default=20)),
+    user_agent=str(config("URL_FETCH_USER_AGENT", default="chat-bot-ingestion/1.0")),
+)
@@ -6,6 +6,7 @@ import re
 #   Provides utility helper functions for text and SQL processing.
 #   - Cleans AI-generated SQL queries by removing markdown syntax,
 #     formatting inconsistencies, and extraneous text.
+#   - Merges several answers into one without repeated sentences.
 # ------------------------------------------------------------
 
 
@@ -69,3 +70,38 @@ class UtilityService:
         text = re.sub(r'\n\s*\n', '\n', text)
 
         return text
+
+    # ------------------------------------------------------------
+    # Method: merge_answers
+    # Description:
+    #   Deterministically merges several answers into one text.
+    #
+    # Workflow:
+    #     1. Splits every answer into paragraphs and sentences.
+    #     2. Drops sentences already seen (case/space/punctuation-insensitive).
+    #     3. Joins the remaining paragraphs with blank lines.
+    #
+    # Parameters:
+    #   - answers (list[str]): Answers in priority order.
+    #
+    # Returns:
+    #   - str: The merged answer.
+    # ------------------------------------------------------------
+    def merge_answers(self, answers: list[str]) -> str:
+        seen = set()
+        paragraphs = []
+
+        for answer in answers:
+            for paragraph in re.split(r'\n\s*\n', answer or ''):
+                sentences = []
+                for sentence in re.split(r'(?<=[.!?])\s+', paragraph.strip()):
+                    key = re.sub(r'[^\w]+', ' ', sentence.lower()).strip()
+                    if not key or key in seen:
+                        continue
+                    seen.add(key)
+                    sentences.append(sentence.strip())
+
+                if sentences:
+                    paragraphs.append(' '.join(sentences))
+
+        return '\n\n'.join(paragraphs)
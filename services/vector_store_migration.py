@@ -0,0 +1,129 @@
+import argparse
+import chromadb
+from services.langchain_service import (
+    PERSIST_DIRECTORY,
+    PUBLIC_COLLECTION,
+    PRIVATE_COLLECTION,
+    UNIFIED_COLLECTION,
+)
+from utils.logger import logger
+
+# ------------------------------------------------------------
+# Module: vector_store_migration
+# Description:
+#   One-off command that merges the legacy public and private
+#   Chroma collections into the single unified collection used
+#   when VECTOR_STORE_MODE=single.
+#   - Copies stored embeddings as-is (no embedding API calls).
+#   - Tags every chunk with `visibility` = 'public' or 'private'.
+#
+# Usage:
+#   python -m services.vector_store_migration [--batch-size 500] [--drop-old]
+# ------------------------------------------------------------
+
+
+# ------------------------------------------------------------
+# Function: _collection_ids
+# Description:
+#   Returns every id stored in a collection (or an empty set).
+# ------------------------------------------------------------
+def _collection_ids(client, name: str) -> set:
+    try:
+        collection = client.get_collection(name)
+    except Exception:
+        return set()
+    return set(collection.get(include=[])["ids"])
+
+
+# ------------------------------------------------------------
+# Function: _copy_collection
+# Description:
+#   Copies chunks of `source_name` into `target` in batches.
+#   - Skips ids listed in `skip_ids`.
+#   - Sets `visibility` from `public_ids` membership.
+#
+# Returns:
+#   - int: Number of chunks written.
+# ------------------------------------------------------------
+def _copy_collection(client, source_name: str, target, public_ids: set, skip_ids: set, batch_size: int) -> int:
+    try:
+        source = client.get_collection(source_name)
+    except Exception:
+        logger.info(f"Collection '{source_name}' not found, nothing to copy.")
+        return 0
+
+    copied = 0
+    offset = 0
+    while True:
+        batch = source.get(
+            limit=batch_size,
+            offset=offset,
+            include=["embeddings", "documents", "metadatas"],
+        )
+        if not batch["ids"]:
+            break
+        offset += len(batch["ids"])
+
+        ids, embeddings, documents, metadatas = [], [], [], []
+        for index, chunk_id in enumerate(batch["ids"]):
+            if chunk_id in skip_ids:
+                continue
+            metadata = dict(batch["metadatas"][index] or {})
+            metadata["visibility"] = "public" if chunk_id in public_ids else "private"
+            ids.append(chunk_id)
+            embeddings.append(batch["embeddings"][index])
+            documents.append(batch["documents"][index])
+            metadatas.append(metadata)
+
+        if ids:
+            target.upsert(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+            copied += len(ids)
+            logger.info(f"Copied {copied} chunks from '{source_name}'...")
+
+    return copied
+
+
+# ------------------------------------------------------------
+# Function: merge_collections
+# Description:
+#   Merges the public and private collections into the unified one.
+#   Public chunks were written to both legacy collections with the
+#   same id, so each chunk is copied exactly once.
+#
+# Returns:
+#   - dict: Counts of copied chunks per source collection.
+# ------------------------------------------------------------
+def merge_collections(batch_size: int = 500, drop_old: bool = False) -> dict:
+    client = chromadb.PersistentClient(path=PERSIST_DIRECTORY)
+    target = client.get_or_create_collection(UNIFIED_COLLECTION)
+
+    public_ids = _collection_ids(client, PUBLIC_COLLECTION)
+    private_ids = _collection_ids(client, PRIVATE_COLLECTION)
+
+    result = {
+        PRIVATE_COLLECTION: _copy_collection(
+            client, PRIVATE_COLLECTION, target, public_ids, set(), batch_size
+        ),
+        PUBLIC_COLLECTION: _copy_collection(
+            client, PUBLIC_COLLECTION, target, public_ids, private_ids, batch_size
+        ),
+    }
+
+    if drop_old:
+        for name in (PUBLIC_COLLECTION, PRIVATE_COLLECTION):
+            try:
+                client.delete_collection(name)
+                logger.info(f"Dropped legacy collection '{name}'.")
+            except Exception:
+                pass
+
+    logger.info(f"Collection merge completed: {result}")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge public/private Chroma collections into one.")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--drop-old", action="store_true", help="Delete the legacy collections afterwards.")
+    args = parser.parse_args()
+    merge_collections(args.batch_size, args.drop_old)
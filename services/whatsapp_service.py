@@ -1,7 +1,8 @@
+import asyncio
 from decouple import config
-import requests
 from dotenv import load_dotenv
-from services.langchain_service import LangchainService
+from services.container import container
+from services.outbound_client import outbound_client
 
 load_dotenv()
 
@@ -20,13 +21,13 @@ class WhatsAppService:
     # Description:
     #   Initializes the WhatsApp service with required credentials.
     #   Loads access tokens, phone number ID, and Graph API URL from .env.
-    #   Instantiates the OpenAI model service for generating responses.
+    #   Uses the shared LangchainService for generating responses.
     # ------------------------------------------------------------
     def __init__(self) -> None:
         self.__access_token = str(config("ACCESS_TOKEN")).strip()
         self.phone_number_id = config("PHONE_NUMBER_ID")
         self.__graph_api_url = config("GRAPH_API_URL")
-        self.__langchain_service = LangchainService()
+        self.__langchain_service = container.langchain_service()
 
     # ------------------------------------------------------------
     # Method: reply_whatsapp_message
@@ -34,7 +35,8 @@ class WhatsAppService:
     #   Sends a WhatsApp message reply to a specific recipient.
     #
     # Workflow:
-    #     1. Calls OpenAI model to generate a response for the given query.
+    #     1. Calls OpenAI model to generate a response for the given query,
+    #        using the conversation history of this number.
     #     2. Sends the response text via the WhatsApp Cloud API.
     #
     # Parameters:
@@ -47,10 +49,13 @@ class WhatsAppService:
     # Raises:
     #   - ProcessLookupError: If any API or network error occurs.
     # ------------------------------------------------------------
-    def reply_whatsapp_message(self, to: str, query: str):
+    async def reply_whatsapp_message(self, to: str, query: str):
         try:
             url = f"{self.__graph_api_url}/{self.phone_number_id}/messages"
-            reply_message = self.__langchain_service.generate_answer(query)
+            # Blocking pipeline, run off the event loop
+            reply_message = await asyncio.to_thread(
+                self.__langchain_service.generate_answer, query, False, f"whatsapp:{to}"
+            )
 
             headers = {
                 "Authorization": f"Bearer {self.__access_token}",
@@ -64,10 +69,10 @@ class WhatsAppService:
                 "text": {"body": reply_message["answer"]}
             }
 
-            response = requests.post(url, headers=headers, json=payload)
-            print("WhatsApp API Response:", response.json())
+            response = await outbound_client.post("whatsapp", url, payload, headers=headers, chat_id=to)
+            print("WhatsApp API Response:", response)
 
-            return response.json()
+            return response
 
         except Exception as e:
             raise ProcessLookupError(str(e))
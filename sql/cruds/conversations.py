@@ -0,0 +1,120 @@
+import json
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sql.models.conversations import Conversation
+
+
+# ------------------------------------------------------------
+# Module: conversation_crud
+# Description:
+#   Provides CRUD operations for the `Conversation` model, used as
+#   the SQL backend of the conversation memory.
+# ------------------------------------------------------------
+
+
+# ------------------------------------------------------------
+# Method: get_conversation
+# Description:
+#   Loads a conversation that has not expired.
+#
+# Returns:
+#   - dict | None: {"summary": str, "turns": list[dict]}
+# ------------------------------------------------------------
+def get_conversation(db: Session, conversation_id: str):
+    conversation = db.query(Conversation).filter(
+        Conversation.conversation_id == conversation_id,
+        Conversation.expires_at > datetime.now(),
+    ).first()
+    if not conversation:
+        return None
+    return {
+        "summary": conversation.summary or "",
+        "turns": json.loads(conversation.turns or "[]"),  # type: ignore
+    }
+
+
+# ------------------------------------------------------------
+# Method: append_turn
+# Description:
+#   Adds a question/answer turn and extends the expiry. Expired
+#   history is discarded first.
+#
+# Returns:
+#   - dict: The updated {"summary", "turns"}.
+# ------------------------------------------------------------
+def append_turn(db: Session, conversation_id: str, question: str, answer: str, ttl: float) -> dict:
+    now = datetime.now()
+    turn = {"question": question, "answer": answer}
+
+    conversation = db.query(Conversation).filter(
+        Conversation.conversation_id == conversation_id
+    ).with_for_update().first()
+    if conversation:
+        if conversation.expires_at <= now:  # type: ignore
+            conversation.summary = ""  # type: ignore
+            conversation.turns = "[]"  # type: ignore
+        turns = json.loads(conversation.turns or "[]")  # type: ignore
+        turns.append(turn)
+        conversation.turns = json.dumps(turns)  # type: ignore
+        conversation.expires_at = now + timedelta(seconds=ttl)  # type: ignore
+        db.commit()
+        return {"summary": conversation.summary or "", "turns": turns}
+
+    conversation = Conversation()
+    conversation.conversation_id = conversation_id  # type: ignore
+    conversation.summary = ""  # type: ignore
+    conversation.turns = json.dumps([turn])  # type: ignore
+    conversation.expires_at = now + timedelta(seconds=ttl)  # type: ignore
+    conversation.created_at = now  # type: ignore
+    try:
+        db.add(conversation)
+        db.commit()
+    except IntegrityError:
+        # Created concurrently by another worker: append to that row
+        db.rollback()
+        return append_turn(db, conversation_id, question, answer, ttl)
+    return {"summary": "", "turns": [turn]}
+
+
+# ------------------------------------------------------------
+# Method: compact_conversation
+# Description:
+#   Replaces the summary and drops the `summarized` oldest turns
+#   now covered by it, in one transaction.
+# ------------------------------------------------------------
+def compact_conversation(db: Session, conversation_id: str, summary: str, summarized: int):
+    conversation = db.query(Conversation).filter(
+        Conversation.conversation_id == conversation_id
+    ).with_for_update().first()
+    if not conversation:
+        db.rollback()
+        return
+    turns = json.loads(conversation.turns or "[]")  # type: ignore
+    conversation.summary = summary  # type: ignore
+    conversation.turns = json.dumps(turns[summarized:])  # type: ignore
+    db.commit()
+
+
+# ------------------------------------------------------------
+# Method: delete_conversation
+# Description:
+#   Forgets a conversation.
+# ------------------------------------------------------------
+def delete_conversation(db: Session, conversation_id: str):
+    db.query(Conversation).filter(Conversation.conversation_id == conversation_id).delete()
+    db.commit()
+
+
+# ------------------------------------------------------------
+# Method: purge_expired
+# Description:
+#   Deletes expired conversations.
+#
+# Returns:
+#   - int: Number of deleted rows.
+# ------------------------------------------------------------
+def purge_expired(db: Session) -> int:
+    count = db.query(Conversation).filter(Conversation.expires_at <= datetime.now()).delete()
+    db.commit()
+    return count
@@ -30,6 +30,7 @@ def create_doc(db: Session, data: dict, employee_id: int):
     document.original_path = data.get("original_path", "")
     document.doc_path = data.get("doc_path", "")
     document.type = data.get("type", "")
+    document.content_hash = data.get("content_hash")
     document.employee_id = employee_id  # type: ignore
 
     db.add(document)
@@ -56,6 +57,29 @@ def _get_document_by_dir_name(db: Session, name: str):
     return db.query(Document).filter(Document.doc_path == name).first()
 
 
+# ------------------------------------------------------------
+# Method: _get_document_by_content_hash
+# Description:
+#   Retrieves a document using the sha256 of its file content.
+# ------------------------------------------------------------
+def _get_document_by_content_hash(db: Session, content_hash: str):
+    return db.query(Document).filter(Document.content_hash == content_hash).first()
+
+
+# ------------------------------------------------------------
+# Method: list_url_documents
+# Description:
+#   Retrieves all documents whose source is a remote URL.
+# ------------------------------------------------------------
+def list_url_documents(db: Session):
+    return db.query(Document).filter(
+        or_(
+            Document.doc_path.like("http://%"),
+            Document.doc_path.like("https://%"),
+        )
+    ).all()
+
+
 # ------------------------------------------------------------
 # Method: _get_document_by_id
 # Description:
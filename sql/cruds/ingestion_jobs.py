@@ -0,0 +1,172 @@
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from sql.models.ingestion_jobs import IngestionJob
+
+
+# ------------------------------------------------------------
+# Module: ingestion_job_crud
+# Description:
+#   Provides CRUD operations for the `IngestionJob` model.
+#   Includes state transitions with exponential backoff and a
+#   dead-letter state for files that keep failing.
+# ------------------------------------------------------------
+
+
+# ------------------------------------------------------------
+# Method: get_job_by_document_id
+# Description:
+#   Retrieves the ingestion job of a document.
+# ------------------------------------------------------------
+def get_job_by_document_id(db: Session, document_id: int) -> IngestionJob:
+    return db.query(IngestionJob).filter(IngestionJob.document_id == document_id).first()
+
+
+# ------------------------------------------------------------
+# Method: get_or_create_job
+# Description:
+#   Returns the job of a document, creating a queued one if needed.
+# ------------------------------------------------------------
+def get_or_create_job(db: Session, document_id: int) -> IngestionJob:
+    job = get_job_by_document_id(db, document_id)
+    if job:
+        return job
+
+    job = IngestionJob()
+    job.document_id = document_id  # type: ignore
+    job.status = "queued"  # type: ignore
+    job.attempts = 0  # type: ignore
+
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+# ------------------------------------------------------------
+# Method: reset_job
+# Description:
+#   Puts a job back to `queued` (e.g. after the document was replaced).
+# ------------------------------------------------------------
+def reset_job(db: Session, job: IngestionJob) -> IngestionJob:
+    job.status = "queued"  # type: ignore
+    job.attempts = 0  # type: ignore
+    job.error = None  # type: ignore
+    job.next_attempt_at = None  # type: ignore
+
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+# ------------------------------------------------------------
+# Method: is_due
+# Description:
+#   True when the job may run now: not dead, not waiting for its
+#   backoff to expire, and not running (unless the running attempt
+#   is older than `stale_after` seconds, e.g. after a crash).
+# ------------------------------------------------------------
+def is_due(job: IngestionJob, stale_after: float = 3600) -> bool:
+    now = datetime.now()
+    if job.status == "dead":
+        return False
+    if job.status == "running":
+        return bool(job.started_at and job.started_at < now - timedelta(seconds=stale_after))  # type: ignore
+    if job.status == "failed" and job.next_attempt_at and job.next_attempt_at > now:  # type: ignore
+        return False
+    return True
+
+
+# ------------------------------------------------------------
+# Method: mark_running
+# Description:
+#   Starts a new attempt. Attempts are counted since the last
+#   success, so periodically refreshed documents (e.g. re-crawled
+#   URLs) are not dead-lettered by their successful runs.
+# ------------------------------------------------------------
+def mark_running(db: Session, job: IngestionJob, content_hash: str | None = None) -> IngestionJob:
+    previous_attempts = 0 if job.status == "succeeded" else (job.attempts or 0)
+    job.status = "running"  # type: ignore
+    job.attempts = previous_attempts + 1  # type: ignore
+    job.started_at = datetime.now()  # type: ignore
+    job.finished_at = None  # type: ignore
+    if content_hash:
+        job.content_hash = content_hash  # type: ignore
+
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+# ------------------------------------------------------------
+# Method: mark_succeeded
+# Description:
+#   Completes an attempt successfully.
+#   `etag` / `last_modified` are stored for URL documents so the
+#   next fetch can be a conditional request.
+# ------------------------------------------------------------
+def mark_succeeded(
+    db: Session,
+    job: IngestionJob,
+    chunk_count: int,
+    etag: str | None = None,
+    last_modified: str | None = None
+) -> IngestionJob:
+    _finish(job)
+    job.status = "succeeded"  # type: ignore
+    job.chunk_count = chunk_count  # type: ignore
+    job.error = None  # type: ignore
+    job.next_attempt_at = None  # type: ignore
+    if etag is not None or last_modified is not None:
+        job.etag = etag  # type: ignore
+        job.last_modified = last_modified  # type: ignore
+
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+# ------------------------------------------------------------
+# Method: mark_failed
+# Description:
+#   Completes an attempt with an error.
+#   - Schedules the next attempt with exponential backoff:
+#       delay = base_delay * 2^(attempts - 1), capped at max_delay.
+#   - Moves the job to `dead` once `max_attempts` is reached.
+# ------------------------------------------------------------
+def mark_failed(
+    db: Session,
+    job: IngestionJob,
+    error: str,
+    max_attempts: int = 5,
+    base_delay: float = 30,
+    max_delay: float = 3600
+) -> IngestionJob:
+    _finish(job)
+    job.error = (error or "")[:5000]  # type: ignore
+
+    if (job.attempts or 0) >= max_attempts:
+        job.status = "dead"  # type: ignore
+        job.next_attempt_at = None  # type: ignore
+    else:
+        delay = min(max_delay, base_delay * (2 ** max(0, (job.attempts or 1) - 1)))
+        job.status = "failed"  # type: ignore
+        job.next_attempt_at = datetime.now() + timedelta(seconds=delay)  # type: ignore
+
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+# ------------------------------------------------------------
+# Method: _finish
+# Description:
+#   Records end time and duration of the current attempt.
+# ------------------------------------------------------------
+def _finish(job: IngestionJob):
+    job.finished_at = datetime.now()  # type: ignore
+    if job.started_at:
+        job.duration_ms = int((job.finished_at - job.started_at).total_seconds() * 1000)  # type: ignore
@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sql.models.processed_messages import ProcessedMessage
+
+
+# ------------------------------------------------------------
+# Module: processed_message_crud
+# Description:
+#   Provides CRUD operations for the `ProcessedMessage` model,
+#   used as the SQL backend of the webhook idempotency store.
+# ------------------------------------------------------------
+
+
+# ------------------------------------------------------------
+# Method: claim_message
+# Description:
+#   Records a message key unless it is already recorded and not
+#   expired. The primary key makes concurrent claims safe.
+#
+# Returns:
+#   - bool: True if the caller should process the message.
+# ------------------------------------------------------------
+def claim_message(db: Session, message_key: str, ttl: float) -> bool:
+    now = datetime.now()
+    expires_at = now + timedelta(seconds=ttl)
+
+    existing = db.query(ProcessedMessage).filter(ProcessedMessage.message_key == message_key).first()
+    if existing:
+        if existing.expires_at > now:  # type: ignore
+            return False
+        existing.expires_at = expires_at  # type: ignore
+        existing.created_at = now  # type: ignore
+        db.commit()
+        return True
+
+    message = ProcessedMessage()
+    message.message_key = message_key  # type: ignore
+    message.expires_at = expires_at  # type: ignore
+    message.created_at = now  # type: ignore
+    try:
+        db.add(message)
+        db.commit()
+        return True
+    except IntegrityError:
+        db.rollback()
+        return False
+
+
+# ------------------------------------------------------------
+# Method: release_message
+# Description:
+#   Removes a claim (e.g. the message could not be queued), so a
+#   redelivery is processed.
+# ------------------------------------------------------------
+def release_message(db: Session, message_key: str):
+    db.query(ProcessedMessage).filter(ProcessedMessage.message_key == message_key).delete()
+    db.commit()
+
+
+# ------------------------------------------------------------
+# Method: purge_expired
+# Description:
+#   Deletes expired message keys.
+#
+# Returns:
+#   - int: Number of deleted rows.
+# ------------------------------------------------------------
+def purge_expired(db: Session) -> int:
+    count = db.query(ProcessedMessage).filter(ProcessedMessage.expires_at <= datetime.now()).delete()
+    db.commit()
+    return count
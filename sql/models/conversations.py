@@ -0,0 +1,26 @@
+from sqlalchemy import Column, String, DateTime, Text
+from datetime import datetime
+from db import Base
+
+
+# ------------------------------------------------------------
+# Model: Conversation
+# Description:
+#   Multi-turn chat history of one conversation (web session,
+#   Telegram chat or WhatsApp number), used as the SQL backend of
+#   the conversation memory. Holds a rolling summary of older turns
+#   plus the most recent turns verbatim; rows expire after a TTL.
+# ------------------------------------------------------------
+class Conversation(Base):
+    __tablename__ = "conversations"
+
+    # --------------------------------------------------------
+    # Column Definitions
+    # --------------------------------------------------------
+
+    conversation_id = Column(String(191), primary_key=True)           # e.g. 'web:12:<session>', 'telegram:123456'
+    summary = Column(Text, nullable=True)                             # Rolling summary of older turns
+    turns = Column(Text, nullable=False)                              # JSON list of {"question", "answer"}
+    expires_at = Column(DateTime, nullable=False, index=True)         # Conversation is forgotten after this time
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, nullable=True)
@@ -25,5 +25,6 @@ class Document(Base):
     original_path = Column(String(255), nullable=False)  # Original uploaded document path
     doc_path = Column(String(255), nullable=False)        # Processed or stored document path
     type = Column(String(50), unique=True, index=True, nullable=False)  # e.g., 'public', 'private', etc.
+    content_hash = Column(String(64), unique=True, nullable=True)  # sha256 of the uploaded file (NULL for URLs)
     employee = relationship("Employee") # Relationship to the Employee model
     created_at = Column(DateTime, default=datetime.now, nullable=False) # Timestamp when the document was created
@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy.orm import relationship, backref
+from datetime import datetime
+from db import Base
+
+
+# ------------------------------------------------------------
+# Model: IngestionJob
+# Description:
+#   Tracks the ingestion state of a document (one row per document).
+#
+#   Stores status, retry bookkeeping (attempts, next attempt time,
+#   last error), the resulting chunk count, timings, the sha256
+#   content hash of the ingested file for idempotency, and the HTTP
+#   validators (ETag / Last-Modified) of URL documents.
+# ------------------------------------------------------------
+class IngestionJob(Base):
+    __tablename__ = "ingestion_jobs"
+
+    # --------------------------------------------------------
+    # Column Definitions
+    # --------------------------------------------------------
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), unique=True, nullable=False)
+    status = Column(String(20), nullable=False, default="queued", index=True)  # queued, running, succeeded, failed, dead
+    attempts = Column(Integer, nullable=False, default=0)         # Number of ingestion attempts so far
+    error = Column(Text, nullable=True)                           # Last error message
+    chunk_count = Column(Integer, nullable=True)                  # Chunks written by the last successful run
+    content_hash = Column(String(64), nullable=True, index=True)  # sha256 of the ingested content
+    etag = Column(String(255), nullable=True)                     # ETag of the last fetched URL response
+    last_modified = Column(String(64), nullable=True)             # Last-Modified of the last fetched URL response
+    next_attempt_at = Column(DateTime, nullable=True)             # Earliest time of the next retry
+    started_at = Column(DateTime, nullable=True)                  # Start of the last attempt
+    finished_at = Column(DateTime, nullable=True)                 # End of the last attempt
+    duration_ms = Column(Integer, nullable=True)                  # Duration of the last attempt
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    document = relationship(
+        "Document",
+        backref=backref("ingestion_job", uselist=False, cascade="all, delete-orphan", passive_deletes=True),
+    )  # Relationship to the Document model
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, DateTime
+from datetime import datetime
+from db import Base
+
+
+# ------------------------------------------------------------
+# Model: ProcessedMessage
+# Description:
+#   Idempotency record of an incoming chat platform message
+#   (Telegram update or WhatsApp message), keyed by platform and
+#   message id. Rows expire after a TTL and are purged periodically.
+# ------------------------------------------------------------
+class ProcessedMessage(Base):
+    __tablename__ = "processed_messages"
+
+    # --------------------------------------------------------
+    # Column Definitions
+    # --------------------------------------------------------
+
+    message_key = Column(String(191), primary_key=True)               # e.g. 'telegram:123456', 'whatsapp:wamid...'
+    expires_at = Column(DateTime, nullable=False, index=True)         # Key may be claimed again after this time
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
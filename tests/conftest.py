@@ -0,0 +1,36 @@
+import os
+import sys
+
+# ------------------------------------------------------------
+# Test configuration
+# Description:
+#   Makes the application modules importable and provides the
+#   database settings read at import time. Engines are created
+#   lazily by SQLAlchemy, so no database connection is opened.
+# ------------------------------------------------------------
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+os.environ.setdefault("DB_ENGINE", "mysql+mysqlconnector")
+os.environ.setdefault("MYSQL_USER", "test")
+os.environ.setdefault("MYSQL_PASSWORD", "test")
+os.environ.setdefault("MYSQL_URL", "localhost")
+os.environ.setdefault("MYSQL_PORT", "3306")
+os.environ.setdefault("MYSQL_DB", "test")
+
+
+# ------------------------------------------------------------
+# Fixture: sqlite_session
+# Description:
+#   In-memory SQLite session with the given tables, returned by
+#   db.get_db() for the duration of a test (SQL-backed stores).
+# ------------------------------------------------------------
+def sqlite_session(monkeypatch, *models):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    import db
+
+    engine = create_engine("sqlite://")
+    db.Base.metadata.create_all(engine, tables=[model.__table__ for model in models])
+    session = sessionmaker(bind=engine)()
+    monkeypatch.setattr(db, "get_db", lambda: session)
+    return session
@@ -0,0 +1,30 @@
+from services.answer_cache import AnswerCache
+
+# Entity-swapped questions embed almost identically
+JOHN = [0.6, 0.8, 0.0]
+JANE = [0.6, 0.79, 0.02]
+
+
+def test_entity_swapped_private_question_misses():
+    cache = AnswerCache(semantic_namespaces=["public"])
+    cache.put("private", "What is John's email?", "john@example.com", JOHN)
+
+    assert cache.get_exact("private", "What is Jane's email?") is None
+    assert cache.get_similar("private", JANE) is None
+    assert cache.get_exact("private", "what is john's email") == "john@example.com"
+
+
+def test_public_questions_use_the_semantic_level():
+    cache = AnswerCache(semantic_namespaces=["public"])
+    cache.put("public", "What is the leave policy?", "20 days a year.", JOHN)
+
+    assert cache.get_similar("public", JANE) == "20 days a year."
+    assert cache.is_semantic("public") and not cache.is_semantic("private")
+
+
+def test_namespaces_are_separate():
+    cache = AnswerCache()
+    cache.put("private", "What is the leave policy?", "private answer", JOHN)
+
+    assert cache.get_exact("public", "What is the leave policy?") is None
+    assert cache.get_similar("public", JOHN) is None
@@ -0,0 +1,85 @@
+import threading
+import time
+from services.chain_registry import ChainRegistry
+
+
+def test_slow_build_does_not_block_other_entries():
+    registry = ChainRegistry()
+    release = threading.Event()
+    registry.register("slow", lambda: release.wait(5) and "slow")
+    registry.register("fast", lambda: "fast")
+
+    worker = threading.Thread(target=registry.get, args=("slow",))
+    worker.start()
+    time.sleep(0.05)
+    started = time.monotonic()
+    assert registry.get("fast") == "fast"
+    assert time.monotonic() - started < 1
+
+    release.set()
+    worker.join()
+    assert registry.get("slow") == "slow"
+
+
+def test_concurrent_first_access_builds_once():
+    registry = ChainRegistry()
+    builds = []
+    registry.register("chain", lambda: builds.append(1) or time.sleep(0.1) or "chain")
+
+    threads = [threading.Thread(target=registry.get, args=("chain",)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(builds) == 1
+
+
+def test_slow_fingerprint_check_serves_the_current_value():
+    registry = ChainRegistry(refresh_interval=0)
+    checking = threading.Event()
+    release = threading.Event()
+    fingerprints = iter(["v1"])
+
+    def fingerprint():
+        value = next(fingerprints, None)
+        if value is None:
+            checking.set()
+            release.wait(5)
+            return "v1"
+        return value
+
+    registry.register("chain", lambda: "chain", fingerprint)
+    assert registry.get("chain") == "chain"
+
+    worker = threading.Thread(target=registry.get, args=("chain",))
+    worker.start()
+    assert checking.wait(5)
+    started = time.monotonic()
+    assert registry.get("chain") == "chain"
+    assert time.monotonic() - started < 1
+
+    release.set()
+    worker.join()
+
+
+def test_invalidate_during_build_discards_the_result():
+    registry = ChainRegistry()
+    building = threading.Event()
+    release = threading.Event()
+    versions = iter(["stale", "fresh"])
+
+    def builder():
+        value = next(versions)
+        if value == "stale":
+            building.set()
+            release.wait(5)
+        return value
+
+    registry.register("chain", builder)
+    worker = threading.Thread(target=registry.get, args=("chain",))
+    worker.start()
+    assert building.wait(5)
+    registry.invalidate("chain")
+    release.set()
+    worker.join()
+    assert registry.get("chain") == "fresh"
@@ -0,0 +1,112 @@
+import time
+import pytest
+from conftest import sqlite_session
+from services.conversation_memory import ConversationMemory, MemoryConversationStore, SqlConversationStore
+from sql.models.conversations import Conversation
+
+
+@pytest.fixture(params=["memory", "sql"])
+def memory(request, monkeypatch):
+    if request.param == "sql":
+        sqlite_session(monkeypatch, Conversation)
+        store = SqlConversationStore(ttl=60, purge_every=2)
+    else:
+        store = MemoryConversationStore(ttl=60)
+    return ConversationMemory(store, max_turns=2, max_turn_chars=20, max_summary_chars=30)
+
+
+def _summarize(summary, turns):
+    return " ".join([summary] + [turn["question"] for turn in turns]).strip()
+
+
+def test_remember_keeps_turns_and_asks_for_compaction(memory):
+    assert memory.history("web:1") is None
+    assert memory.remember("web:1", "What is the leave policy?", "20 days.") is False
+    assert memory.remember("web:1", "And for interns?", "10 days.") is False
+    assert memory.remember("web:1", "Who approves it?", "Your manager.") is True
+
+    history = memory.history("web:1")
+    assert history["summary"] == ""
+    assert [turn["question"] for turn in history["turns"]] == [
+        "What is the leave po", "And for interns?", "Who approves it?"
+    ]
+
+
+def test_compact_folds_old_turns_into_the_summary(memory):
+    for index in range(4):
+        memory.remember("telegram:5", f"q{index}", f"a{index}")
+
+    memory.compact("telegram:5", _summarize)
+
+    history = memory.history("telegram:5")
+    assert history["summary"] == "q0 q1"
+    assert [turn["question"] for turn in history["turns"]] == ["q2", "q3"]
+
+
+def test_failed_summary_keeps_the_turns(memory):
+    for index in range(3):
+        memory.remember("telegram:5", f"q{index}", f"a{index}")
+
+    def failing(summary, turns):
+        raise RuntimeError("LLM unavailable")
+
+    memory.compact("telegram:5", failing)
+    assert len(memory.history("telegram:5")["turns"]) == 3
+
+
+def test_summary_is_cut_to_max_summary_chars(memory):
+    for index in range(3):
+        memory.remember("web:2", f"q{index}", f"a{index}")
+
+    memory.compact("web:2", lambda summary, turns: "x" * 100)
+    assert memory.history("web:2")["summary"] == "x" * 30
+
+
+def test_clear_forgets_the_conversation(memory):
+    memory.remember("whatsapp:49", "hi", "hello")
+    memory.clear("whatsapp:49")
+    assert memory.history("whatsapp:49") is None
+
+
+def test_conversations_are_separate(memory):
+    memory.remember("web:1", "mine", "a")
+    memory.remember("web:2", "yours", "b")
+    assert [turn["question"] for turn in memory.history("web:2")["turns"]] == ["yours"]
+
+
+def test_format_renders_summary_and_turns():
+    text = ConversationMemory.format({
+        "summary": "Asked about leave.",
+        "turns": [{"question": "And for interns?", "answer": "10 days."}],
+    })
+    assert text == (
+        "Summary of earlier conversation: Asked about leave.\n"
+        "User: And for interns?\n"
+        "Assistant: 10 days."
+    )
+
+
+def test_memory_store_expires_and_evicts_conversations():
+    store = MemoryConversationStore(ttl=0.05, max_conversations=2)
+    store.append("a", "q", "a")
+    time.sleep(0.06)
+    assert store.get("a") is None
+
+    store = MemoryConversationStore(ttl=60, max_conversations=2)
+    for conversation_id in ("a", "b", "c"):
+        store.append(conversation_id, "q", "a")
+    assert store.get("a") is None
+    assert store.get("c") is not None
+
+
+def test_unavailable_store_does_not_fail_the_reply():
+    class BrokenStore:
+        def get(self, *args):
+            raise RuntimeError("database unavailable")
+
+        append = clear = get
+
+    memory = ConversationMemory(BrokenStore())
+    assert memory.history("web:1") is None
+    assert memory.remember("web:1", "q", "a") is False
+    memory.clear("web:1")
@@ -0,0 +1,124 @@
+import asyncio
+import io
+from types import SimpleNamespace
+from unittest import mock
+import pytest
+import services.document as document_module
+from services.document import DocumentService
+
+
+class Upload:
+    def __init__(self, content: bytes, filename: str = "policy.txt"):
+        self.filename = filename
+        self.__content = io.BytesIO(content)
+
+    async def read(self, size: int = -1):
+        return self.__content.read(size)
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setenv("DIR_NAME", str(tmp_path))
+    return DocumentService(mock.MagicMock(), None, None)
+
+
+@pytest.mark.parametrize("employee", [None, SimpleNamespace(id=2, employee_type="employee")])
+def test_only_admins_can_upload_or_replace(service, monkeypatch, employee):
+    monkeypatch.setattr(document_module, "get_current_employee", lambda: employee)
+
+    with pytest.raises(ProcessLookupError, match="Access denied"):
+        asyncio.run(service.create_document(Upload(b"new"), "public"))
+    with pytest.raises(ProcessLookupError, match="Access denied"):
+        asyncio.run(service.replace_document(1, Upload(b"new")))
+
+
+@pytest.fixture
+def langchain_service(tmp_path, monkeypatch):
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+    import services.langchain_service as langchain_module
+
+    monkeypatch.chdir(tmp_path)
+    # Chroma caches clients per path string, so every test gets its own absolute path
+    monkeypatch.setattr(langchain_module, "PERSIST_DIRECTORY", str(tmp_path / "chroma"))
+    return langchain_module.LangchainService(llm_service=mock.MagicMock(), llm=mock.MagicMock(),
+                                             embeddings=DeterministicFakeEmbedding(size=16))
+
+
+def _chunk_sources(langchain_service):
+    result = langchain_service.chroma_private_store().get(include=["metadatas"])
+    return sorted(metadata["source"] for metadata in result["metadatas"])
+
+
+def test_replacing_a_pre_series_document_drops_its_old_chunks(tmp_path, monkeypatch, langchain_service):
+    from langchain_core.documents import Document
+
+    monkeypatch.setenv("DIR_NAME", str(tmp_path))
+    old_source = str(tmp_path / "public_old.txt")
+    (tmp_path / "_public_old.txt").write_text("old text")
+    # Chunks of a document ingested before chunk ids were keyed by document: uuid4 ids, `source` only
+    langchain_service.add_documents(
+        [Document(page_content="old text", metadata={"source": old_source})], ids=["legacy-1"], visibility="public"
+    )
+
+    document = SimpleNamespace(id=7, doc_path="_public_old.txt", type="public", original_path="old.txt")
+    monkeypatch.setattr(document_module, "get_current_employee", lambda: SimpleNamespace(id=1, employee_type="admin"))
+    monkeypatch.setattr(document_module.document_crud, "_get_document_by_id", lambda db, id: document)
+    monkeypatch.setattr(document_module.document_crud, "_get_document_by_content_hash", lambda db, content_hash: None)
+    monkeypatch.setattr(document_module.ingestion_job_crud, "get_or_create_job", mock.MagicMock())
+    monkeypatch.setattr(document_module.ingestion_job_crud, "reset_job", mock.MagicMock())
+    monkeypatch.setattr(document_module.ingestion_queue, "submit", mock.MagicMock())
+
+    service = DocumentService(mock.MagicMock(), lambda: langchain_service, None)
+    asyncio.run(service.replace_document(7, Upload(b"new text", "new.txt")))
+
+    new_source = str(tmp_path / document.doc_path)
+    assert not (tmp_path / "_public_old.txt").exists()
+    assert _chunk_sources(langchain_service) == []
+
+    langchain_service.sync_documents(
+        [Document(page_content="new text", metadata={"source": new_source})], "public", 7, new_source
+    )
+    assert _chunk_sources(langchain_service) == [new_source]
+    assert langchain_service.chroma_public_store().get(include=[])["ids"] == \
+        langchain_service.chroma_private_store().get(include=[])["ids"]
+
+
+def test_resync_of_a_pre_series_document_replaces_its_chunks(tmp_path, langchain_service):
+    from langchain_core.documents import Document
+
+    source = str(tmp_path / "public_doc.txt")
+    langchain_service.add_documents(
+        [Document(page_content="old text", metadata={"source": source})], ids=["legacy-1"], visibility="public"
+    )
+
+    result = langchain_service.sync_documents(
+        [Document(page_content="new text", metadata={"source": source})], "public", 3, source
+    )
+
+    ids = langchain_service.chroma_private_store().get(include=[])["ids"]
+    assert result == {"added": 1, "kept": 0, "deleted": 1}
+    assert "legacy-1" not in ids and len(ids) == 1
+
+
+def test_status_includes_the_pipeline_progress_of_the_file(tmp_path, monkeypatch):
+    monkeypatch.setenv("DIR_NAME", str(tmp_path))
+    import services.document_ingestion_service as ingestion_module
+    from models.document import IngestionStatus
+
+    monkeypatch.setattr(ingestion_module.db, "get_db", mock.MagicMock())
+    ingestion_service = ingestion_module.DocumentIngestionService(langchain_service=mock.MagicMock())
+    monkeypatch.setattr(ingestion_service.pipeline, "progress", lambda: {
+        "./documents/public_manual.pdf": {"status": "embedding", "chunks": 900, "new": 400, "written": 128,
+                                          "error": None, "started_at": 1700000000.0},
+    })
+    documents = {1: SimpleNamespace(id=1, doc_path="_public_manual.pdf"),
+                 2: SimpleNamespace(id=2, doc_path="https://example.com/handbook")}
+    job = SimpleNamespace(status="running", attempts=1, error=None, chunk_count=None, content_hash=None,
+                          next_attempt_at=None, started_at=None, finished_at=None, duration_ms=None)
+    monkeypatch.setattr(document_module.document_crud, "_get_document_by_id", lambda db, id: documents[id])
+    monkeypatch.setattr(document_module.ingestion_job_crud, "get_job_by_document_id", lambda db, id: job)
+
+    service = DocumentService(mock.MagicMock(), None, lambda: ingestion_service)
+    status = IngestionStatus(**service.read_document_status(1))
+    assert (status.progress.status, status.progress.new, status.progress.written) == ("embedding", 400, 128)
+    assert service.read_document_status(2)["progress"] is None
@@ -0,0 +1,38 @@
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from services.embedding_cache import CachedEmbeddings
+
+
+def _cache(tmp_path, **kwargs):
+    return CachedEmbeddings(DeterministicFakeEmbedding(size=8), "fake",
+                            path=str(tmp_path / "cache.sqlite3"), **kwargs)
+
+
+def test_queries_do_not_evict_document_vectors(tmp_path):
+    cache = _cache(tmp_path, max_entries=2, max_query_entries=1)
+    vectors = cache.embed_documents(["alpha", "beta"])
+
+    for query in ["who?", "what?", "where?"]:
+        cache.embed_query(query)
+
+    # Stored as float32
+    assert cache.embed_documents(["alpha", "beta"]) == [pytest.approx(vector, rel=1e-6) for vector in vectors]
+    assert cache.stats() == {"hits": 2, "misses": 5, "size": 2, "query_size": 1}
+
+
+def test_least_recently_used_rows_are_evicted_over_the_bound(tmp_path):
+    cache = _cache(tmp_path, max_entries=2)
+    cache.embed_documents(["alpha", "beta"])
+    cache.embed_documents(["alpha", "gamma"])
+
+    assert cache.stats()["size"] == 2
+    cache.embed_documents(["beta"])
+    assert cache.stats()["misses"] == 4
+
+
+def test_row_counts_survive_a_restart(tmp_path):
+    _cache(tmp_path).embed_documents(["alpha", "beta", "alpha"])
+    _cache(tmp_path).embed_query("who?")
+
+    cache = _cache(tmp_path)
+    assert cache.stats() == {"hits": 0, "misses": 0, "size": 2, "query_size": 1}
@@ -0,0 +1,62 @@
+import time
+import pytest
+from conftest import sqlite_session
+from services.idempotency import MemoryIdempotencyStore, SqlIdempotencyStore
+from sql.models.processed_messages import ProcessedMessage
+
+
+@pytest.fixture(params=["memory", "sql"])
+def store(request, monkeypatch):
+    if request.param == "sql":
+        sqlite_session(monkeypatch, ProcessedMessage)
+        return SqlIdempotencyStore(ttl=60, purge_every=2)
+    return MemoryIdempotencyStore(ttl=60)
+
+
+def test_a_key_is_claimed_once(store):
+    assert store.claim("telegram:1") is True
+    assert store.claim("telegram:1") is False
+    assert store.claim("telegram:2") is True
+
+
+def test_released_keys_can_be_claimed_again(store):
+    assert store.claim("whatsapp:wamid.1") is True
+    store.release("whatsapp:wamid.1")
+    assert store.claim("whatsapp:wamid.1") is True
+    assert store.claim("whatsapp:wamid.1") is False
+
+
+def test_releasing_an_unknown_key_is_a_no_op(store):
+    store.release("telegram:missing")
+    assert store.claim("telegram:missing") is True
+
+
+def test_keys_expire_after_the_ttl(monkeypatch):
+    store = MemoryIdempotencyStore(ttl=0.05)
+    assert store.claim("telegram:1") is True
+    time.sleep(0.06)
+    assert store.claim("telegram:1") is True
+
+
+def test_memory_store_evicts_the_oldest_keys():
+    store = MemoryIdempotencyStore(ttl=60, max_entries=2)
+    for key in ("a", "b", "c"):
+        assert store.claim(key) is True
+    assert store.claim("a") is True
+    assert store.claim("c") is False
+
+
+def test_sql_store_processes_messages_when_the_database_fails(monkeypatch):
+    import db
+
+    class BrokenSession:
+        def query(self, *args):
+            raise RuntimeError("database unavailable")
+
+        def rollback(self):
+            pass
+
+    monkeypatch.setattr(db, "get_db", lambda: BrokenSession())
+    store = SqlIdempotencyStore(ttl=60)
+    assert store.claim("telegram:1") is True
+    store.release("telegram:1")
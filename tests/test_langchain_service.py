@@ -0,0 +1,63 @@
+import asyncio
+from unittest import mock
+import pytest
+import services.answer_cache as answer_cache_module
+from services.answer_cache import AnswerCache
+
+
+class VectorChain:
+    async def astream(self, inputs):
+        yield {"answer": "See the handbook."}
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+    import services.langchain_service as langchain_module
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(langchain_module, "PERSIST_DIRECTORY", str(tmp_path / "chroma"))
+    service = langchain_module.LangchainService(llm_service=mock.MagicMock(), llm=mock.MagicMock(),
+                                                embeddings=DeterministicFakeEmbedding(size=16))
+    service._answer_cache = AnswerCache(semantic_namespaces=["public"])
+    service._sql_answer_ttl = 60
+    service._merge_mode = "concat"
+    monkeypatch.setattr(service, "_needs_sql", lambda query, embedding=None: "many" in query)
+    monkeypatch.setattr(service, "_sql_branch", lambda query: "42 employees.")
+    monkeypatch.setattr(service, "_rag_branch", lambda query, is_logged_in=False: "See the handbook.")
+    monkeypatch.setattr(service, "_asql_branch", mock.AsyncMock(return_value="42 employees."))
+    monkeypatch.setattr(service, "_arag_branch", mock.AsyncMock(return_value="See the handbook."))
+    monkeypatch.setattr(service, "vector_chain", lambda is_logged_in=False: VectorChain())
+    monkeypatch.setattr(service._utility_service, "merge_answers", lambda answers: " ".join(answers))
+    return service
+
+
+def _stream(service, query):
+    async def collect():
+        return [token async for token in service.astream_answer(query, is_logged_in=True)]
+    return "".join(asyncio.run(collect()))
+
+
+def _advance(monkeypatch, seconds):
+    now = answer_cache_module.time.monotonic() + seconds
+    monkeypatch.setattr(answer_cache_module.time, "monotonic", lambda: now)
+
+
+@pytest.mark.parametrize("answer", [
+    lambda service, query: service.generate_answer(query, is_logged_in=True)["answer"],
+    _stream,
+], ids=["generate", "stream"])
+def test_sql_answers_expire_after_the_short_ttl(service, monkeypatch, answer):
+    answer(service, "How many employees?")
+    answer(service, "What is the leave policy?")
+    _advance(monkeypatch, 120)
+
+    assert service._answer_cache.get_exact("private", "How many employees?") is None
+    assert service._answer_cache.get_exact("private", "What is the leave policy?") == "See the handbook."
+
+
+def test_sql_answers_are_not_cached_with_a_zero_ttl(service):
+    service._sql_answer_ttl = 0
+    service.generate_answer("How many employees?", is_logged_in=True)
+
+    assert service._answer_cache.get_exact("private", "How many employees?") is None
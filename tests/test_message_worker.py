@@ -0,0 +1,97 @@
+import asyncio
+import threading
+from services.message_worker import MessageWorker
+
+
+def _run(scenario):
+    async def main():
+        worker = MessageWorker(workers=4, queue_size=10)
+        worker.start()
+        try:
+            return await scenario(worker)
+        finally:
+            await worker.stop(timeout=1)
+    return asyncio.run(main())
+
+
+def test_messages_of_one_key_run_in_submission_order():
+    async def scenario(worker):
+        order = []
+
+        async def handler(index):
+            await asyncio.sleep(0.01 * (5 - index))
+            order.append(index)
+
+        for index in range(5):
+            assert worker.submit(handler, index, key="telegram:1")
+        await asyncio.sleep(0.3)
+        return order
+
+    assert _run(scenario) == [0, 1, 2, 3, 4]
+
+
+def test_different_keys_run_in_parallel():
+    async def scenario(worker):
+        running = []
+        peak = []
+
+        async def handler():
+            running.append(1)
+            peak.append(len(running))
+            await asyncio.sleep(0.05)
+            running.pop()
+
+        for chat in range(3):
+            worker.submit(handler, key=f"telegram:{chat}")
+        await asyncio.sleep(0.2)
+        return max(peak)
+
+    assert _run(scenario) == 3
+
+
+def test_full_queue_rejects_messages():
+    async def scenario(worker):
+        release = asyncio.Event()
+
+        async def handler():
+            await release.wait()
+
+        accepted = [worker.submit(handler, key="whatsapp:1") for _ in range(12)]
+        release.set()
+        return accepted
+
+    accepted = _run(scenario)
+    assert accepted[:10] == [True] * 10
+    assert accepted[10:] == [False, False]
+
+
+def test_failed_handler_does_not_block_the_key():
+    async def scenario(worker):
+        done = []
+
+        async def failing():
+            raise RuntimeError("boom")
+
+        async def handler():
+            done.append(True)
+
+        worker.submit(failing, key="telegram:1")
+        worker.submit(handler, key="telegram:1")
+        await asyncio.sleep(0.1)
+        return done
+
+    assert _run(scenario) == [True]
+
+
+def test_blocking_handlers_run_off_the_event_loop():
+    async def scenario(worker):
+        threads = []
+        worker.submit(lambda: threads.append(threading.current_thread()))
+        await asyncio.sleep(0.1)
+        return threads
+
+    assert _run(scenario)[0] is not threading.main_thread()
+
+
+def test_submit_before_start_is_rejected():
+    assert MessageWorker().submit(lambda: None) is False
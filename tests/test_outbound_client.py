@@ -0,0 +1,123 @@
+import asyncio
+import time
+import httpx
+import pytest
+import services.outbound_client as outbound_module
+from services.outbound_client import AsyncRateLimiter, OutboundClient
+
+URL = "https://api.telegram.test/bot/sendMessage"
+
+
+def _client(responses, max_retries=3):
+    requests = []
+    queue = list(responses)
+
+    def handler(request):
+        requests.append(request)
+        response = queue.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    client = OutboundClient({}, max_retries=max_retries, base_delay=0.01, max_delay=5,
+                            transport=httpx.MockTransport(handler))
+    return client, requests
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    # Records backoff delays instead of waiting
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(outbound_module.asyncio, "sleep", sleep)
+    return delays
+
+
+@pytest.mark.parametrize("failure", [
+    httpx.Response(429),
+    httpx.Response(500),
+    httpx.Response(503),
+    httpx.ConnectError("connection refused"),
+])
+def test_retries_transient_failures(sleeps, failure):
+    client, requests = _client([failure, httpx.Response(200, json={"ok": True})])
+
+    assert asyncio.run(client.post("telegram", URL, {"text": "hi"})) == {"ok": True}
+    assert len(requests) == 2
+    assert len(sleeps) == 1
+
+
+def test_client_errors_are_not_retried(sleeps):
+    client, requests = _client([httpx.Response(400)])
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(client.post("telegram", URL, {}))
+    assert len(requests) == 1
+
+
+def test_honours_retry_after(sleeps):
+    client, _ = _client([
+        httpx.Response(429, headers={"Retry-After": "2"}),
+        httpx.Response(429, json={"ok": False, "parameters": {"retry_after": 3}}),
+        httpx.Response(200, json={"ok": True}),
+    ])
+
+    asyncio.run(client.post("telegram", URL, {}))
+    assert sleeps == [2.0, 3.0]
+
+
+def test_retry_after_is_capped_by_max_delay(sleeps):
+    client, _ = _client([httpx.Response(429, headers={"Retry-After": "600"}), httpx.Response(200)])
+
+    asyncio.run(client.post("whatsapp", URL, {}))
+    assert sleeps == [5.0]
+
+
+def test_gives_up_after_max_attempts(sleeps):
+    client, requests = _client([httpx.Response(502)] * 3, max_retries=2)
+
+    with pytest.raises(httpx.HTTPStatusError, match="502"):
+        asyncio.run(client.post("telegram", URL, {}))
+    assert len(requests) == 3
+    assert len(sleeps) == 2
+
+
+def test_transport_error_is_raised_after_max_attempts(sleeps):
+    client, requests = _client([httpx.ReadTimeout("timed out")] * 2, max_retries=1)
+
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(client.post("telegram", URL, {}))
+    assert len(requests) == 2
+
+
+def test_rate_limiter_paces_acquires():
+    async def acquire_all(limiter, count):
+        started = time.monotonic()
+        for _ in range(count):
+            await limiter.acquire()
+        return time.monotonic() - started
+
+    # Burst of `capacity`, then one token every 1 / rate seconds
+    elapsed = asyncio.run(acquire_all(AsyncRateLimiter(rate=20, capacity=1), 5))
+    assert 0.18 <= elapsed < 1.0
+
+    assert asyncio.run(acquire_all(AsyncRateLimiter(rate=0), 100)) < 0.1
+
+
+def test_per_chat_limit_applies_to_each_chat():
+    async def send(client):
+        started = time.monotonic()
+        await client.post("telegram", URL, {}, chat_id=1)
+        await client.post("telegram", URL, {}, chat_id=2)
+        first_pair = time.monotonic() - started
+        await client.post("telegram", URL, {}, chat_id=1)
+        return first_pair, time.monotonic() - started
+
+    client = OutboundClient({"telegram": (0, 5)},
+                            transport=httpx.MockTransport(lambda request: httpx.Response(200, json={})))
+    first_pair, total = asyncio.run(send(client))
+    assert first_pair < 0.1
+    assert total >= 0.18
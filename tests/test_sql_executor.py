@@ -0,0 +1,61 @@
+import pytest
+from services.sql_executor import ReadOnlySqlExecutor
+from services.sql_schema import SqlSchema
+
+
+@pytest.fixture
+def executor():
+    schema = SqlSchema(None, tables=["employees", "employee_addresses", "documents"], excluded_columns=["password"])
+    return ReadOnlySqlExecutor(None, schema, max_rows=10)
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT name FROM employees",
+    "SELECT e.name, a.city FROM employees e JOIN employee_addresses a ON a.employee_id = e.id",
+    "SELECT e.name, a.city FROM employees e, employee_addresses a WHERE a.employee_id = e.id",
+    "SELECT name FROM employees WHERE id IN (SELECT employee_id FROM documents)",
+    "SELECT name FROM employees WHERE EXTRACT(YEAR FROM created_at) = 2024",
+    "WITH recent AS (SELECT id FROM employees) SELECT * FROM recent",
+    "WITH a AS (SELECT id FROM employees), b AS (SELECT id FROM documents) SELECT * FROM a, b",
+    "SELECT t.name FROM (SELECT name FROM employees) t",
+])
+def test_accepts_select_on_allowed_tables(executor, sql):
+    assert executor.validate(sql).startswith(sql)
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM employees e, mysql.user u",
+    "SELECT name FROM employees, ingestion_jobs",
+    "SELECT name FROM employees e, (SELECT 1) x, processed_messages p",
+    "SELECT name FROM (employees e JOIN ingestion_jobs j ON j.id = e.id)",
+    "SELECT name FROM employees JOIN `mysql`.`user` u ON u.User = name",
+])
+def test_rejects_tables_outside_the_allow_list(executor, sql):
+    with pytest.raises(ValueError, match="is not available"):
+        executor.validate(sql)
+
+
+def test_cte_names_are_only_taken_from_the_leading_with(executor):
+    sql = "SELECT name, COALESCE(x, 1) FROM employees, ingestion_jobs WHERE name IN (SELECT 1 , ingestion_jobs AS (1))"
+    with pytest.raises(ValueError, match="ingestion_jobs"):
+        executor.validate(sql)
+
+    with pytest.raises(ValueError, match="ingestion_jobs"):
+        executor.validate("SELECT CAST(name AS CHAR), ingestion_jobs AS (SELECT 1) FROM employees, ingestion_jobs")
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT name FROM employees; DROP TABLE employees",
+    "DELETE FROM employees",
+    "SELECT password FROM employees",
+    "SELECT name FROM employees FOR UPDATE",
+    "SELECT SLEEP(10)",
+])
+def test_rejects_unsafe_statements(executor, sql):
+    with pytest.raises(ValueError):
+        executor.validate(sql)
+
+
+def test_adds_row_limit(executor):
+    assert executor.validate("SELECT name FROM employees;").endswith("LIMIT 11")
+    assert executor.validate("SELECT name FROM employees LIMIT 5") == "SELECT name FROM employees LIMIT 5"
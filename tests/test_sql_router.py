@@ -0,0 +1,66 @@
+import pytest
+from services.sql_router import SqlRouter, schema_keywords
+
+TABLES = ["employees", "employee_addresses", "documents"]
+DEFAULT_KEYWORDS = "how many,number of,count,list all,email,city,zip code,admin,headcount".split(",")
+
+# Topic words of the stub embedding model: [database, general]
+_TOPICS = {
+    "email": (1, 0), "address": (1, 0), "city": (1, 0), "upload": (1, 0), "joined": (1, 0),
+    "policy": (0, 1), "covers": (0, 1), "travel": (0, 1), "leave": (0, 1), "conduct": (0, 1),
+}
+
+
+class TopicEmbeddings:
+    # Embeds text as [database, general] topic counts, so routing
+    # tests do not need a real embedding model.
+    def embed_query(self, text):
+        vector = [0.1, 0.1]
+        for word in text.lower().replace("?", " ").replace(".", " ").split():
+            database, general = _TOPICS.get(word, _TOPICS.get(word.rstrip("s"), (0, 0)))
+            vector[0] += database
+            vector[1] += general
+        return vector
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+@pytest.fixture
+def router():
+    return SqlRouter(
+        embeddings=TopicEmbeddings(),
+        keywords=schema_keywords(TABLES) + DEFAULT_KEYWORDS,
+        database_examples=["What is the email address of John?", "Which documents did Alice upload?"],
+        general_examples=["What is our leave policy?", "Which policy covers travel?"],
+    )
+
+
+def test_schema_keywords_skip_bare_singular_words():
+    assert schema_keywords(TABLES) == ["documents", "employee address", "employees"]
+
+
+@pytest.mark.parametrize("question", [
+    "What is the employee leave policy?",
+    "Which document covers travel?",
+    "Does the travel policy count weekends?",
+    "Which policy covers admin access?",
+])
+def test_policy_questions_stay_on_the_vector_branch(router, question):
+    assert router.needs_sql(question) is False
+
+
+@pytest.mark.parametrize("question", [
+    "How many employees joined this year?",
+    "Show the employee addresses in Berlin.",
+    "What is the email of John?",
+    "Which documents did Priya upload?",
+])
+def test_database_questions_route_to_sql(router, question):
+    assert router.needs_sql(question) is True
+
+
+def test_single_words_route_to_sql_without_the_embedding_stage():
+    router = SqlRouter(keywords=schema_keywords(TABLES) + DEFAULT_KEYWORDS, mode="keywords")
+    assert router.needs_sql("What is the email of John?") is True
+    assert router.needs_sql("What is our leave policy?") is False
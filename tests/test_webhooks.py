@@ -0,0 +1,80 @@
+from unittest import mock
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import routers.telegram as telegram_router
+import routers.whatsapp as whatsapp_router
+from services.idempotency import MemoryIdempotencyStore
+
+
+@pytest.fixture
+def webhooks(monkeypatch):
+    monkeypatch.delenv("WHATSAPP_APP_SECRET", raising=False)
+    monkeypatch.delenv("TELEGRAM_WEBHOOK_SECRET", raising=False)
+    store = MemoryIdempotencyStore(ttl=60)
+    worker = mock.MagicMock()
+    worker.submit.return_value = True
+    for module in (telegram_router, whatsapp_router):
+        monkeypatch.setattr(module, "idempotency_store", store)
+        monkeypatch.setattr(module, "message_worker", worker)
+    monkeypatch.setattr(telegram_router, "TelegramService", mock.MagicMock())
+    monkeypatch.setattr(whatsapp_router, "WhatsAppService", mock.MagicMock())
+
+    app = FastAPI()
+    app.include_router(telegram_router.router)
+    app.include_router(whatsapp_router.router)
+    return TestClient(app), worker, store
+
+
+def _whatsapp(*messages):
+    return {"entry": [{"changes": [{"value": {"messages": list(messages)}}]}]}
+
+
+def test_whatsapp_redeliveries_are_ignored(webhooks):
+    client, worker, _ = webhooks
+    message = {"id": "wamid.1", "from": "491700", "text": {"body": "hi"}}
+
+    assert client.post("/whatsapp/webhook", json=_whatsapp(message)).status_code == 200
+    assert client.post("/whatsapp/webhook", json=_whatsapp(message)).status_code == 200
+    assert worker.submit.call_count == 1
+
+
+def test_whatsapp_messages_without_id_are_not_deduplicated(webhooks):
+    client, worker, _ = webhooks
+    message = {"from": "491700", "text": {"body": "hi"}}
+
+    client.post("/whatsapp/webhook", json=_whatsapp(message))
+    client.post("/whatsapp/webhook", json=_whatsapp(dict(message, text={"body": "again"})))
+    assert worker.submit.call_count == 2
+
+
+def test_telegram_redeliveries_are_ignored(webhooks):
+    client, worker, _ = webhooks
+    update = {"update_id": 10, "message": {"message_id": 1, "chat": {"id": 5}, "text": "hi"}}
+
+    client.post("/telegram/webhook", json=update)
+    client.post("/telegram/webhook", json=update)
+    assert worker.submit.call_count == 1
+
+
+def test_telegram_updates_without_id_are_not_deduplicated(webhooks):
+    client, worker, _ = webhooks
+    update = {"message": {"chat": {"id": 5}, "text": "hi"}}
+
+    client.post("/telegram/webhook", json=update)
+    client.post("/telegram/webhook", json=update)
+    assert worker.submit.call_count == 2
+
+
+def test_full_worker_queue_returns_503_and_releases_the_key(webhooks):
+    client, worker, store = webhooks
+    worker.submit.return_value = False
+    message = {"id": "wamid.2", "from": "491700", "text": {"body": "hi"}}
+    update = {"update_id": 11, "message": {"chat": {"id": 5}, "text": "hi"}}
+
+    assert client.post("/whatsapp/webhook", json=_whatsapp(message)).status_code == 503
+    assert client.post("/telegram/webhook", json=update).status_code == 503
+
+    # The platform's retry is processed once the queue has room again
+    assert store.claim("whatsapp:wamid.2") is True
+    assert store.claim("telegram:11") is True